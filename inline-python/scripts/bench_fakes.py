@@ -0,0 +1,240 @@
+"""In-process stand-ins for Notion, Typesense and Telegram used by the benchmarks.
+
+Redis is replaced with ``fakeredis``. Nothing here touches the network.
+"""
+import asyncio
+import random
+import re
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+from notion_client.errors import APIErrorCode, APIResponseError
+
+# Add src to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.services.deal_index import DealIndex
+from src.services.deal_filter import Condition, DealFilter, FacetCondition
+
+GEOS = ["FR", "DE", "UK", "ES", "IT", "CA", "AU", "NZ", "MX", "CL", "CO", "BE", "NL", "SE", "NO", "PL", "SG", "JP"]
+PARTNERS = ["Sutra", "Acolyte", "Deum", "Genio", "AffGenius", "FTD Company", "Rayzone", "Capex", "Leadgen Pro", "Nova"]
+SOURCES = ["Facebook", "Google", "Taboola", "Bing", "SEO", "Native Ads", "TikTok", "MSN"]
+LANGUAGES = ["Native", "English", "French", "German", "Spanish", "Italian", "Dutch"]
+FUNNELS = [
+    "Quantum AI", "Immediate Edge", "ByteToken360", "Oil Profit", "Bitcoin Buyer", "Trader AI",
+    "Finance Phantom", "BTC Bank", "Tradeshop AI", "Bitcoin GPT", "Big Money Rush", "Riquezal",
+]
+
+def _formula(value) -> Dict:
+    key = "number" if isinstance(value, (int, float)) else "string"
+    return {"type": "formula", "formula": {key: value}}
+
+def _multi_select(values: List[str]) -> Dict:
+    return {"type": "multi_select", "multi_select": [{"name": value} for value in values]}
+
+def generate_offer_pages(count: int, seed: int = 42) -> List[Dict]:
+    """Generate Notion offer pages shaped like the real offers database."""
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    pages = []
+    for i in range(count):
+        cpa = rng.choice([600, 700, 900, 1000, 1100, 1200, 1250, 1300, 1350, 1500])
+        crg = rng.choice([0.02, 0.05, 0.08, 0.1, 0.12, 0.13, 0.15])
+        cpl = rng.choice([None, None, None, 13, 15, 19.5, 25])
+        edited = base + timedelta(minutes=rng.randint(0, 60 * 24 * 300))
+        pages.append({
+            "id": f"page-{i:06d}",
+            "last_edited_time": edited.strftime("%Y-%m-%dT%H:%M:00.000Z"),
+            "properties": {
+                "Partner": _formula(rng.choice(PARTNERS)),
+                "GEO": _formula(rng.choice(GEOS)),
+                "Sources": _multi_select(rng.sample(SOURCES, rng.randint(1, 2))),
+                "Language": _multi_select([rng.choice(LANGUAGES)]),
+                "Funnels": _multi_select(rng.sample(FUNNELS, rng.randint(1, 3))),
+                "CPA | Network | Selling": {"type": "number", "number": cpa},
+                "CRG | Network | Selling": {"type": "number", "number": crg},
+                "CPL | Network | Selling": {"type": "formula", "formula": {"number": cpl}},
+            },
+        })
+    return pages
+
+class _FakeDatabases:
+    def __init__(self, pages: List[Dict], latency: float, database_id: str):
+        self.pages = pages
+        self.latency = latency
+        self.database_id = database_id
+        self.calls = 0
+
+    async def query(self, database_id: str, start_cursor: Optional[str] = None,
+                    page_size: int = 100, filter: Optional[Dict] = None, **kwargs) -> Dict:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        pages = self.pages if database_id == self.database_id else []
+        if filter and "last_edited_time" in filter:
+            since = filter["last_edited_time"]["on_or_after"]
+            pages = sorted(
+                (page for page in pages if page["last_edited_time"] >= since),
+                key=lambda page: page["last_edited_time"]
+            )
+        start = int(start_cursor or 0)
+        end = start + page_size
+        return {
+            "results": pages[start:end],
+            "has_more": end < len(pages),
+            "next_cursor": str(end) if end < len(pages) else None,
+        }
+
+class _FakePages:
+    def __init__(self, pages: List[Dict]):
+        self.by_id = {page["id"]: page for page in pages}
+
+    async def retrieve(self, page_id: str) -> Dict:
+        if page_id not in self.by_id:
+            raise APIResponseError(
+                code=APIErrorCode.ObjectNotFound, status=404,
+                message=f"Could not find page with ID: {page_id}.",
+                headers=httpx.Headers(), raw_body_text=""
+            )
+        return self.by_id[page_id]
+
+class FakeNotionClient:
+    """Paginated offers database; every other database is empty."""
+
+    def __init__(self, pages: List[Dict], database_id: str, latency: float = 0.0):
+        self.databases = _FakeDatabases(pages, latency, database_id)
+        self.pages = _FakePages(pages)
+
+FILTER_CLAUSE_PATTERN = re.compile(r"(\w+):(<=|>=|<|>|=)?(.+)")
+
+def _to_deal_filter(params: Dict) -> DealFilter:
+    """Translate the filter_by/sort_by clauses SearchService sends."""
+    conditions = []
+    for clause in filter(None, params.get("filter_by", "").split(" && ")):
+        field, op, value = FILTER_CLAUSE_PATTERN.match(clause).groups()
+        if value.startswith("["):
+            values = tuple(v.strip("`") for v in re.findall(r"`[^`]*`|[^,\[\]]+", value))
+            conditions.append(FacetCondition(field, values, exact=op == "="))
+        else:
+            conditions.append(Condition(field, op or "=", float(value)))
+
+    sort = None
+    field, _, direction = params.get("sort_by", "").split(",")[0].partition(":")
+    if field and field != "_text_match":
+        sort = (field, direction == "desc")
+    return DealFilter(tuple(conditions), sort)
+
+class FakeTypesenseClient:
+    """In-memory replacement for AsyncTypesenseClient."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.collections: Dict[str, Dict] = {}
+        self.documents: Dict[str, Dict[str, Dict]] = {}
+        self.aliases: Dict[str, str] = {}
+        self.synonyms: Dict[str, Dict[str, List[str]]] = {}
+        self._indexes: Dict[str, DealIndex] = {}
+        self.searches = 0
+
+    def _resolve(self, name: str) -> str:
+        return self.aliases.get(name, name)
+
+    async def health(self) -> bool:
+        return True
+
+    async def retrieve_collection(self, name: str) -> Optional[Dict]:
+        name = self._resolve(name)
+        collection = self.collections.get(name)
+        if collection is None:
+            return None
+        return {**collection, "num_documents": len(self.documents[name])}
+
+    async def create_collection(self, schema: Dict) -> Dict:
+        self.collections[schema["name"]] = schema
+        self.documents[schema["name"]] = {}
+        return schema
+
+    async def delete_collection(self, name: str) -> None:
+        name = self._resolve(name)
+        self.collections.pop(name, None)
+        self.documents.pop(name, None)
+        self.synonyms.pop(name, None)
+        self._indexes.pop(name, None)
+
+    async def retrieve_alias(self, name: str) -> Optional[str]:
+        return self.aliases.get(name)
+
+    async def upsert_alias(self, name: str, collection: str) -> None:
+        self.aliases[name] = collection
+
+    async def upsert_synonym(self, collection: str, synonym_id: str, synonyms: List[str]) -> None:
+        self.synonyms.setdefault(collection, {})[synonym_id] = synonyms
+
+    async def search(self, collection: str, params: Dict) -> Dict:
+        collection = self._resolve(collection)
+        self.searches += 1
+        await asyncio.sleep(self.latency)
+        index = self._indexes.get(collection)
+        if index is None:
+            index = self._indexes[collection] = DealIndex(self.documents[collection].values())
+        per_page = int(params.get("per_page", params.get("limit", 10)))
+        page = int(params.get("page", 1))
+        query = params.get("q", "")
+        hits = index.search(
+            "" if query == "*" else query,
+            limit=page * per_page,
+            deal_filter=_to_deal_filter(params)
+        )
+        window = hits[(page - 1) * per_page:]
+        return {"found": len(hits), "hits": [{"document": document} for document in window]}
+
+    async def import_documents(self, collection: str, documents: List[Dict],
+                               action: str = "upsert") -> List[Dict]:
+        collection = self._resolve(collection)
+        await asyncio.sleep(self.latency)
+        self.documents[collection].update((document["id"], document) for document in documents)
+        self._indexes.pop(collection, None)
+        return [{"success": True} for _ in documents]
+
+    async def export_documents(self, collection: str, params: Optional[Dict] = None) -> List[Dict]:
+        return list(self.documents[self._resolve(collection)].values())
+
+    async def delete_document(self, collection: str, doc_id: str) -> None:
+        collection = self._resolve(collection)
+        self.documents[collection].pop(doc_id, None)
+        self._indexes.pop(collection, None)
+
+    async def delete_documents(self, collection: str, doc_ids: List[str], batch_size: int = 100) -> None:
+        collection = self._resolve(collection)
+        for doc_id in doc_ids:
+            self.documents[collection].pop(doc_id, None)
+        self._indexes.pop(collection, None)
+
+    async def close(self) -> None:
+        pass
+
+class _StubUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+class StubInlineQuery:
+    """Just enough of telegram.InlineQuery for DealBot.handle_inline_query."""
+
+    def __init__(self, query: str, user_id: int, query_id: str, offset: str = ""):
+        self.query = query
+        self.offset = offset
+        self.id = query_id
+        self.from_user = _StubUser(user_id)
+        self.results: Optional[list] = None
+        self.next_offset: Optional[str] = None
+
+    async def answer(self, results, **kwargs) -> None:
+        self.results = list(results)
+        self.next_offset = kwargs.get("next_offset")
+
+class StubUpdate:
+    def __init__(self, query: str, user_id: int = 1, query_id: str = "0", offset: str = ""):
+        self.inline_query = StubInlineQuery(query, user_id, query_id, offset)
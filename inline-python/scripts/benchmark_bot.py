@@ -0,0 +1,199 @@
+"""Offline end-to-end benchmark for DealBot.
+
+Drives ``DealBot.sync_notion_data`` and ``DealBot.handle_inline_query``
+against in-process fakes (see ``bench_fakes.py``) and fakeredis, so it runs
+on a laptop with no network. Reports sync duration, peak memory, snapshot
+warm-start time, inline queries/sec and latency percentiles for the local
+index and the Typesense fallback path, and exits non-zero when a result
+regresses past the stored baselines.
+
+    python scripts/benchmark_bot.py                       # 1k, 10k and 100k offers
+    python scripts/benchmark_bot.py --sizes 1000 --update-baselines
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+import fakeredis
+
+from bench_fakes import FakeNotionClient, FakeTypesenseClient, StubUpdate, generate_offer_pages
+
+# Add src to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.config.settings import Settings
+from src.bot.deal_bot import DealBot
+
+BASELINES_PATH = Path(__file__).with_name("benchmark_baselines.json")
+
+# Typical inline searches; each is replayed keystroke by keystroke
+SESSIONS = [
+    "FR", "DE fb", "Sutra", "Acolyte UK", "CA google", "Quantum AI", "ES native",
+    "Genio SEO", "IT Facebook", "AU Taboola", "Deum MX", "english", "Trader AI",
+    "NL dutch", "Rayzone", "",
+]
+
+# Metrics checked against the baselines; sub-millisecond medians are too
+# noisy to gate on. Lower is better except for throughput.
+CHECKED_METRICS = {"qps", "p99_ms", "sync_seconds", "peak_mb", "warm_start_seconds"}
+HIGHER_IS_BETTER = {"qps"}
+
+def make_bot(pages: List[Dict], local_search: bool, typesense_latency: float,
+             snapshot_path: str = "") -> DealBot:
+    """Build a DealBot wired to fakes instead of real services."""
+    settings = Settings(
+        TELEGRAM_BOT_TOKEN="0:benchmark",
+        NOTION_TOKEN="benchmark",
+        OFFERS_DATABASE_ID="offers",
+        ADVERTISERS_DATABASE_ID="advertisers",
+        TYPESENSE_API_KEY="benchmark",
+        WEBHOOK_SECRET="benchmark",
+        NOTION_REQUESTS_PER_SECOND=1_000_000,
+        LOCAL_SEARCH_ENABLED=local_search,
+        INLINE_DEBOUNCE_MS=0,
+        METRICS_PORT=0,
+        SNAPSHOT_PATH=snapshot_path,
+    )
+    bot = DealBot(settings)
+    bot.notion_service.client = FakeNotionClient(pages, settings.OFFERS_DATABASE_ID)
+    bot.search_service.client = FakeTypesenseClient(latency=typesense_latency)
+    bot.cache_service.redis = fakeredis.FakeAsyncRedis()
+    return bot
+
+def keystrokes(session: str) -> List[str]:
+    return [session[:i] for i in range(1, len(session) + 1)] or [""]
+
+async def bench_sync(bot: DealBot) -> Dict[str, float]:
+    """Time a full sync, then measure peak memory of a second one."""
+    started = time.perf_counter()
+    await bot.sync_notion_data(full=True)
+    sync_seconds = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    await bot.sync_notion_data(full=True)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"sync_seconds": sync_seconds, "peak_mb": peak / 1024 / 1024}
+
+async def bench_warm_start(pages: List[Dict]) -> Dict[str, float]:
+    """Time loading a written snapshot into a fresh bot, as on a restart."""
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = str(Path(tmp) / "deals.snapshot")
+        bot = make_bot(pages, local_search=True, typesense_latency=0, snapshot_path=snapshot_path)
+        await bot.sync_notion_data(full=True)
+
+        restarted = make_bot([], local_search=True, typesense_latency=0, snapshot_path=snapshot_path)
+        started = time.perf_counter()
+        await restarted._load_snapshot()
+        return {"warm_start_seconds": time.perf_counter() - started}
+
+async def bench_queries(bot: DealBot, users: int, rounds: int) -> Dict[str, float]:
+    """Replay keystroke sessions from concurrent users and time each answer."""
+    latencies: List[float] = []
+    query_ids = iter(range(10**9))
+
+    async def user(user_id: int) -> None:
+        for round_number in range(rounds):
+            session = SESSIONS[(user_id + round_number) % len(SESSIONS)]
+            for text in keystrokes(session):
+                update = StubUpdate(text, user_id=user_id, query_id=str(next(query_ids)))
+                start = time.perf_counter()
+                await bot.handle_inline_query(update, None)
+                latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(user_id) for user_id in range(users)))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    pick = lambda p: ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000
+    return {
+        "qps": len(latencies) / elapsed,
+        "p50_ms": pick(50),
+        "p95_ms": pick(95),
+        "p99_ms": pick(99),
+    }
+
+async def run(size: int, users: int, rounds: int, typesense_latency: float) -> Dict[str, Dict]:
+    pages = generate_offer_pages(size)
+    results: Dict[str, Dict] = {}
+
+    bot = make_bot(pages, local_search=True, typesense_latency=typesense_latency)
+    results["sync"] = await bench_sync(bot)
+    results["sync"].update(await bench_warm_start(pages))
+    results["local"] = await bench_queries(bot, users, rounds)
+
+    bot = make_bot(pages, local_search=False, typesense_latency=typesense_latency)
+    await bot.sync_notion_data(full=True)
+    results["typesense"] = await bench_queries(bot, users, rounds)
+    return results
+
+def compare(results: Dict, baselines: Dict, tolerance: float) -> List[str]:
+    """List every metric that regressed past the tolerance."""
+    regressions = []
+    for size, groups in results.items():
+        for group, values in groups.items():
+            for metric, value in values.items():
+                baseline = baselines.get(size, {}).get(group, {}).get(metric)
+                if baseline is None or metric not in CHECKED_METRICS:
+                    continue
+                if metric in HIGHER_IS_BETTER:
+                    regressed = value < baseline * (1 - tolerance)
+                else:
+                    regressed = value > baseline * (1 + tolerance)
+                if regressed:
+                    regressions.append(
+                        f"{size} offers {group}.{metric}: {value:.3f} vs baseline {baseline:.3f}"
+                    )
+    return regressions
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description='Offline DealBot benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--users', type=int, default=20, help='Concurrent inline users')
+    parser.add_argument('--rounds', type=int, default=5, help='Sessions typed per user')
+    parser.add_argument('--typesense-latency-ms', type=float, default=2.0,
+                        help='Simulated Typesense round trip')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Allowed relative regression before failing')
+    parser.add_argument('--update-baselines', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results = {}
+    for size in args.sizes:
+        result = await run(size, args.users, args.rounds, args.typesense_latency_ms / 1000)
+        results[str(size)] = result
+        sync, local, typesense = result["sync"], result["local"], result["typesense"]
+        print(
+            f"{size:>7} offers | sync {sync['sync_seconds']:6.2f}s peak {sync['peak_mb']:7.1f} MB "
+            f"warm start {sync['warm_start_seconds']:5.2f}s | "
+            f"local {local['qps']:8.0f} q/s p99 {local['p99_ms']:6.2f} ms | "
+            f"typesense {typesense['qps']:7.0f} q/s p99 {typesense['p99_ms']:6.2f} ms"
+        )
+
+    baselines = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    if args.update_baselines:
+        baselines.update(results)
+        BASELINES_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baselines written to {BASELINES_PATH}")
+        return 0
+
+    regressions = compare(results, baselines, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
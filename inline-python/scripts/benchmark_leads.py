@@ -0,0 +1,96 @@
+"""Throughput benchmark for CRM lead export aggregation.
+
+Builds an export of ``--rows`` leads by repeating ``Carlitospro CRM Data.csv``
+and aggregates it per affiliate, country and campaign, both with the
+chunked columnar reader and with a row-by-row ``csv.DictReader`` loop for
+comparison. Exits non-zero when throughput regresses past the baseline.
+
+    python scripts/benchmark_leads.py
+    python scripts/benchmark_leads.py --rows 1000000 --update-baselines
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+# Add src to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.services.lead_import import GROUP_COLUMNS, COLUMNS, aggregate_leads
+
+BASELINES_PATH = Path(__file__).with_name("benchmark_baselines.json")
+DEFAULT_EXPORT = Path(__file__).resolve().parents[2] / "Carlitospro CRM Data.csv"
+
+def build_export(path: Path, rows: int) -> str:
+    header, body = path.read_text(encoding="utf-8-sig").split("\n", 1)
+    body = body.rstrip("\n") + "\n"
+    sample_rows = body.count("\n")
+    return header + "\n" + body * max(rows // sample_rows, 1)
+
+def aggregate_rows(export: str) -> int:
+    """The row-by-row approach: one dict per lead and every response decoded."""
+    totals: Dict = {}
+    rows = 0
+    for row in csv.DictReader(io.StringIO(export)):
+        rows += 1
+        json.loads(row[COLUMNS["response"]])
+        for name in GROUP_COLUMNS:
+            group = totals.setdefault((name, row[COLUMNS[name]]), [0, 0])
+            group[0] += 1
+            group[1] += bool(row[COLUMNS["deposited"]])
+    return rows
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='CRM lead aggregation benchmark')
+    parser.add_argument('--export', type=Path, default=DEFAULT_EXPORT)
+    parser.add_argument('--rows', type=int, default=200_000, help='Approximate leads aggregated')
+    parser.add_argument('--chunk-size', type=int, default=20_000)
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Allowed relative regression before failing')
+    parser.add_argument('--update-baselines', action='store_true')
+    args = parser.parse_args()
+
+    export = build_export(args.export, args.rows)
+    megabytes = len(export.encode()) / 1e6
+
+    started = time.perf_counter()
+    stats = aggregate_leads(io.StringIO(export), args.chunk_size)
+    elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    aggregate_rows(export)
+    row_elapsed = time.perf_counter() - started
+
+    result = {
+        "rows_per_second": stats.rows / elapsed,
+        "megabytes_per_second": megabytes / elapsed,
+    }
+    print(
+        f"{stats.rows:>8} leads ({megabytes:.0f} MB) | columnar {result['rows_per_second']:9.0f} rows/s "
+        f"{result['megabytes_per_second']:6.1f} MB/s | row-by-row {stats.rows / row_elapsed:9.0f} rows/s "
+        f"| {row_elapsed / elapsed:.1f}x"
+    )
+
+    baselines = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    if args.update_baselines:
+        baselines["leads"] = {key: round(value, 1) for key, value in result.items()}
+        BASELINES_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baselines written to {BASELINES_PATH}")
+        return 0
+
+    regressions = [
+        f"leads.{metric}: {result[metric]:.1f} vs baseline {baseline:.1f}"
+        for metric, baseline in baselines.get("leads", {}).items()
+        if result[metric] < baseline * (1 - args.tolerance)
+    ]
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
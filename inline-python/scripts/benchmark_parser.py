@@ -0,0 +1,112 @@
+"""Throughput benchmark for the raw deal parser.
+
+Parses the sample partner messages in ``DealParser Data.md`` (repeated to
+a realistic backlog size), reports deals and lines per second, checks the
+worked examples in ``Deal Formatting.md`` and exits non-zero when
+throughput regresses past the stored baseline or more examples mismatch
+than the baseline allows.
+
+    python scripts/benchmark_parser.py
+    python scripts/benchmark_parser.py --repeat 200 --update-baselines
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add src to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.services.deal_parser import iter_deal_batches, parse_deals
+
+BASELINES_PATH = Path(__file__).with_name("benchmark_baselines.json")
+DOCS_PATH = Path(__file__).resolve().parents[2]
+EXAMPLE_PATTERN = re.compile(r"Input:\n```\n(.*?)```\s*\nOutput:\n```\n(.*?)```", re.S)
+
+def check_examples(path: Path) -> Tuple[int, List[str]]:
+    """Parse every Input/Output example, returning the record count and mismatches."""
+    mismatches = []
+    total = 0
+    for raw, expected in EXAMPLE_PATTERN.findall(path.read_text()):
+        expected_lines = [line.strip() for line in expected.strip().splitlines()]
+        parsed = [deal.format() for deal in parse_deals(raw)]
+        for i in range(max(len(parsed), len(expected_lines))):
+            total += 1
+            got = parsed[i] if i < len(parsed) else "(missing)"
+            want = expected_lines[i] if i < len(expected_lines) else "(none)"
+            if got != want:
+                mismatches.append(f"expected {want}\n       got {got}")
+    return total, mismatches
+
+def bench(lines: List[str], repeat: int) -> Dict[str, float]:
+    backlog = lines * repeat
+
+    started = time.perf_counter()
+    deals = sum(1 for _ in parse_deals(backlog))
+    elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    documents = sum(len(batch) for batch in iter_deal_batches(backlog))
+    ingest_elapsed = time.perf_counter() - started
+
+    return {
+        "deals": deals,
+        "deals_per_second": deals / elapsed,
+        "lines_per_second": len(backlog) / elapsed,
+        "documents_per_second": documents / ingest_elapsed,
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Raw deal parser benchmark')
+    parser.add_argument('--data', type=Path, default=DOCS_PATH / "DealParser Data.md")
+    parser.add_argument('--rules', type=Path, default=DOCS_PATH / "Deal Formatting.md")
+    parser.add_argument('--repeat', type=int, default=100, help='Copies of the sample data parsed')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Allowed relative regression before failing')
+    parser.add_argument('--update-baselines', action='store_true')
+    args = parser.parse_args()
+
+    lines = args.data.read_text().splitlines()
+    result = bench(lines, args.repeat)
+    print(
+        f"{result['deals']:>7} deals | {result['deals_per_second']:9.0f} deals/s "
+        f"{result['lines_per_second']:9.0f} lines/s | "
+        f"ingest {result['documents_per_second']:9.0f} documents/s"
+    )
+
+    mismatches = None
+    if args.rules.exists():
+        total, mismatches = check_examples(args.rules)
+        print(f"Formatting examples: {total - len(mismatches)}/{total} records match")
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+
+    baselines = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    if args.update_baselines:
+        baselines["parser"] = {
+            key: round(value, 1) for key, value in result.items() if key.endswith("_per_second")
+        }
+        if mismatches is not None:
+            baselines["parser_examples"] = {"mismatches": len(mismatches)}
+        BASELINES_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baselines written to {BASELINES_PATH}")
+        return 0
+
+    regressions = [
+        f"parser.{metric}: {result[metric]:.0f} vs baseline {baseline:.0f}"
+        for metric, baseline in baselines.get("parser", {}).items()
+        if result[metric] < baseline * (1 - args.tolerance)
+    ]
+    allowed = baselines.get("parser_examples", {}).get("mismatches", 0)
+    if mismatches is not None and len(mismatches) > allowed:
+        regressions.append(f"parser_examples.mismatches: {len(mismatches)} vs baseline {allowed}")
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Benchmark inline-query search throughput against a running Typesense.
+
+Simulates N concurrent users, each firing searches back to back, and reports
+how throughput and latency scale with concurrency. Use ``--client sync`` to
+measure the old blocking ``typesense.Client`` call pattern for comparison.
+
+    python scripts/benchmark_search.py --users 1 4 16 64 --duration 10
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import typesense
+
+# Add src to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.config.settings import Settings
+from src.services.search_service import SearchService
+
+QUERIES = ["FR", "DE", "fb", "Sutra", "english", "CA google", "Quantum", "ES", "IT fb", "AU"]
+
+def make_sync_search(settings: Settings):
+    """Recreate the old behaviour: a blocking client called from a coroutine."""
+    client = typesense.Client({
+        'api_key': settings.TYPESENSE_API_KEY,
+        'nodes': settings.TYPESENSE_NODES,
+        'connection_timeout_seconds': 2
+    })
+
+    async def search(query: str) -> None:
+        client.collections['deals'].documents.search({
+            'q': query,
+            'query_by': 'partner,sources,geo,language,funnels',
+            'per_page': 10,
+            'sort_by': '_text_match:desc'
+        })
+
+    return search
+
+async def run_user(search, deadline: float, latencies: List[float], offset: int) -> None:
+    """Issue queries back to back until the deadline."""
+    i = offset
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await search(QUERIES[i % len(QUERIES)])
+        latencies.append(time.perf_counter() - start)
+        i += 1
+
+async def run_level(search, users: int, duration: float) -> None:
+    """Run one concurrency level and print its results."""
+    latencies: List[float] = []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(run_user(search, deadline, latencies, i) for i in range(users)))
+    elapsed = time.perf_counter() - started
+
+    if not latencies:
+        print(f"{users:>6} users: no completed queries")
+        return
+
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) > 1 else ordered[0]
+    print(
+        f"{users:>6} users: {len(latencies) / elapsed:>9.1f} q/s  "
+        f"p50 {statistics.median(ordered) * 1000:>7.2f} ms  "
+        f"p95 {p95 * 1000:>7.2f} ms"
+    )
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark inline search throughput')
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per level')
+    parser.add_argument('--client', choices=['async', 'sync'], default='async')
+    args = parser.parse_args()
+
+    settings = Settings()
+    search_service = SearchService(settings)
+    if args.client == 'sync':
+        search = make_sync_search(settings)
+    else:
+        search = search_service.search_deals
+
+    print(f"Client: {args.client}, {args.duration:g}s per level")
+    try:
+        for users in args.users:
+            await run_level(search, users, args.duration)
+    finally:
+        await search_service.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
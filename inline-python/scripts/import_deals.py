@@ -0,0 +1,72 @@
+"""Normalize raw partner deal text and load it into Typesense.
+
+Reads partner messages from files (or stdin), streams them through the
+deal parser and upserts the resulting deals in batches into the
+``deals_imported`` collection. Use ``--dry-run`` to print the normalized
+records instead.
+
+Notion stays the source of truth for the live ``deals`` collection, so
+imports never go there: syncs leave ``deals_imported`` alone and the bot
+does not answer from it. Add deals to Notion to serve them.
+
+    python scripts/import_deals.py "DealParser Data.md" --dry-run
+    cat partner_message.txt | python scripts/import_deals.py
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import Iterator, List
+
+# Add src to Python path
+src_path = str(Path(__file__).parent.parent)
+sys.path.append(src_path)
+
+from src.config.settings import Settings
+from src.services.deal_parser import iter_deal_batches, parse_deals
+from src.services.search_service import IMPORTED_ALIAS, SearchService
+
+def read_lines(paths: List[str]) -> Iterator[str]:
+    """Yield input lines lazily, one file after the other."""
+    if not paths:
+        yield from sys.stdin
+        return
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            yield from f
+        yield ""  # a file boundary always ends the last deal
+
+async def import_deals(lines: Iterator[str], batch_size: int) -> int:
+    search_service = SearchService(Settings(), alias=IMPORTED_ALIAS)
+    indexed = parsed = 0
+    try:
+        for batch in iter_deal_batches(lines, batch_size):
+            parsed += len(batch)
+            indexed += await search_service.update_index(batch)
+    finally:
+        await search_service.close()
+    print(f"Parsed {parsed} deals, indexed {indexed} changed documents into '{IMPORTED_ALIAS}'")
+    return indexed
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description='Import raw partner deal text',
+        epilog=f"Deals are upserted into the '{IMPORTED_ALIAS}' Typesense collection, which "
+               "syncs never touch and the bot does not serve; add deals to Notion to serve them."
+    )
+    parser.add_argument('paths', nargs='*', help='Files to read (default: stdin)')
+    parser.add_argument('--dry-run', action='store_true', help='Print normalized deals only')
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    lines = read_lines(args.paths)
+    if args.dry_run:
+        for deal in parse_deals(lines):
+            print(deal.format())
+        return 0
+
+    asyncio.run(import_deals(lines, args.batch_size))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
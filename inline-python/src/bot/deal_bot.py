@@ -1,21 +1,40 @@
 """Main bot implementation."""
-from telegram import Update, InlineQueryResultArticle, InputTextMessageContent, BotCommand
+from telegram import Update, InlineQueryResultArticle, InputTextMessageContent, BotCommand, Message
+from telegram.error import TelegramError
 from telegram.ext import Application, CommandHandler, InlineQueryHandler, CallbackContext
-from typing import List
+from typing import Awaitable, Callable, List, Dict, Optional, Set, Tuple
 import asyncio
 import logging
+import time
 from datetime import datetime
 import ssl
 from pathlib import Path
 
 from src.services.search_service import SearchService
-from src.services.cache_service import CacheService
+from src.services.cache_service import CacheService, SearchCursor
 from src.config.settings import Settings
 from src.services.notion_service import NotionService
-from src.models.exceptions import NotionSyncError, SearchError, CacheError
+from src.services.deal_index import DealIndex, matches_query
+from src.services.catalog_views import CatalogViews
+from src.services.query_normalizer import normalize_query, broader_queries
+from src.services.deal_filter import DealFilter, parse_query
+from src.services.request_coalescer import SingleFlight
+from src.services.metrics import metrics, start_metrics_server
+from src.services.fingerprint import catalog_fingerprint
+from src.services.snapshot import read_snapshot, write_snapshot
+from src.services.sync_coordinator import SyncCoordinator, SyncProgress
+from src.services.notion_webhook import NotionWebhookReceiver
+from src.services.poll_interval import AdaptivePollInterval
+from src.services.lead_import import GROUP_COLUMNS, LeadStats, aggregate_leads
+from src.models.exceptions import (
+    NotionSyncError, SearchError, CacheError, SnapshotError, LeadImportError
+)
 
 logger = logging.getLogger(__name__)
 
+# Groups listed by /leads, largest first
+LEAD_REPORT_ROWS = 10
+
 class DealBot:
     def __init__(self, settings: Settings):
         # Initialize bot application with defaults
@@ -35,14 +54,64 @@ class DealBot:
         self.search_service = SearchService(settings)
         self.cache_service = CacheService(settings)
         
-        # Sync interval in seconds (5 minutes)
-        self.sync_interval = 300
+        # In-memory catalog of synced deals and the local index built from it.
+        # Inline queries are answered from the index; Typesense is the fallback.
+        self._deals: Dict[str, Dict] = {}
+        self.deal_index: Optional[DealIndex] = None
+        
+        # Sorted deal ids for the empty query and each geo, partner and
+        # source, answered before the index or any cache
+        self.catalog_views: Optional[CatalogViews] = None
+        
+        # Results per inline answer, and result ids fetched from Typesense
+        # (and cached as the query's cursor) per request
+        self.results_limit = settings.INLINE_PAGE_SIZE
+        self.cursor_window = max(settings.INLINE_CURSOR_WINDOW, self.results_limit)
+        
+        # Latest inline query id per user, and searches currently in flight
+        self._latest_inline: Dict[int, str] = {}
+        self._inflight_searches = SingleFlight()
+        
+        # Inline results pre-rendered at sync time, keyed by deal id
+        self._rendered: Dict[str, InlineQueryResultArticle] = {}
+        
+        # Poll interval, adapted to recent changes and business hours around
+        # SYNC_INTERVAL (5 minutes)
+        self.sync_interval = settings.SYNC_INTERVAL
+        self.poll_interval = AdaptivePollInterval(settings)
+        
+        # Full reconciliation interval in seconds (1 hour); syncs in between
+        # only fetch pages edited since the last high-water mark
+        self.full_sync_interval = settings.FULL_SYNC_INTERVAL
+        self._last_full_sync: Optional[datetime] = None
+        
+        # Set when a Typesense write failed; the next sync re-upserts and
+        # reconciles the whole catalog
+        self._index_stale = False
+        # Set when the catalog version could not be moved in Redis
+        self._version_stale = False
+        
+        # One sync at a time: scheduled syncs and /refresh share the running one
+        self.sync_coordinator = SyncCoordinator(
+            self.sync_notion_data,
+            settings.REFRESH_MIN_INTERVAL,
+            sync_pages=self.sync_notion_pages,
+            page_debounce=settings.NOTION_WEBHOOK_DEBOUNCE
+        )
+        self.refresh_progress_interval = settings.REFRESH_PROGRESS_INTERVAL
+        self._background_tasks: Set[asyncio.Task] = set()
+        
+        # Aggregated CRM lead export, re-read only when the file changes
+        self._lead_stats: Optional[Tuple[Tuple[int, int], LeadStats]] = None
+        self._lead_reads = SingleFlight()
         
         # Register handlers in order of priority
         self.register_handlers()
         
         self._running = False
         self._scheduler_task = None
+        self._metrics_runner = None
+        self._webhook_runner = None
 
     def register_handlers(self):
         """Register handlers in proper order."""
@@ -50,6 +119,8 @@ class DealBot:
         self.app.add_handler(CommandHandler("help", self.handle_help))
         self.app.add_handler(CommandHandler("status", self.handle_status))
         self.app.add_handler(CommandHandler("refresh", self.handle_refresh))
+        self.app.add_handler(CommandHandler("stats", self.handle_stats))
+        self.app.add_handler(CommandHandler("leads", self.handle_leads))
         self.app.add_handler(InlineQueryHandler(self.handle_inline_query))
         
         # Add error handler
@@ -61,11 +132,10 @@ class DealBot:
             BotCommand("start", "Start the bot"),
             BotCommand("help", "Show help message"),
             BotCommand("status", "Check bot status"),
-            BotCommand("refresh", "Refresh deal data")
+            BotCommand("refresh", "Refresh deal data"),
+            BotCommand("stats", "Show latency and cache statistics"),
+            BotCommand("leads", "Show lead conversion by affiliate, country or campaign")
         ])
-        
-        # Perform initial sync after bot is initialized
-        await self.sync_notion_data()
 
     async def error_handler(self, update: Update, context: CallbackContext) -> None:
         """Handle errors."""
@@ -76,8 +146,9 @@ class DealBot:
         try:
             self._running = True
             
-            # Initial sync
-            await self.sync_notion_data()
+            # Serve from the last snapshot; the scheduler's first sync
+            # reconciles with Notion in the background
+            await self._load_snapshot()
             
             # Start bot in polling mode
             logger.info("Starting bot in polling mode...")
@@ -89,6 +160,8 @@ class DealBot:
             # Start sync scheduler
             logger.info("Starting sync scheduler...")
             self._scheduler_task = asyncio.create_task(self.start_sync_scheduler())
+            await self._start_metrics_server()
+            await self._start_notion_webhook()
             
             # Start polling
             await self.app.updater.start_polling(
@@ -113,11 +186,14 @@ class DealBot:
         try:
             self._running = True
             
-            # Initial sync
-            await self.sync_notion_data()
+            # Serve from the last snapshot; the scheduler's first sync
+            # reconciles with Notion in the background
+            await self._load_snapshot()
             
             # Start sync scheduler
             self._scheduler_task = asyncio.create_task(self.start_sync_scheduler())
+            await self._start_metrics_server()
+            await self._start_notion_webhook()
             
             # Start bot in webhook mode
             logger.info("Starting bot in webhook mode...")
@@ -147,6 +223,29 @@ class DealBot:
         finally:
             await self.shutdown()
 
+    async def _start_metrics_server(self) -> None:
+        """Expose Prometheus metrics locally, unless disabled."""
+        if not self.settings.METRICS_PORT:
+            return
+        try:
+            self._metrics_runner = await start_metrics_server(metrics, self.settings.METRICS_PORT)
+        except OSError as e:
+            logger.error(f"Could not start metrics endpoint: {str(e)}")
+    
+    async def _start_notion_webhook(self) -> None:
+        """Receive Notion page-change notifications, unless disabled."""
+        if not self.settings.NOTION_WEBHOOK_PORT:
+            return
+        if not self.settings.NOTION_WEBHOOK_SECRET:
+            logger.warning("NOTION_WEBHOOK_SECRET is not set; webhook events will be rejected")
+        receiver = NotionWebhookReceiver(
+            self.settings.NOTION_WEBHOOK_SECRET, self.sync_coordinator.queue_pages
+        )
+        try:
+            self._webhook_runner = await receiver.start(self.settings.NOTION_WEBHOOK_PORT)
+        except OSError as e:
+            logger.error(f"Could not start Notion webhook receiver: {str(e)}")
+
     async def shutdown(self):
         """Clean shutdown of bot and services."""
         logger.info("Starting bot shutdown...")
@@ -162,6 +261,11 @@ class DealBot:
                 except asyncio.CancelledError:
                     pass
             
+            # Stop any sync in progress and pending /refresh progress reports
+            await self.sync_coordinator.cancel()
+            for task in list(self._background_tasks):
+                task.cancel()
+            
             # Stop the application
             if self.app.running:
                 logger.info("Stopping application...")
@@ -172,6 +276,15 @@ class DealBot:
             logger.info("Closing Redis connections...")
             await self.cache_service.close()
             
+            # Close Typesense connections
+            await self.search_service.close()
+            
+            # Stop metrics endpoint and webhook receiver
+            if self._metrics_runner:
+                await self._metrics_runner.cleanup()
+            if self._webhook_runner:
+                await self._webhook_runner.cleanup()
+            
             logger.info("Bot shutdown complete")
             
         except Exception as e:
@@ -179,45 +292,225 @@ class DealBot:
 
     async def handle_inline_query(self, update: Update, context: CallbackContext) -> None:
         """Handle inline queries with automatic filtering."""
-        query = update.inline_query.query.strip()
+        inline_query = update.inline_query
+        user_id = inline_query.from_user.id
+        self._latest_inline[user_id] = inline_query.id
+        
+        # Filters such as "geo:DE src:fb cpa>1000" become a structured
+        # filter; the rest of the query is matched as text
+        raw_query, deal_filter = parse_query(inline_query.query.strip())
+        query = normalize_query(raw_query)
+        offset = self._parse_offset(inline_query.offset)
+        metrics.increment("inline_queries_total")
+        if offset:
+            metrics.increment("inline_next_page_total")
+        started = time.perf_counter()
         
         try:
-            # Get results from cache or search
-            results = await self.cache_service.get_search_results(query)
+            # One extra id tells whether another page follows
+            needed = offset + self.results_limit + 1
+            deal_ids = await self._find_deal_ids(
+                raw_query, query, deal_filter, needed, user_id, inline_query.id
+            )
             
-            if not results:
-                results = await self.search_service.search_deals(query)
-                await self.cache_service.cache_search_results(query, results)
+            # Drop answers the user has already typed past
+            if deal_ids is None or self._is_superseded(user_id, inline_query.id):
+                metrics.increment("inline_superseded_total")
+                return
             
-            # Format results
-            inline_results = self._format_inline_results(results)
+            # Look up results rendered at sync time
+            page_ids = deal_ids[offset:offset + self.results_limit]
+            with metrics.timer("format"):
+                inline_results = [
+                    result for result in map(self._inline_result, page_ids) if result is not None
+                ]
+            next_offset = str(offset + self.results_limit) if len(deal_ids) >= needed else ""
             
-            await update.inline_query.answer(
-                inline_results,
-                cache_time=300,  # Cache results on Telegram for 5 minutes
-                is_personal=True
-            )
+            with metrics.timer("telegram_answer"):
+                await inline_query.answer(
+                    inline_results,
+                    cache_time=300,  # Cache results on Telegram for 5 minutes
+                    is_personal=True,
+                    next_offset=next_offset
+                )
+            metrics.observe("stage_seconds", time.perf_counter() - started, stage="inline_query")
             
         except Exception as e:
             logger.error(f"Error handling inline query: {str(e)}", exc_info=True)
-            await update.inline_query.answer([])
+            await inline_query.answer([])
+        finally:
+            if self._latest_inline.get(user_id) == inline_query.id:
+                del self._latest_inline[user_id]
     
-    def _format_inline_results(self, deals: List[dict]) -> List[InlineQueryResultArticle]:
-        """Format deals as inline results."""
-        return [
-            InlineQueryResultArticle(
-                id=deal["id"],
-                title=deal["formatted_display"],
-                description=deal["formatted_funnels"],
-                thumbnail_url=f"https://flagsapi.com/{deal['geo']}/flat/64.png",
-                thumbnail_width=64,
-                thumbnail_height=64,
-                input_message_content=InputTextMessageContent(
-                    message_text=f"{deal['formatted_display']}\n{deal['formatted_funnels']}"
-                )
+    @staticmethod
+    def _parse_offset(offset: str) -> int:
+        """Read the result offset Telegram echoes back from our next_offset."""
+        try:
+            return max(int(offset or 0), 0)
+        except ValueError:
+            return 0
+    
+    def _is_superseded(self, user_id: int, inline_query_id: str) -> bool:
+        """Check whether the user has sent a newer inline query since this one."""
+        return self._latest_inline.get(user_id) != inline_query_id
+    
+    async def _find_deal_ids(
+        self,
+        raw_query: str,
+        query: str,
+        deal_filter: DealFilter,
+        needed: int,
+        user_id: int,
+        inline_query_id: str
+    ) -> Optional[List[str]]:
+        """Find at least ``needed`` matching deal ids when there are that many.
+        
+        Returns None if the query was superseded first.
+        """
+        views = self.catalog_views
+        deal_index = self.deal_index
+        if views is not None and not deal_filter:
+            deal_ids = views.lookup(query)
+            # A view only holds exact geo/partner/source matches; serve it
+            # unless the index finds more, e.g. "de" as a prefix of Deum
+            if deal_ids is not None and (
+                not query
+                or deal_index is not None and deal_index.exact_count(query) == len(deal_ids)
+            ):
+                metrics.increment("inline_view_hits_total")
+                return list(deal_ids[:needed])
+        
+        if deal_index is not None:
+            # Answer from the in-process index, no network round trip
+            with metrics.timer("local_search"):
+                deals = deal_index.search(query, limit=needed, deal_filter=deal_filter)
+            return [deal["id"] for deal in deals]
+        
+        # Serve pages from the query's cached cursor, or refine a cached
+        # broader query
+        cache_key = self._cache_key(query, deal_filter)
+        cursor = await self.cache_service.get_search_results(cache_key)
+        if cursor is not None and not self._resolvable(cursor.ids):
+            # Cached before a restart or by another replica, for deals not
+            # loaded here: search again rather than answer without them
+            metrics.increment("inline_unresolved_cursors_total")
+            cursor = None
+        if cursor is not None and (len(cursor.ids) >= needed or cursor.exhausted):
+            return cursor.ids
+        
+        if cursor is None:
+            refined = await self._refine_cached_results(raw_query, query, deal_filter)
+            if refined:
+                await self.cache_service.cache_search_results(cache_key, SearchCursor(refined, True))
+                return refined
+            
+            # Give the user a moment to keep typing before going to Typesense
+            await asyncio.sleep(self.settings.INLINE_DEBOUNCE_MS / 1000)
+            if self._is_superseded(user_id, inline_query_id):
+                return None
+            cursor = SearchCursor([], False)
+        
+        # Fetch Typesense pages until the cursor covers the requested page;
+        # identical concurrent requests share one search
+        while len(cursor.ids) < needed and not cursor.exhausted:
+            cursor = await self._inflight_searches.do(
+                (cache_key, len(cursor.ids)),
+                lambda: self._search_and_cache(query, deal_filter, cursor)
             )
-            for deal in deals
+        return cursor.ids
+    
+    def _resolvable(self, deal_ids: List[str]) -> bool:
+        """Whether every deal id can be rendered from what this process has loaded."""
+        rendered, deals = self._rendered, self._deals
+        return all(deal_id in rendered or deal_id in deals for deal_id in deal_ids)
+    
+    @staticmethod
+    def _cache_key(query: str, deal_filter: DealFilter) -> str:
+        """Cache key for a normalized query and its structured filter."""
+        if not deal_filter:
+            return query
+        return f"{query}|{deal_filter.cache_key()}"
+    
+    async def _search_and_cache(
+        self,
+        query: str,
+        deal_filter: DealFilter,
+        cursor: SearchCursor
+    ) -> SearchCursor:
+        """Fetch the next Typesense page after a cursor and cache the extended cursor.
+        
+        Only cursors built from whole Typesense pages are extended; a short
+        page marks the cursor exhausted.
+        """
+        deals = await self.search_service.search_deals(
+            query,
+            limit=self.cursor_window,
+            deal_filter=deal_filter,
+            page=len(cursor.ids) // self.cursor_window + 1
+        )
+        for deal in deals:
+            if deal["id"] not in self._rendered:
+                self._rendered[deal["id"]] = self._render_inline_result(deal)
+        
+        cursor = SearchCursor(
+            cursor.ids + [deal["id"] for deal in deals],
+            exhausted=len(deals) < self.cursor_window
+        )
+        await self.cache_service.cache_search_results(self._cache_key(query, deal_filter), cursor)
+        return cursor
+    
+    async def _refine_cached_results(
+        self,
+        raw_query: str,
+        query: str,
+        deal_filter: DealFilter
+    ) -> Optional[List[str]]:
+        """Narrow a cached result set from an earlier keystroke of the same query.
+        
+        Only complete cursors (every match fetched) can be refined; anything
+        else returns None so the caller runs a real search. All earlier
+        keystrokes are looked up in one batch.
+        """
+        broader_keys = [
+            self._cache_key(broader, deal_filter) for broader in broader_queries(raw_query)
         ]
+        cached = await self.cache_service.get_many_search_results(broader_keys)
+        for broader_key in broader_keys:
+            broader = cached.get(broader_key)
+            if broader is None or not broader.exhausted:
+                continue
+            broader_ids = broader.ids
+            if not all(deal_id in self._deals for deal_id in broader_ids):
+                # Deals that are not loaded cannot be checked against the query
+                continue
+            return [
+                deal_id for deal_id in broader_ids
+                if matches_query(self._deals[deal_id], query)
+                and deal_filter.matches(self._deals[deal_id])
+            ] or None
+        return None
+    
+    def _inline_result(self, deal_id: str) -> Optional[InlineQueryResultArticle]:
+        """Pre-rendered result for a deal, rendering deals loaded from a snapshot on first use."""
+        result = self._rendered.get(deal_id)
+        if result is None and deal_id in self._deals:
+            result = self._rendered[deal_id] = self._render_inline_result(self._deals[deal_id])
+        return result
+    
+    @staticmethod
+    def _render_inline_result(deal: dict) -> InlineQueryResultArticle:
+        """Render a deal as an inline result; done once per deal at sync time."""
+        return InlineQueryResultArticle(
+            id=deal["id"],
+            title=deal["formatted_display"],
+            description=deal["formatted_funnels"],
+            thumbnail_url=f"https://flagsapi.com/{deal['geo']}/flat/64.png",
+            thumbnail_width=64,
+            thumbnail_height=64,
+            input_message_content=InputTextMessageContent(
+                message_text=f"{deal['formatted_display']}\n{deal['formatted_funnels']}"
+            )
+        )
     
     def _format_deal_message(self, deal: dict) -> str:
         """Format deal for message display."""
@@ -252,12 +545,16 @@ class DealBot:
             "  - Partner: `Amazon`\n"
             "  - Geography: `US`\n"
             "  - Language: `EN`\n"
-            "  - Funnel: `Dating`\n\n"
+            "  - Funnel: `Dating`\n"
+            "  - Price: `FR cpa>1000`, `crg<=10`, `cpl:15-25`, `sort:-cpl`\n"
+            "  - Filters: `geo:DE src:fb lang:german`, `funnel:\"Quantum AI\"`, `partner:sutra`, `model:cpl`\n\n"
             "📋 *Commands:*\n"
             "/start - Start the bot\n"
             "/help - Show this help message\n"
             "/status - Check services status\n"
-            "/refresh - Force refresh cache\n\n"
+            "/refresh - Force refresh cache\n"
+            "/stats - Latency and cache statistics\n"
+            "/leads [affiliate|country|campaign] - Lead conversion from the CRM export\n\n"
             "💡 *Tips:*\n"
             "• Results update every 5 minutes\n"
             "• Use specific terms for better results"
@@ -294,15 +591,166 @@ class DealBot:
             logger.error(f"Error in status command: {str(e)}", exc_info=True)
             await update.message.reply_text("❌ Error checking status")
 
+    async def handle_stats(self, update: Update, context: CallbackContext) -> None:
+        """Handle the /stats command."""
+        lines = ["📊 Bot Stats", "", "Latency p50 / p95 / p99 (ms):"]
+        for stage, count, p50, p95, p99 in metrics.stage_percentiles():
+            lines.append(
+                f"• {stage}: {p50 * 1000:.2f} / {p95 * 1000:.2f} / {p99 * 1000:.2f} (n={count})"
+            )
+        if len(lines) == 3:
+            lines.append("• No samples yet")
+        
+        lines.append("")
+        lines.append("Cache hit ratio:")
+        for tier in ("local", "redis"):
+            ratio = metrics.hit_ratio(tier)
+            lines.append(f"• {tier}: {f'{ratio:.1%}' if ratio is not None else 'n/a'}")
+        
+        lines.append("")
+        lines.append(f"Inline queries: {metrics.counter('inline_queries_total'):g}")
+        lines.append(f"Superseded: {metrics.counter('inline_superseded_total'):g}")
+        lines.append(f"Served from views: {metrics.counter('inline_view_hits_total'):g}")
+        
+        lines.append("")
+        lines.append("Notion API:")
+        lines.append(f"• Requests: {metrics.counter('notion_requests_total'):g}")
+        lines.append(f"• Retries: {metrics.counter_total('notion_retries_total'):g}")
+        lines.append(f"• Throttled (429): {metrics.counter('notion_throttled_total'):g}")
+        lines.append(f"• Circuit: {self.notion_service.scheduler.breaker.state}")
+        
+        lines.append("")
+        lines.append("Sync:")
+        lines.append(f"• Poll interval: {self.poll_interval.current:.0f}s")
+        lines.append(f"• Webhook events: {metrics.counter('webhook_events_total', result='accepted'):g}")
+        lines.append(f"• Pages queued: {self.sync_coordinator.pending_pages}")
+        
+        await update.message.reply_text("\n".join(lines))
+
+    async def handle_leads(self, update: Update, context: CallbackContext) -> None:
+        """Handle /leads command: conversion and deposits per group of the CRM export."""
+        column = context.args[0].lower() if context.args else GROUP_COLUMNS[0]
+        if column not in GROUP_COLUMNS:
+            await update.message.reply_text(f"Usage: /leads [{'|'.join(GROUP_COLUMNS)}]")
+            return
+        if not self.settings.LEAD_EXPORT_PATH:
+            await update.message.reply_text("❌ No lead export configured (LEAD_EXPORT_PATH)")
+            return
+        
+        try:
+            stats = await self._load_lead_stats()
+        except LeadImportError as e:
+            logger.error(f"Error reading lead export: {str(e)}")
+            await update.message.reply_text("❌ Error reading the lead export")
+            return
+        
+        total = stats.totals()
+        period = (
+            f"{str(stats.first_created)[:10]} – {str(stats.last_created)[:10]}"
+            if stats.first_created is not None else "no dates"
+        )
+        lines = [
+            f"📈 Leads by {column} ({period})",
+            "",
+            f"Total: {total.leads} leads, {total.deposits} deposits ({total.conversion:.1%}), "
+            f"{total.contact_rate:.0%} contacted, {total.rejected} rejected by brokers",
+            "",
+        ]
+        groups = stats.groups(column)
+        for group in groups[:LEAD_REPORT_ROWS]:
+            line = (
+                f"• {group.name}: {group.leads} leads, {group.deposits} FTD "
+                f"({group.conversion:.1%}), {group.contact_rate:.0%} contacted"
+            )
+            if group.rejected:
+                line += f", {group.rejected} rejected"
+            if group.hours_to_deposit is not None:
+                line += f", {group.hours_to_deposit:.1f}h to deposit"
+            lines.append(line)
+        if len(groups) > LEAD_REPORT_ROWS:
+            lines.append(f"…and {len(groups) - LEAD_REPORT_ROWS} more")
+        if stats.skipped:
+            lines.append(f"⚠️ {stats.skipped} malformed rows skipped")
+        
+        await update.message.reply_text("\n".join(lines))
+    
+    async def _load_lead_stats(self) -> LeadStats:
+        """Aggregate the lead export in a worker thread, reusing totals while it is unchanged."""
+        path = Path(self.settings.LEAD_EXPORT_PATH)
+        try:
+            stat = path.stat()
+        except OSError as e:
+            raise LeadImportError(f"Lead export {path} is not readable: {str(e)}")
+        version = (stat.st_mtime_ns, stat.st_size)
+        if self._lead_stats is not None and self._lead_stats[0] == version:
+            return self._lead_stats[1]
+        
+        async def read() -> LeadStats:
+            with metrics.timer("lead_import"):
+                stats = await asyncio.to_thread(
+                    aggregate_leads, path, self.settings.LEAD_CHUNK_SIZE
+                )
+            logger.info(
+                f"Aggregated {stats.rows} leads from {path} "
+                f"({stats.skipped} malformed rows skipped)"
+            )
+            self._lead_stats = (version, stats)
+            return stats
+        
+        # Concurrent /leads commands share one read of the file
+        return await self._lead_reads.do(version, read)
+    
     async def handle_refresh(self, update: Update, context: CallbackContext) -> None:
-        """Handle /refresh command."""
+        """Handle /refresh command.
+        
+        Starts a full sync in the background (or attaches to the one already
+        running) and keeps editing the reply with its progress.
+        """
+        cooldown = self.sync_coordinator.force_cooldown()
+        if cooldown:
+            await update.message.reply_text(
+                f"⏳ Deals were just refreshed, try again in {cooldown:.0f}s"
+            )
+            return
+        
+        attached = self.sync_coordinator.running
+        sync = self.sync_coordinator.start(full=True, forced=True)
+        text = "🔄 Refresh already running..." if attached else "🔄 Refreshing deals cache..."
+        message = await update.message.reply_text(text)
+        
+        task = asyncio.create_task(self._report_refresh(sync, message))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _report_refresh(self, sync: asyncio.Task, message: Message) -> None:
+        """Edit a /refresh reply with sync progress until the sync finishes."""
+        progress = self.sync_coordinator.progress
+        shown = message.text
+        while True:
+            done, _ = await asyncio.wait({sync}, timeout=self.refresh_progress_interval)
+            if done:
+                break
+            shown = await self._edit_progress(message, shown, f"🔄 {progress.summary()}")
+        
+        if sync.cancelled():
+            return
+        if sync.exception():
+            logger.error(f"Refresh failed: {str(sync.exception())}")
+            await self._edit_progress(message, shown, f"❌ Refresh failed: {progress.summary()}")
+        else:
+            await self._edit_progress(message, shown, f"✅ Refresh complete! {progress.summary()}")
+    
+    @staticmethod
+    async def _edit_progress(message: Message, shown: str, text: str) -> str:
+        """Edit a message unless the text is unchanged, returning what is shown."""
+        if text == shown:
+            return shown
         try:
-            await update.message.reply_text("🔄 Refreshing deals cache...")
-            await self.sync_notion_data()
-            await update.message.reply_text("✅ Refresh complete!")
-        except Exception as e:
-            logger.error(f"Refresh failed: {str(e)}", exc_info=True)
-            await update.message.reply_text("❌ Refresh failed")
+            await message.edit_text(text)
+            return text
+        except TelegramError as e:
+            logger.warning(f"Could not update refresh progress: {str(e)}")
+            return shown
 
     async def _check_redis(self) -> bool:
         """Check Redis connection."""
@@ -315,7 +763,9 @@ class DealBot:
     async def _check_notion(self) -> bool:
         """Check Notion connection."""
         try:
-            await self.notion_service.client.databases.retrieve(
+            await self.notion_service.scheduler.call(
+                self.notion_service.client.databases.retrieve,
+                retries=0,
                 database_id=self.notion_service.database_id
             )
             return True
@@ -325,8 +775,7 @@ class DealBot:
     async def _check_typesense(self) -> bool:
         """Check Typesense connection."""
         try:
-            self.search_service.client.health.get()
-            return True
+            return await self.search_service.client.health()
         except Exception:
             return False
 
@@ -336,41 +785,283 @@ class DealBot:
             return self._last_sync_time.strftime('%Y-%m-%d %H:%M:%S')
         return "Never"
     
-    async def sync_notion_data(self):
-        """Sync data from Notion to search index."""
+    async def _load_snapshot(self) -> None:
+        """Restore the catalog from the last snapshot so queries are served right away."""
+        path = self.settings.SNAPSHOT_PATH
+        if not path or not Path(path).exists():
+            logger.info("No deal snapshot found, serving from Typesense until the first sync")
+            return
         try:
-            logger.info("Starting Notion sync...")
+            meta, deals = await asyncio.to_thread(read_snapshot, Path(path))
+        except SnapshotError as e:
+            logger.warning(f"Ignoring unreadable deal snapshot: {str(e)}")
+            return
+        
+        self._deals = {deal["id"]: deal for deal in deals}
+        await self._rebuild_deal_index()
+        
+        # Queries are answered from the index until the views are ready
+        task = asyncio.create_task(self._update_catalog_views())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        logger.info(
+            f"Loaded {len(deals)} deals from snapshot written at {meta.get('created_at')}"
+        )
+    
+    async def _save_snapshot(self) -> None:
+        """Write the current catalog to disk for the next warm start."""
+        path = self.settings.SNAPSHOT_PATH
+        if not path:
+            return
+        meta = {
+            "created_at": datetime.now().isoformat(),
+            "watermark": self.notion_service.high_water_mark,
+            "deals": len(self._deals),
+        }
+        try:
+            size = await asyncio.to_thread(
+                write_snapshot, Path(path), list(self._deals.values()), meta
+            )
+            logger.info(f"Wrote deal snapshot ({len(self._deals)} deals, {size} bytes)")
+        except SnapshotError as e:
+            logger.error(f"Failed to write deal snapshot: {str(e)}")
+    
+    async def _rebuild_deal_index(self) -> None:
+        """Build a fresh local index off the event loop and swap it in."""
+        if not self.settings.LOCAL_SEARCH_ENABLED:
+            return
+        self.deal_index = await asyncio.to_thread(DealIndex, list(self._deals.values()))
+        logger.info(f"Rebuilt local deal index ({len(self.deal_index)} deals)")
+    
+    async def _update_catalog_views(
+        self,
+        changed: Optional[Set[str]] = None,
+        removed: Set[str] = frozenset()
+    ) -> None:
+        """Patch the catalog views for changed deals, or rebuild them when ``changed`` is None."""
+        if not self.settings.CATALOG_VIEWS_ENABLED:
+            return
+        deals, views = self._deals, self.catalog_views
+        with metrics.timer("catalog_views"):
+            if views is None or changed is None:
+                views = await asyncio.to_thread(CatalogViews, deals)
+            else:
+                views = await asyncio.to_thread(views.updated, deals, changed, removed)
+        
+        # Drop views of a catalog a sync replaced in the meantime
+        if self._deals is deals:
+            self.catalog_views = views
+            logger.info(f"Updated catalog views ({len(views)} views)")
+    
+    def _full_sync_due(self) -> bool:
+        """Check whether the next sync should be a full reconciliation."""
+        if self._last_full_sync is None:
+            return True
+        elapsed = (datetime.now() - self._last_full_sync).total_seconds()
+        return elapsed >= self.full_sync_interval
+    
+    async def _write_index(self, write: Callable[..., Awaitable[int]], *args) -> int:
+        """Apply one Typesense write, best effort.
+        
+        The catalog, local index and views follow Notion whether or not
+        Typesense keeps up, so a failed write only marks the index stale:
+        later writes are skipped until the next sync retries them all.
+        """
+        if self._index_stale:
+            return 0
+        try:
+            return await write(*args)
+        except SearchError as e:
+            self._index_stale = True
+            logger.error(f"Search index write failed, retrying on the next sync: {str(e)}")
+            return 0
+    
+    async def _update_catalog_version(self, catalog: Dict[str, Dict]) -> None:
+        """Move the search cache to the catalog's generation, best effort.
+        
+        Like Typesense writes, a Redis outage must not stop the sync from
+        saving its watermark and snapshot; the next sync tries again.
+        """
+        try:
+            await self.cache_service.update_catalog_version(catalog_fingerprint(catalog.values()))
+            self._version_stale = False
+        except CacheError as e:
+            self._version_stale = True
+            logger.error(f"Catalog version update failed, retrying on the next sync: {str(e)}")
+    
+    async def sync_notion_data(self, full: bool = False, progress: Optional[SyncProgress] = None):
+        """Sync data from Notion to search index.
+        
+        Incremental syncs fetch only pages edited since the persisted
+        high-water mark. Full syncs re-pull everything and also drop deals
+        that were deleted in Notion. Go through ``sync_coordinator`` rather
+        than calling this directly, so syncs never overlap.
+        """
+        progress = progress or SyncProgress(full)
+        # A previous sync left Typesense behind: try writing again
+        retry_index = self._index_stale
+        self._index_stale = False
+        try:
+            watermark = None
+            if not full and not self._full_sync_due():
+                watermark = await self.cache_service.get_sync_watermark()
+            full = progress.full = watermark is None
+            progress.stage = "fetching"
             
-            # Get deals from Notion
-            deals = await self.notion_service.sync_deals()
-            logger.info(f"Retrieved {len(deals)} deals from Notion")
+            logger.info(f"Starting {'full' if full else 'incremental'} Notion sync...")
             
-            # Update search index
-            await self.search_service.update_index(deals)
-            logger.info("Updated search index")
+            # Stream deals from Notion, upserting each page's batch while the
+            # next page is being fetched. Blue/green full syncs index the
+            # whole catalog into a fresh collection once streaming is done.
+            rebuild = full and self.settings.TYPESENSE_BLUE_GREEN
+            previous = self._deals
+            catalog = {} if full else dict(previous)
+            rendered = {} if full else dict(self._rendered)
+            updated_ids: Set[str] = set()
+            synced = 0
+            changed = 0
+            async for batch in self.notion_service.stream_deals(edited_since=watermark):
+                if not batch:
+                    continue
+                for deal in batch:
+                    if previous.get(deal["id"]) != deal:
+                        updated_ids.add(deal["id"])
+                        progress.updated = len(updated_ids)
+                    catalog[deal["id"]] = deal
+                    rendered[deal["id"]] = self._render_inline_result(deal)
+                if not rebuild:
+                    changed += await self._write_index(self.search_service.update_index, batch)
+                synced += len(batch)
+                progress.pages = synced
+                progress.upserted = changed
+            deleted_ids = set(previous) - set(catalog)
+            progress.deleted = len(deleted_ids)
+            logger.info(
+                f"Retrieved {synced} deals from Notion, {len(updated_ids)} updated, "
+                f"{len(deleted_ids)} deleted"
+            )
             
-            # Clear search cache
-            await self.cache_service.clear_search_cache()
-            logger.info("Cleared search cache")
+            # Refresh the in-memory catalog and swap in a new local index
+            # from Notion's own changes, before Typesense is touched again
+            self._deals = catalog
+            self._rendered = rendered
+            if full or updated_ids:
+                await self._rebuild_deal_index()
+                await self._update_catalog_views(None if full else updated_ids)
+            
+            removed = 0
+            if rebuild:
+                progress.stage = "indexing"
+                changed = progress.upserted = await self._write_index(
+                    self.search_service.rebuild_index, catalog
+                )
+            elif full or retry_index:
+                progress.stage = "reconciling"
+                if retry_index:
+                    # Only documents whose fingerprint differs are written
+                    changed += await self._write_index(
+                        self.search_service.update_index, list(catalog.values())
+                    )
+                    progress.upserted = changed
+                removed = progress.removed = await self._write_index(
+                    self.search_service.reconcile_index, catalog
+                )
+            logger.info(f"Search index: {changed} documents upserted, {removed} removed")
+            
+            # Move the search cache to a new generation if content changed
+            if updated_ids or deleted_ids or self._version_stale:
+                await self._update_catalog_version(catalog)
+            
+            # Persist high-water mark for the next incremental sync
+            if self.notion_service.high_water_mark:
+                await self.cache_service.set_sync_watermark(
+                    self.notion_service.high_water_mark
+                )
             
             # Update last sync time
             self._last_sync_time = datetime.now()
+            if full:
+                self._last_full_sync = self._last_sync_time
+            
+            if full or updated_ids or deleted_ids:
+                await self._save_snapshot()
             
-            logger.info(f"Successfully synced {len(deals)} deals")
+            logger.info(f"Successfully synced {synced} deals")
             
         except Exception as e:
+            self._index_stale = self._index_stale or retry_index
             logger.error(f"Sync failed: {str(e)}", exc_info=True)
             raise
 
+    async def sync_notion_pages(self, changed_ids: Set[str], deleted_ids: Set[str],
+                                progress: Optional[SyncProgress] = None):
+        """Re-fetch and reindex only the pages a webhook reported.
+        
+        Leaves the high-water mark alone, so the next incremental poll
+        still covers anything the notifications missed.
+        """
+        progress = progress or SyncProgress(False, targeted=True)
+        try:
+            progress.stage = "fetching"
+            deals, gone = await self.notion_service.fetch_deals(changed_ids)
+            progress.pages = len(deals)
+            deleted_ids = set(deleted_ids) | set(gone)
+            
+            progress.stage = "indexing"
+            # Changes are judged against the catalog, which also holds deals
+            # restored from the snapshot before Typesense was ever written to
+            catalog = dict(self._deals)
+            rendered = dict(self._rendered)
+            updated_ids = {deal["id"] for deal in deals if catalog.get(deal["id"]) != deal}
+            removed_ids = deleted_ids & set(catalog)
+            progress.updated, progress.deleted = len(updated_ids), len(removed_ids)
+            for deal in deals:
+                catalog[deal["id"]] = deal
+                rendered[deal["id"]] = self._render_inline_result(deal)
+            for deal_id in removed_ids:
+                del catalog[deal_id]
+                rendered.pop(deal_id, None)
+            
+            self._deals = catalog
+            self._rendered = rendered
+            if updated_ids or removed_ids:
+                await self._rebuild_deal_index()
+                await self._update_catalog_views(updated_ids, removed_ids)
+            if updated_ids or removed_ids or self._version_stale:
+                await self._update_catalog_version(catalog)
+            if updated_ids or removed_ids:
+                await self._save_snapshot()
+            
+            progress.upserted = await self._write_index(self.search_service.update_index, deals)
+            # Ids the catalog never held were never indexed either
+            progress.removed = await self._write_index(
+                self.search_service.remove_from_index, list(removed_ids)
+            )
+            
+            logger.info(
+                f"Page sync: {len(changed_ids)} changed and {len(deleted_ids)} deleted pages, "
+                f"{len(updated_ids)} deals updated, {len(removed_ids)} removed"
+            )
+            
+        except Exception as e:
+            logger.error(f"Page sync failed: {str(e)}", exc_info=True)
+            raise
+    
     async def start_sync_scheduler(self):
-        """Schedule periodic syncs."""
-        logger.info(f"Starting sync scheduler (interval: {self.sync_interval}s)")
+        """Sync right away, then at an adaptive interval."""
+        logger.info(f"Starting sync scheduler (base interval: {self.sync_interval}s)")
+        interval = None
         while self._running:
             try:
-                await asyncio.sleep(self.sync_interval)
+                if interval is not None:
+                    await asyncio.sleep(interval)
                 if self._running:  # Check again after sleep
                     logger.info("Running scheduled sync...")
-                    await self.sync_notion_data()
+                    await self.sync_coordinator.run()
+                    interval = self.poll_interval.next_interval(
+                        self.sync_coordinator.progress.changed
+                    )
+                    logger.info(f"Next scheduled sync in {interval:.0f}s")
             except asyncio.CancelledError:
                 logger.info("Sync scheduler cancelled")
                 break
@@ -10,21 +10,72 @@ class Settings(BaseSettings):
     NOTION_TOKEN: str
     OFFERS_DATABASE_ID: str
     ADVERTISERS_DATABASE_ID: str
+    NOTION_REQUESTS_PER_SECOND: float = 3.0  # Notion's average rate limit
+    NOTION_MAX_CONCURRENCY: int = 3  # Notion requests and pages processed in parallel
+    NOTION_MAX_RETRIES: int = 5  # retries for throttled or transient failures
+    NOTION_BACKOFF_BASE: float = 1.0  # seconds, doubled per retry with full jitter
+    NOTION_BACKOFF_MAX: float = 30.0  # seconds
+    NOTION_CIRCUIT_FAILURE_THRESHOLD: int = 5  # consecutive failures before calls are short-circuited
+    NOTION_CIRCUIT_RESET_TIMEOUT: float = 60.0  # seconds before a trial call is allowed
     
     # Redis settings
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    REDIS_MAX_CONNECTIONS: int = 50  # connection pool size
+    REDIS_SOCKET_TIMEOUT: float = 2.0  # seconds
+    REDIS_CONNECT_TIMEOUT: float = 2.0  # seconds
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30  # seconds idle before a connection is pinged
+    CACHE_COMPRESSION_THRESHOLD: int = 1024  # bytes; larger values are zlib-compressed, 0 disables
+    LOCAL_CACHE_SIZE: int = 1024  # in-process entries in front of Redis
+    LOCAL_CACHE_TTL: int = 300  # seconds
     
     # Typesense settings
     TYPESENSE_API_KEY: str
     TYPESENSE_HOST: str = "localhost"
     TYPESENSE_PORT: str = "8108"
     TYPESENSE_PROTOCOL: str = "http"
+    TYPESENSE_CONNECTION_TIMEOUT: float = 2.0  # seconds
+    TYPESENSE_TIMEOUT: float = 5.0  # seconds
+    TYPESENSE_MAX_CONNECTIONS: int = 20
+    TYPESENSE_IMPORT_BATCH_SIZE: int = 500  # documents per import request
+    TYPESENSE_REBUILD_BATCH_SIZE: int = 2000  # documents per import during a full rebuild
+    TYPESENSE_BLUE_GREEN: bool = True  # full syncs rebuild into a new collection behind the alias
+    
+    # Search settings
+    LOCAL_SEARCH_ENABLED: bool = True  # answer inline queries from memory
+    CATALOG_VIEWS_ENABLED: bool = True  # serve empty and exact geo/partner/source queries from precomputed lists
+    INLINE_DEBOUNCE_MS: int = 150  # wait before a Typesense search, to drop superseded keystrokes
+    INLINE_PAGE_SIZE: int = 10  # results per inline answer page
+    INLINE_CURSOR_WINDOW: int = 50  # result ids fetched and cached per Typesense request
+    
+    # Sync settings
+    SYNC_INTERVAL: int = 300  # seconds between incremental syncs; the poll interval adapts around it
+    SYNC_MIN_INTERVAL: int = 60  # shortest poll interval, used in business hours after changes
+    SYNC_MAX_INTERVAL: int = 1800  # longest poll interval, reached outside business hours when idle
+    SYNC_BACKOFF_FACTOR: float = 2.0  # poll interval growth after a sync with no changes
+    BUSINESS_TIMEZONE: str = "Europe/Berlin"
+    BUSINESS_HOURS_START: int = 9  # local hour business hours start
+    BUSINESS_HOURS_END: int = 19  # local hour business hours end
+    BUSINESS_WEEKDAYS_ONLY: bool = True  # weekends count as off hours
+    FULL_SYNC_INTERVAL: int = 3600  # seconds between full reconciliations
+    SNAPSHOT_PATH: str = "data/deals.snapshot"  # catalog snapshot for warm starts, empty disables
+    REFRESH_MIN_INTERVAL: int = 60  # minimum seconds between forced /refresh syncs
+    REFRESH_PROGRESS_INTERVAL: float = 3.0  # seconds between /refresh progress edits
+    
+    # CRM lead export settings
+    LEAD_EXPORT_PATH: str = ""  # CRM lead CSV summarized by /leads, empty disables it
+    LEAD_CHUNK_SIZE: int = 20000  # rows aggregated per chunk when reading the export
+    
+    # Metrics settings
+    METRICS_PORT: int = 9464  # local Prometheus endpoint, 0 disables it
     
     # Webhook settings
     WEBHOOK_URL: str = ""
     WEBHOOK_SECRET: str
+    NOTION_WEBHOOK_PORT: int = 0  # Notion webhook receiver port, 0 disables it
+    NOTION_WEBHOOK_SECRET: str = ""  # HMAC key for webhook signatures (Notion's verification token)
+    NOTION_WEBHOOK_DEBOUNCE: float = 2.0  # seconds to collect page changes before reindexing
     
     @property
     def TYPESENSE_NODES(self) -> List[dict]:
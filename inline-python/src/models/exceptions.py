@@ -8,10 +8,22 @@ class NotionSyncError(BotError):
     """Raised when Notion synchronization fails."""
     pass
 
+class CircuitOpenError(NotionSyncError):
+    """Raised when Notion calls are short-circuited after repeated failures."""
+    pass
+
 class SearchError(BotError):
     """Raised when search operations fail."""
     pass
 
 class CacheError(BotError):
     """Raised when cache operations fail."""
-    pass 
\ No newline at end of file
+    pass
+
+class SnapshotError(BotError):
+    """Raised when a deal snapshot cannot be read or written."""
+    pass
+
+class LeadImportError(BotError):
+    """Raised when a CRM lead export cannot be read."""
+    pass
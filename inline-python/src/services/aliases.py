@@ -0,0 +1,59 @@
+"""Short spellings of sources, languages and geos, and their canonical forms.
+
+Queries are canonicalized with these tables (``fb`` -> ``facebook``), but
+deals keep whatever Notion stores, abbreviations included. Anything that
+matches a canonical word against deals therefore accepts every spelling
+listed for it in ``ALTERNATIVES``.
+"""
+from typing import Dict, Tuple
+
+# Normalization tables from the Deal Formatting rules. Two-letter language
+# aliases that are also country codes (fr, de, es, it, nl, pt, ru) are left
+# alone so geo searches keep working.
+SOURCE_ALIASES: Dict[str, str] = {
+    "fb": "facebook",
+    "gg": "google",
+    "ig": "instagram",
+    "na": "native ads",
+    "nativeads": "native ads",
+}
+
+LANGUAGE_ALIASES: Dict[str, str] = {
+    "en": "english",
+    "eng": "english",
+    "fre": "french",
+    "esp": "spanish",
+    "ger": "german",
+    "por": "portuguese",
+    "ita": "italian",
+    "dut": "dutch",
+    "rus": "russian",
+    "nat": "native",
+}
+
+GEO_ALIASES: Dict[str, str] = {
+    "uk": "gb",  # deals are stored with GB for the flag API
+}
+
+ALIASES: Dict[str, str] = {**SOURCE_ALIASES, **LANGUAGE_ALIASES, **GEO_ALIASES}
+
+# Aliases that may appear in each stored deal field
+FIELD_ALIASES: Dict[str, Dict[str, str]] = {
+    "sources": SOURCE_ALIASES,
+    "language": LANGUAGE_ALIASES,
+    "geo": GEO_ALIASES,
+}
+
+def _alternatives() -> Dict[str, Tuple[str, ...]]:
+    spellings: Dict[str, Tuple[str, ...]] = {}
+    for alias, canonical in ALIASES.items():
+        spellings[canonical] = spellings.get(canonical, (canonical,)) + (alias,)
+    return spellings
+
+# Canonical form -> every spelling of it, canonical first:
+# "facebook" -> ("facebook", "fb"), "native ads" -> ("native ads", "na", "nativeads")
+ALTERNATIVES: Dict[str, Tuple[str, ...]] = _alternatives()
+
+def alternatives(value: str) -> Tuple[str, ...]:
+    """Every spelling of a canonical value, the value itself if it has no aliases."""
+    return ALTERNATIVES.get(value, (value,))
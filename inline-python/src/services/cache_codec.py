@@ -0,0 +1,34 @@
+"""Compact serialization for cached values."""
+from typing import Any
+import zlib
+import orjson
+
+# One-byte headers identifying how a value was stored
+RAW = b"j"
+COMPRESSED = b"z"
+
+class CacheCodec:
+    """orjson encoding, zlib-compressed above a size threshold.
+
+    Values are bytes with a one-byte header, so compressed and plain
+    entries can live side by side. Headerless values written by older
+    versions as plain JSON text still decode.
+    """
+
+    def __init__(self, compression_threshold: int = 1024, compression_level: int = 1):
+        self.compression_threshold = compression_threshold
+        self.compression_level = compression_level
+
+    def encode(self, value: Any) -> bytes:
+        data = orjson.dumps(value)
+        if self.compression_threshold and len(data) >= self.compression_threshold:
+            return COMPRESSED + zlib.compress(data, self.compression_level)
+        return RAW + data
+
+    def decode(self, data: bytes) -> Any:
+        header, body = data[:1], data[1:]
+        if header == COMPRESSED:
+            return orjson.loads(zlib.decompress(body))
+        if header == RAW:
+            return orjson.loads(body)
+        return orjson.loads(data)
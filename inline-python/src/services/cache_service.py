@@ -1,66 +1,207 @@
 """Redis caching implementation."""
-from typing import Optional, List, Dict
-import json
+from typing import Any, Dict, NamedTuple, Optional, List
 import redis.asyncio as redis
 import logging
 
 from ..config.settings import Settings
 from ..models.exceptions import CacheError
+from .lru_cache import LRUCache
+from .cache_codec import CacheCodec
+from .metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+class SearchCursor(NamedTuple):
+    """Result ids fetched so far for a query, and whether they are all of them."""
+    ids: List[str]
+    exhausted: bool
+
+    def encode(self) -> Dict[str, Any]:
+        return {"ids": self.ids, "exhausted": self.exhausted}
+
+    @classmethod
+    def decode(cls, value: Any) -> Optional["SearchCursor"]:
+        # Entries written before the flag existed are plain id lists whose
+        # completeness is unknown; they read as misses
+        if isinstance(value, list):
+            return None
+        return cls(value["ids"], value["exhausted"])
+
 class CacheService:
     def __init__(self, settings: Settings):
-        self.redis = redis.Redis(
+        # Values are binary (possibly compressed), so responses are not
+        # decoded; string keys are decoded where they are read
+        self.pool = redis.ConnectionPool(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
             db=settings.REDIS_DB,
-            decode_responses=True
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+            retry_on_timeout=True
         )
+        self.redis = redis.Redis(connection_pool=self.pool)
+        self.codec = CacheCodec(settings.CACHE_COMPRESSION_THRESHOLD)
         self.default_ttl = 3600  # 1 hour
+        self.watermark_key = "sync:watermark"
+        
+        # Search keys embed the catalog version; a content change bumps the
+        # version and old generations simply expire through their TTL
+        self.version_key = "search:version"
+        self.catalog_hash_key = "search:catalog_hash"
+        self._version: Optional[int] = None
         
-    async def get_search_results(self, query: str) -> Optional[List[Dict]]:
-        """Get cached search results."""
+        # L1: deserialized results for hot queries, never leaves the process.
+        # Redis stays the shared L2 across replicas.
+        self.local = LRUCache(settings.LOCAL_CACHE_SIZE, settings.LOCAL_CACHE_TTL)
+    
+    async def _get_version(self) -> int:
+        """Get the current catalog version, loading it from Redis once."""
+        if self._version is None:
+            self._version = int(await self.redis.get(self.version_key) or 0)
+        return self._version
+    
+    async def _search_key(self, query: str) -> str:
+        """Build a versioned key; queries should already be normalized."""
+        return f"search:v{await self._get_version()}:{query}"
+    
+    async def update_catalog_version(self, catalog_hash: str) -> int:
+        """Bump the catalog version if the synced deal set's content changed.
+        
+        The stored hash and version are checked and bumped in one WATCH
+        transaction, and the version is always re-read from Redis, so a
+        replica whose peer already bumped it moves to the new version too.
+        """
         try:
-            cache_key = f"search:{query}"
-            cached_data = await self.redis.get(cache_key)
-            return json.loads(cached_data) if cached_data else None
+            async with self.redis.pipeline(transaction=True) as pipe:
+                while True:
+                    try:
+                        await pipe.watch(self.catalog_hash_key, self.version_key)
+                        stored_hash, stored_version = await pipe.mget(
+                            self.catalog_hash_key, self.version_key
+                        )
+                        if stored_hash == catalog_hash.encode():
+                            await pipe.reset()
+                            version, bumped = int(stored_version or 0), False
+                        else:
+                            pipe.multi()
+                            pipe.incr(self.version_key)
+                            pipe.set(self.catalog_hash_key, catalog_hash)
+                            version, _ = await pipe.execute()
+                            bumped = True
+                        break
+                    except redis.WatchError:
+                        continue  # another replica bumped it first, look again
+            
+            if bumped:
+                logger.info(f"Catalog changed, search cache now at version {version}")
+            self._use_version(int(version))
+            return self._version
+        except Exception as e:
+            # L1 entries may belong to the catalog being replaced; drop them
+            # rather than serve them under a version that could not move
+            self.local.clear()
+            logger.error(f"Failed to update catalog version: {str(e)}", exc_info=True)
+            raise CacheError(f"Catalog version update failed: {str(e)}")
+    
+    def _use_version(self, version: int) -> None:
+        """Switch to a catalog version, dropping L1 entries of any other one."""
+        if version != self._version:
+            self._version = version
+            self.local.clear()
+        
+    async def get_search_results(self, query: str) -> Optional[SearchCursor]:
+        """Get a cached search result cursor."""
+        try:
+            with metrics.timer("cache_get"):
+                cache_key = await self._search_key(query)
+                results = self.local.get(cache_key)
+                if results is not None:
+                    metrics.increment("cache_hits_total", tier="local")
+                    return results
+                metrics.increment("cache_misses_total", tier="local")
+                
+                cached_data = await self.redis.get(cache_key)
+                if not cached_data:
+                    metrics.increment("cache_misses_total", tier="redis")
+                    return None
+                metrics.increment("cache_hits_total", tier="redis")
+                
+                results = SearchCursor.decode(self.codec.decode(cached_data))
+                if results is not None:
+                    self.local.set(cache_key, results)
+                return results
         except Exception as e:
             logger.error(f"Cache retrieval error: {str(e)}", exc_info=True)
             return None
+    
+    async def get_many_search_results(self, queries: List[str]) -> Dict[str, SearchCursor]:
+        """Look up several queries at once: L1 first, then one MGET for the rest.
+        
+        Returns only the queries that were cached.
+        """
+        try:
+            with metrics.timer("cache_get_many"):
+                version = await self._get_version()
+                found: Dict[str, SearchCursor] = {}
+                missing: Dict[str, str] = {}
+                for query in queries:
+                    cache_key = f"search:v{version}:{query}"
+                    results = self.local.get(cache_key)
+                    if results is not None:
+                        found[query] = results
+                    else:
+                        missing[cache_key] = query
+                
+                if missing:
+                    values = await self.redis.mget(list(missing))
+                    for cache_key, cached_data in zip(missing, values):
+                        if cached_data:
+                            results = SearchCursor.decode(self.codec.decode(cached_data))
+                            if results is not None:
+                                self.local.set(cache_key, results)
+                                found[missing[cache_key]] = results
+                return found
+        except Exception as e:
+            logger.error(f"Batch cache retrieval error: {str(e)}", exc_info=True)
+            return {}
             
-    async def cache_search_results(self, query: str, results: List[Dict], ttl: int = None) -> None:
-        """Cache search results."""
+    async def cache_search_results(self, query: str, results: SearchCursor, ttl: int = None) -> None:
+        """Cache a search result cursor."""
         try:
-            cache_key = f"search:{query}"
-            await self.redis.set(
-                cache_key,
-                json.dumps(results),
-                ex=ttl or self.default_ttl
-            )
+            with metrics.timer("cache_set"):
+                cache_key = await self._search_key(query)
+                self.local.set(cache_key, results)
+                await self.redis.set(
+                    cache_key,
+                    self.codec.encode(results.encode()),
+                    ex=ttl or self.default_ttl
+                )
         except Exception as e:
             logger.error(f"Cache storage error: {str(e)}", exc_info=True) 
-            
-    async def clear_search_cache(self) -> None:
-        """Clear all search caches."""
+    
+    async def get_sync_watermark(self) -> Optional[str]:
+        """Get the last Notion edit time covered by a successful sync."""
+        try:
+            watermark = await self.redis.get(self.watermark_key)
+            return watermark.decode() if watermark else None
+        except Exception as e:
+            logger.error(f"Watermark retrieval error: {str(e)}", exc_info=True)
+            return None
+    
+    async def set_sync_watermark(self, watermark: str) -> None:
+        """Persist the Notion high-water mark for incremental syncs."""
         try:
-            pattern = "search:*"
-            cursor = 0
-            while True:
-                cursor, keys = await self.redis.scan(cursor, pattern)
-                if keys:
-                    await self.redis.delete(*keys)
-                if cursor == 0:
-                    break
-            logger.info("Search cache cleared successfully")
+            await self.redis.set(self.watermark_key, watermark)
         except Exception as e:
-            logger.error(f"Failed to clear search cache: {str(e)}", exc_info=True)
-            raise CacheError(f"Cache clear failed: {str(e)}")
+            logger.error(f"Watermark storage error: {str(e)}", exc_info=True)
 
     async def close(self):
         """Close Redis connections."""
         try:
-            await self.redis.close()
+            await self.redis.aclose()
+            await self.pool.disconnect()
         except Exception as e:
             logger.error(f"Error closing Redis connection: {str(e)}")
 
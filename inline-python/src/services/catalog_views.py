@@ -0,0 +1,136 @@
+"""Precomputed deal lists for the most common inline queries."""
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .query_normalizer import normalize_query
+
+# Rebuild from scratch instead of patching when more than 1/N of the deals changed
+REBUILD_FRACTION = 8
+
+def view_keys(deal: Dict) -> FrozenSet[str]:
+    """Normalized geo, partner and source names whose views list this deal."""
+    values = [deal.get("geo") or "", deal.get("partner") or "", *(deal.get("sources") or ())]
+    return frozenset(filter(None, map(normalize_query, map(str, values))))
+
+def _rank(deal: Dict) -> Tuple[str, str]:
+    # Sorted descending: most recently edited first, ties by id
+    return deal.get("last_updated") or "", deal["id"]
+
+def _position(deal_ids: List[str], rank: Tuple[str, str], ranks: Dict[str, Tuple[str, str]]) -> int:
+    """Index of the first deal ranked at or below ``rank`` in a descending list."""
+    low, high = 0, len(deal_ids)
+    while low < high:
+        middle = (low + high) // 2
+        if ranks[deal_ids[middle]] > rank:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+class CatalogViews:
+    """Deal ids per geo, partner and source, plus a default list, sorted ahead of time.
+
+    An empty query is answered by ``default`` (every deal, most recently
+    edited first) and a query naming a geo, partner or source exactly,
+    after normalization (``DE``, ``uk``, ``fb``, ``Sutra``), by that
+    value's view in the same order. Lookups are a dict access and a slice.
+    A view lists exact matches only, so callers check it against
+    ``DealIndex.exact_count`` before serving it: "de" also finds Deum.
+
+    Like ``DealIndex``, instances are never mutated: ``updated`` returns a
+    new instance that re-sorts only the views touched by changed deals and
+    shares every other view with the old one.
+    """
+
+    def __init__(self, deals: Dict[str, Dict]):
+        self._ranks: Dict[str, Tuple[str, str]] = {
+            deal_id: _rank(deal) for deal_id, deal in deals.items()
+        }
+        self._keys: Dict[str, FrozenSet[str]] = {
+            deal_id: view_keys(deal) for deal_id, deal in deals.items()
+        }
+
+        # Views are filled in default order, so only the default list is sorted
+        self.default: Tuple[str, ...] = self._sorted(deals)
+        ordered: Dict[str, List[str]] = {}
+        for deal_id in self.default:
+            for key in self._keys[deal_id]:
+                if key in ordered:
+                    ordered[key].append(deal_id)
+                else:
+                    ordered[key] = [deal_id]
+        self._views: Dict[str, Tuple[str, ...]] = {
+            key: tuple(deal_ids) for key, deal_ids in ordered.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def _sorted(self, deal_ids: Iterable[str]) -> Tuple[str, ...]:
+        return tuple(sorted(deal_ids, key=self._ranks.__getitem__, reverse=True))
+
+    def lookup(self, query: str) -> Optional[Tuple[str, ...]]:
+        """Precomputed result ids for a normalized query, None if it has no view."""
+        if not query:
+            return self.default
+        return self._views.get(query)
+
+    def updated(
+        self,
+        deals: Dict[str, Dict],
+        changed: Iterable[str],
+        removed: Iterable[str] = ()
+    ) -> "CatalogViews":
+        """Views over ``deals`` after the given deals were upserted or removed."""
+        touched = set(changed) | set(removed)
+        if len(touched) * REBUILD_FRACTION > len(deals):
+            return CatalogViews(deals)
+
+        views = CatalogViews.__new__(CatalogViews)
+        views._ranks = dict(self._ranks)
+        for deal_id in touched:
+            if deal_id in deals:
+                views._ranks[deal_id] = _rank(deals[deal_id])
+            else:
+                views._ranks.pop(deal_id, None)
+        views._keys = dict(self._keys)
+        views._views = dict(self._views)
+
+        dirty: Set[str] = set()
+        for deal_id in touched:
+            # The edit time changed too, so every view of the deal is re-sorted
+            dirty |= views._keys.pop(deal_id, frozenset())
+            if deal_id in deals:
+                views._keys[deal_id] = view_keys(deals[deal_id])
+                dirty |= views._keys[deal_id]
+
+        for key in dirty:
+            deal_ids = self._resorted(views, self._views.get(key, ()), touched, key)
+            if deal_ids:
+                views._views[key] = deal_ids
+            else:
+                views._views.pop(key, None)
+        views.default = self._resorted(views, self.default, touched)
+        return views
+
+    def _resorted(
+        self,
+        views: "CatalogViews",
+        view: Tuple[str, ...],
+        touched: Set[str],
+        key: Optional[str] = None
+    ) -> Tuple[str, ...]:
+        """Move the touched deals of a view (the default list without ``key``) to their new positions.
+
+        Each deal is found and re-inserted by binary search on its old and
+        new rank, so the cost grows with the number of changed deals, not
+        with the size of the view.
+        """
+        deal_ids = list(view)
+        for deal_id in touched:
+            if deal_id in self._ranks and (key is None or key in self._keys[deal_id]):
+                del deal_ids[_position(deal_ids, self._ranks[deal_id], self._ranks)]
+        for deal_id in touched:
+            if deal_id in views._ranks and (key is None or key in views._keys[deal_id]):
+                rank = views._ranks[deal_id]
+                deal_ids.insert(_position(deal_ids, rank, views._ranks), deal_id)
+        return tuple(deal_ids)
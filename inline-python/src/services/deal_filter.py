@@ -0,0 +1,266 @@
+"""Structured filters parsed out of inline queries.
+
+Inline queries may mix free text with a small filter language::
+
+    geo:DE,AT src:fb lang:german funnel:"Quantum AI" partner:sutra
+    model:cpl cpa>1000 crg<=10 cpl:15-25 sort:-cpa
+
+Filters become a hashable ``DealFilter`` that compiles to a Typesense
+``filter_by`` clause and can also be checked against deal dicts locally.
+Whatever is left over is searched as free text.
+"""
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+from functools import lru_cache
+import operator
+import re
+
+from .deal_index import tokenize
+from .aliases import GEO_ALIASES, LANGUAGE_ALIASES, SOURCE_ALIASES, alternatives
+
+# Numeric price fields carried on every deal; CRG is in percent
+PRICE_FIELDS = ("cpa", "crg", "cpl")
+
+# Pricing models derived from which prices a deal has
+PRICING_MODELS = ("cpa_crg", "cpa", "cpl", "cpa_crg_or_cpl", "none")
+
+# model: values and the pricing models they select
+MODEL_ALIASES: Dict[str, Tuple[str, ...]] = {
+    **{model: (model,) for model in PRICING_MODELS},
+    "cpl": ("cpl", "cpa_crg_or_cpl"),
+    "crg": ("cpa_crg", "cpa_crg_or_cpl"),
+    "hybrid": ("cpa_crg", "cpa_crg_or_cpl"),
+    "cpa": ("cpa", "cpa_crg", "cpa_crg_or_cpl"),
+}
+
+# Filter key -> (document field, exact match)
+FACET_KEYS: Dict[str, Tuple[str, bool]] = {
+    "geo": ("geo", True),
+    "src": ("sources", False),
+    "source": ("sources", False),
+    "lang": ("language", False),
+    "language": ("language", False),
+    "funnel": ("funnels", False),
+    "partner": ("partner", False),
+    "model": ("pricing_model", True),
+}
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+}
+
+# Commas only ever group thousands (1,300); "." is the decimal mark
+NUMBER = r"(?:\d{1,3}(?:,\d{3})+(?!\d)|\d+)(?:\.\d+)?"
+NUMBER_PATTERN = re.compile(NUMBER)
+PRICE_CONDITION_PATTERN = re.compile(
+    rf"(?<![\w:])(cpa|crg|cpl)\s*(<=|>=|<|>|=)\s*({NUMBER})(?![.,]?\d)%?(?!\w)",
+    re.IGNORECASE
+)
+PRICE_RANGE_PATTERN = re.compile(
+    rf"(?<!\S)(cpa|crg|cpl):({NUMBER})%?(?:-({NUMBER})%?)?(?!\S)",
+    re.IGNORECASE
+)
+FACET_PATTERN = re.compile(
+    rf"(?<!\S)({'|'.join(FACET_KEYS)}):(\"[^\"]*\"|\S+)",
+    re.IGNORECASE
+)
+SORT_PATTERN = re.compile(r"(?<![\w:])sort:(-?)(cpa|crg|cpl)(?!\w)", re.IGNORECASE)
+# Keys typed without a value yet, e.g. "geo:" mid-keystroke
+DANGLING_KEY_PATTERN = re.compile(
+    rf"(?<!\S)(?:{'|'.join(FACET_KEYS)}|cpa|crg|cpl|sort):(?!\S)",
+    re.IGNORECASE
+)
+
+def pricing_model(cpa: Optional[float], crg: Optional[float], cpl: Optional[float]) -> str:
+    """Classify a deal by the prices it carries."""
+    hybrid = cpa is not None and crg is not None
+    if hybrid and cpl is not None:
+        return "cpa_crg_or_cpl"
+    if hybrid:
+        return "cpa_crg"
+    if cpl is not None:
+        return "cpl"
+    if cpa is not None:
+        return "cpa"
+    return "none"
+
+def parse_number(text: str) -> float:
+    """Parse 1,300 / 1300 / 2.5; anything else, such as 2,5, is rejected."""
+    if not NUMBER_PATTERN.fullmatch(text):
+        raise ValueError(f"Not a number: {text!r}")
+    return float(text.replace(",", ""))
+
+def _quote(value: str) -> str:
+    """Backtick-quote a filter value containing separators."""
+    return f"`{value}`" if re.search(r"[\s,()&|]", value) else value
+
+class Condition(NamedTuple):
+    """A numeric comparison such as ``cpa > 1000``."""
+    field: str
+    op: str
+    value: float
+
+    def matches(self, deal: Dict) -> bool:
+        actual = deal.get(self.field)
+        return actual is not None and OPERATORS[self.op](actual, self.value)
+
+    def key(self) -> str:
+        return f"{self.field}{self.op}{self.value:g}"
+
+    def to_filter_by(self) -> str:
+        op = ":=" if self.op == "=" else f":{self.op}"
+        return f"{self.field}{op}{self.value:g}"
+
+class FacetCondition(NamedTuple):
+    """A deal field that must hold one of several values.
+
+    Exact conditions compare whole values (GEO codes, pricing models);
+    the others match when a value's words all appear in the field, like
+    Typesense's non-exact ``field:[...]`` filter.
+    """
+    field: str
+    values: Tuple[str, ...]
+    exact: bool
+
+    def matches(self, deal: Dict) -> bool:
+        actual = deal.get(self.field)
+        elements = actual if isinstance(actual, list) else [actual or ""]
+        if self.exact:
+            return any(element in self.values for element in elements)
+        element_tokens = [set(tokenize(element)) for element in elements]
+        return any(
+            set(tokenize(value)) <= tokens
+            for value in self.values
+            for tokens in element_tokens
+        )
+
+    def key(self) -> str:
+        return f"{self.field}:{'=' if self.exact else ''}{','.join(self.values)}"
+
+    def to_filter_by(self) -> str:
+        values = ",".join(_quote(value) for value in self.values)
+        return f"{self.field}:{'=' if self.exact else ''}[{values}]"
+
+class DealFilter(NamedTuple):
+    """Conditions every result must meet, plus an optional price ordering.
+
+    Hashable, so it can be part of memo and cache keys.
+    """
+    conditions: Tuple[Union[Condition, FacetCondition], ...] = ()
+    sort: Optional[Tuple[str, bool]] = None  # (field, descending)
+
+    def __bool__(self) -> bool:
+        return bool(self.conditions or self.sort)
+
+    def matches(self, deal: Dict) -> bool:
+        return all(condition.matches(deal) for condition in self.conditions)
+
+    def sort_key(self, deal: Dict) -> Tuple[bool, float]:
+        """Order deals by the sort field, deals without a price last."""
+        field, descending = self.sort
+        value = deal.get(field)
+        if value is None:
+            return (True, 0.0)
+        return (False, -value if descending else value)
+
+    def cache_key(self) -> str:
+        """Canonical text form, stable across spellings of the same filter."""
+        parts = sorted(condition.key() for condition in self.conditions)
+        if self.sort:
+            field, descending = self.sort
+            parts.append(f"sort:{'-' if descending else ''}{field}")
+        return " ".join(parts)
+
+    def to_filter_by(self) -> str:
+        return compile_filter_by(self)
+
+    def to_sort_by(self) -> Optional[str]:
+        if not self.sort:
+            return None
+        field, descending = self.sort
+        return f"{field}:{'desc' if descending else 'asc'},_text_match:desc"
+
+@lru_cache(maxsize=4096)
+def compile_filter_by(deal_filter: DealFilter) -> str:
+    """Compile a filter to a Typesense ``filter_by`` expression."""
+    return " && ".join(condition.to_filter_by() for condition in deal_filter.conditions)
+
+def _facet_values(key: str, raw: str) -> Tuple[str, ...]:
+    """Split and canonicalize the comma-separated values of a facet filter.
+
+    Aliased values also accept every other spelling of themselves, since
+    deals keep whatever Notion stores: ``src:fb`` matches FB and Facebook.
+    """
+    values = []
+    for value in raw.strip('"').split(","):
+        value = " ".join(value.split())
+        if not value:
+            continue
+        lowered = value.lower()
+        if key == "geo":
+            values.extend(geo.upper() for geo in alternatives(GEO_ALIASES.get(lowered, lowered)))
+        elif key == "model":
+            values.extend(MODEL_ALIASES.get(lowered, (lowered,)))
+        elif key in ("src", "source"):
+            values.extend(alternatives(SOURCE_ALIASES.get(lowered, lowered)))
+        elif key in ("lang", "language"):
+            values.extend(alternatives(LANGUAGE_ALIASES.get(lowered, lowered)))
+        else:
+            values.append(lowered)
+    return tuple(sorted(set(values)))
+
+@lru_cache(maxsize=4096)
+def parse_query(query: str) -> Tuple[str, DealFilter]:
+    """Split the filter language off an inline query.
+
+    Returns the remaining free text and the parsed filter. Without an
+    explicit ``sort:cpa`` / ``sort:-cpa`` token, price-filtered results are
+    ordered by the first constrained field: highest first for lower bounds
+    and ranges, lowest first for upper bounds.
+    """
+    conditions: List[Union[Condition, FacetCondition]] = []
+    facets: Dict[str, FacetCondition] = {}
+
+    for match in FACET_PATTERN.finditer(query):
+        key, raw = match.group(1).lower(), match.group(2)
+        field, exact = FACET_KEYS[key]
+        values = _facet_values(key, raw)
+        if not values:
+            continue
+        if field in facets:
+            # Repeated keys widen the filter, e.g. "geo:de geo:at"
+            values = tuple(sorted(set(facets[field].values) | set(values)))
+        facets[field] = FacetCondition(field, values, exact)
+    conditions.extend(facets[field] for field in sorted(facets))
+
+    for match in PRICE_RANGE_PATTERN.finditer(query):
+        field, low, high = match.group(1).lower(), match.group(2), match.group(3)
+        if high is None:
+            conditions.append(Condition(field, "=", parse_number(low)))
+        else:
+            low, high = sorted((parse_number(low), parse_number(high)))
+            conditions.append(Condition(field, ">=", low))
+            conditions.append(Condition(field, "<=", high))
+
+    for match in PRICE_CONDITION_PATTERN.finditer(query):
+        field, op, value = match.groups()
+        conditions.append(Condition(field.lower(), op, parse_number(value)))
+
+    sort = None
+    sort_match = SORT_PATTERN.search(query)
+    if sort_match:
+        sort = (sort_match.group(2).lower(), bool(sort_match.group(1)))
+    else:
+        for condition in conditions:
+            if isinstance(condition, Condition) and condition.op != "=":
+                sort = (condition.field, condition.op.startswith(">"))
+                break
+
+    text = query
+    for pattern in (FACET_PATTERN, PRICE_RANGE_PATTERN, PRICE_CONDITION_PATTERN,
+                    SORT_PATTERN, DANGLING_KEY_PATTERN):
+        text = pattern.sub(" ", text)
+    return " ".join(text.split()), DealFilter(tuple(conditions), sort)
@@ -0,0 +1,254 @@
+"""In-process deal search index."""
+from typing import TYPE_CHECKING, List, Dict, Iterable, Optional, Set, Tuple
+from bisect import bisect_left
+import heapq
+import re
+
+from .aliases import FIELD_ALIASES
+
+if TYPE_CHECKING:
+    from .deal_filter import DealFilter
+
+# Searched fields, in the same priority order as Typesense's query_by
+SEARCH_FIELDS = ("partner", "sources", "geo", "language", "funnels")
+FIELD_WEIGHTS = {field: len(SEARCH_FIELDS) - i for i, field in enumerate(SEARCH_FIELDS)}
+
+# Match quality per query token
+EXACT, PREFIX, TYPO = 3, 2, 1
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Memoized queries per index instance
+MAX_MEMOIZED_QUERIES = 4096
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def _field_text(deal: Dict, field: str) -> str:
+    value = deal.get(field) or ""
+    return " ".join(value) if isinstance(value, list) else str(value)
+
+def field_tokens(deal: Dict, field: str) -> List[str]:
+    """Tokens of one deal field, plus the canonical words of abbreviations in it.
+
+    A source stored as "FB" yields ``fb`` and ``facebook``, so it matches
+    both what the user typed and the canonical query ``normalize_query``
+    turns it into.
+    """
+    tokens = tokenize(_field_text(deal, field))
+    aliases = FIELD_ALIASES.get(field)
+    if aliases:
+        tokens += [word for token in tokens if token in aliases for word in aliases[token].split()]
+    return tokens
+
+def deal_tokens(deal: Dict) -> Set[str]:
+    """All searchable tokens of a deal."""
+    return {token for field in SEARCH_FIELDS for token in field_tokens(deal, field)}
+
+def matches_query(deal: Dict, query: str) -> bool:
+    """Check a deal against a query exactly: all tokens present, last one as a prefix."""
+    tokens = tokenize(query)
+    if not tokens:
+        return True
+    vocabulary = deal_tokens(deal)
+    *complete, last = tokens
+    return (
+        all(token in vocabulary for token in complete)
+        and any(token.startswith(last) for token in vocabulary)
+    )
+
+def _max_typos(token: str) -> int:
+    """Typo budget per token, mirroring Typesense's defaults."""
+    if len(token) >= 7:
+        return 2
+    if len(token) >= 4:
+        return 1
+    return 0
+
+def _within_distance(a: str, b: str, max_distance: int) -> bool:
+    """Bounded edit distance check, counting a transposition as one typo."""
+    if abs(len(a) - len(b)) > max_distance:
+        return False
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            )
+            if before and i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > max_distance:
+            return False
+        before, previous = previous, current
+    return previous[-1] <= max_distance
+
+class DealIndex:
+    """Immutable inverted index over synced deal dicts.
+
+    Answers as-you-type queries without a network round trip. Every query
+    token must match a field token exactly, as a prefix (last token only) or
+    within a small typo budget. If nothing matches all tokens, tokens are
+    dropped from the right, like Typesense's ``drop_tokens_threshold``.
+    Hits are ranked by tokens matched, match quality and field priority,
+    after the price order of a ``DealFilter`` if it has one.
+
+    Build a new instance after each sync and swap the reference; instances
+    are never mutated so readers need no locking.
+    """
+
+    def __init__(self, deals: Iterable[Dict]):
+        self.deals: List[Dict] = list(deals)
+        self.by_id: Dict[str, Dict] = {deal["id"]: deal for deal in self.deals}
+        # token -> {deal position: best field weight}
+        self._postings: Dict[str, Dict[int, int]] = {}
+
+        for position, deal in enumerate(self.deals):
+            for field in SEARCH_FIELDS:
+                weight = FIELD_WEIGHTS[field]
+                for token in field_tokens(deal, field):
+                    postings = self._postings.setdefault(token, {})
+                    if postings.get(position, 0) < weight:
+                        postings[position] = weight
+
+        self._vocabulary: List[str] = sorted(self._postings)
+        self._by_length: Dict[int, List[str]] = {}
+        for token in self._vocabulary:
+            self._by_length.setdefault(len(token), []).append(token)
+        self._memo: Dict[Tuple[str, Optional[int], Optional["DealFilter"]], List[Dict]] = {}
+        self._counts: Dict[str, Optional[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.deals)
+
+    def exact_count(self, query: str) -> Optional[int]:
+        """Number of deals a query matches when every token matches exactly.
+
+        Returns None when the search could match more loosely: a token is
+        not indexed as typed (typo matching applies), or the last token is
+        also the prefix of another indexed token ("de" of "deum"). Views
+        precomputed for a query are only complete when this count agrees
+        with them.
+        """
+        query = query.lower()
+        if query in self._counts:
+            return self._counts[query]
+
+        count: Optional[int] = None
+        tokens = tokenize(query)
+        if tokens and all(token in self._postings for token in tokens):
+            last = tokens[-1]
+            following = bisect_left(self._vocabulary, last) + 1
+            if following == len(self._vocabulary) or not self._vocabulary[following].startswith(last):
+                postings = sorted((self._postings[token] for token in tokens), key=len)
+                positions = set(postings[0])
+                for other in postings[1:]:
+                    positions.intersection_update(other)
+                count = len(positions)
+
+        if len(self._counts) >= MAX_MEMOIZED_QUERIES:
+            self._counts.clear()
+        self._counts[query] = count
+        return count
+
+    def _expand(self, token: str, prefix: bool) -> List[Tuple[str, int]]:
+        """Find indexed tokens matching a query token, with match quality."""
+        if token in self._postings:
+            matches = [(token, EXACT)]
+        else:
+            matches = []
+
+        if prefix:
+            vocabulary = self._vocabulary
+            i = bisect_left(vocabulary, token)
+            while i < len(vocabulary) and vocabulary[i].startswith(token):
+                if vocabulary[i] != token:
+                    matches.append((vocabulary[i], PREFIX))
+                i += 1
+
+        if not matches:
+            max_typos = _max_typos(token)
+            for length in range(len(token) - max_typos, len(token) + max_typos + 1):
+                for candidate in self._by_length.get(length, ()):
+                    if _within_distance(token, candidate, max_typos):
+                        matches.append((candidate, TYPO))
+        return matches
+
+    def _match_token(self, token: str, prefix: bool) -> Dict[int, Tuple[int, int]]:
+        """Map deal positions to (match quality, field weight) for one token."""
+        scores: Dict[int, Tuple[int, int]] = {}
+        for candidate, quality in self._expand(token, prefix):
+            for position, weight in self._postings[candidate].items():
+                score = (quality, weight)
+                if scores.get(position, (0, 0)) < score:
+                    scores[position] = score
+        return scores
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = 10,
+        deal_filter: Optional["DealFilter"] = None
+    ) -> List[Dict]:
+        """Search deals, best match first."""
+        deal_filter = deal_filter or None
+        key = (query.lower(), limit, deal_filter)
+        results = self._memo.get(key)
+        if results is None:
+            results = self._search(key[0], limit, deal_filter)
+            if len(self._memo) >= MAX_MEMOIZED_QUERIES:
+                self._memo.clear()
+            self._memo[key] = results
+        return results
+
+    def _search(self, query: str, limit: Optional[int], deal_filter: Optional["DealFilter"]) -> List[Dict]:
+        """Run an uncached search."""
+        tokens = tokenize(query)
+        if not tokens:
+            if deal_filter is None:
+                return self.deals[:limit]
+            deals = [deal for deal in self.deals if deal_filter.matches(deal)]
+            if deal_filter.sort:
+                deals.sort(key=deal_filter.sort_key)
+            return deals[:limit]
+
+        token_scores = [
+            self._match_token(token, prefix=(i == len(tokens) - 1))
+            for i, token in enumerate(tokens)
+        ]
+
+        # Drop tokens from the right until something matches them all
+        for keep in range(len(token_scores), 0, -1):
+            kept = sorted(token_scores[:keep], key=len)
+            candidates = set(kept[0])
+            for scores in kept[1:]:
+                candidates.intersection_update(scores)
+                if not candidates:
+                    break
+            if candidates and deal_filter is not None:
+                candidates = {
+                    position for position in candidates
+                    if deal_filter.matches(self.deals[position])
+                }
+            if candidates:
+                break
+        else:
+            return []
+
+        def rank(position: int) -> Tuple:
+            quality = sum(scores[position][0] for scores in kept)
+            weight = sum(scores[position][1] for scores in kept)
+            if deal_filter is not None and deal_filter.sort:
+                return (deal_filter.sort_key(self.deals[position]), -quality, -weight, position)
+            return (-quality, -weight, position)
+
+        if limit is None:
+            ranked = sorted(candidates, key=rank)
+        else:
+            ranked = heapq.nsmallest(limit, candidates, key=rank)
+        return [self.deals[position] for position in ranked]
@@ -0,0 +1,604 @@
+"""Normalization of raw partner deal messages.
+
+Partners send deals as loosely formatted text, e.g.::
+
+    Partner: Sutra
+    FR 1000+9% doing 10% ByteToken360 - FB GG. until 5% wrong number.
+
+The rules in ``Deal Formatting.md`` turn each deal into one record::
+
+    TIER1-Sutra-FR-French-Facebook|Google-cpa_crg-1000-0.09-&-ByteToken360-10-0.05
+
+Parsing is line based and driven by precompiled patterns and lookup
+tables, so pasted backlogs of thousands of deals normalize in a fraction
+of a second. Input is consumed lazily and deals are yielded one partner
+section at a time.
+"""
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+import hashlib
+import re
+import pytz
+
+from .deal_filter import NUMBER, parse_number, pricing_model
+
+MISSING = "&"
+DEFAULT_LANGUAGE = "Native"
+
+# ISO 3166-1 alpha-2 codes, plus UK as partners write it
+ISO_COUNTRIES = frozenset(code.upper() for code in pytz.country_names) | {"UK"}
+
+# Multi-country codes partners use as a GEO
+REGION_CODES = frozenset({"EU", "GCC", "LATAM", "ASIA", "CIS", "WW"})
+
+# Spellings of countries that are not their ISO code
+GEO_SYNONYMS: Dict[str, str] = {"UAE": "AE", "KSA": "SA"}
+
+REGIONS: Dict[str, Tuple[str, ...]] = {
+    "LATAM": ("AR", "BO", "BR", "CL", "CO", "CR", "CU", "DO", "EC", "SV", "GT", "HN", "MX",
+              "NI", "PA", "PY", "PE", "UY", "VE"),
+    "NORDICS": ("DK", "FI", "IS", "NO", "SE"),
+    "BALTICS": ("EE", "LV", "LT"),
+    "TIER1": ("AU", "CA", "FR", "DE", "IT", "JP", "NL", "NZ", "SG", "ES", "GB", "US", "EU"),
+}
+REGION_BY_GEO: Dict[str, str] = {geo: region for region, geos in REGIONS.items() for geo in geos}
+
+LANGUAGES: Dict[str, str] = {
+    "native": "Native", "nat": "Native",
+    "english": "English", "eng": "English", "en": "English",
+    "french": "French", "fr": "French", "fre": "French",
+    "spanish": "Spanish", "es": "Spanish", "esp": "Spanish",
+    "german": "German", "de": "German", "ger": "German",
+    "portuguese": "Portuguese", "pt": "Portuguese", "por": "Portuguese",
+    "italian": "Italian", "it": "Italian", "ita": "Italian",
+    "dutch": "Dutch", "nl": "Dutch", "dut": "Dutch",
+    "russian": "Russian", "ru": "Russian", "rus": "Russian",
+    "czech": "Czech", "cz": "Czech", "cs": "Czech",
+    "slovak": "Slovak", "sk": "Slovak",
+    "swedish": "Swedish", "se": "Swedish", "sv": "Swedish",
+    "polish": "Polish", "pl": "Polish",
+    "mandarin": "Mandarin",
+}
+
+# Languages partners run in a GEO when a deal names none; the formatting
+# rules give Sutra's FR deals as French, other partners' as Native
+PARTNER_LANGUAGES: Dict[str, Dict[str, str]] = {
+    "sutra": {"FR": "French"},
+}
+
+SOURCES: Dict[str, str] = {
+    "fb": "Facebook", "facebook": "Facebook",
+    "gg": "Google", "ggl": "Google", "google": "Google",
+    "msn": "MSN",
+    "ig": "Instagram", "instagram": "Instagram",
+    "na": "Native Ads", "nativeads": "Native Ads", "native": "Native Ads",
+    "taboola": "Taboola",
+    "bing": "Bing",
+    "tiktok": "TikTok",
+    "seo": "SEO",
+}
+
+# Source combinations kept as one source
+SOURCE_COMBINATIONS: Dict[str, str] = {
+    "google seo": "Google SEO",
+    "google display": "Google Display",
+    "google dv 360": "Google DV 360",
+    "native ads": "Native Ads",
+}
+
+# Words around source names that carry no meaning
+SOURCE_FILLERS = frozenset({"traffic", "only", "mostly", "and"})
+
+# Canonical spelling of funnel names given in a Funnel: field; funnels
+# mentioned in free text are kept exactly as written
+KNOWN_FUNNELS: Dict[str, str] = {
+    "oil profit": "Oil Profit",
+}
+
+# Line labels, with spaces and "+" removed, and the field they introduce
+LABELS: Dict[str, str] = {
+    "partner": "partner", "company": "partner",
+    "geo": "geo", "country": "geo",
+    "geos": "ignore", "cap": "ignore", "daily": "ignore",
+    "source": "source", "souce": "source", "sources": "source", "traffic": "source",
+    "funnel": "funnels", "funnels": "funnels", "landingpage": "funnels",
+    "price": "price", "cpacrg": "price", "cpa": "price", "crg": "price", "cpl": "cpl",
+    "model": "model", "mdoel": "model",
+    "cr": "cr",
+}
+
+# Cyrillic letters that look like Latin ones in country codes
+HOMOGLYPHS = str.maketrans("АВСЕНКМОРТХ", "ABCEHKMOPTX")
+
+LABEL_PATTERN = re.compile(r"^([A-Za-z][A-Za-z +]*?)\s*:\s*(.*)$")
+EMOJI_PATTERN = re.compile("[\U0001F000-\U0001FAFF☀-➿️‍]")
+DASH_PATTERN = re.compile(r"\s*[–—]\s*")
+GEO_TOKEN_PATTERN = re.compile(r"\s*([^\W\d_]+|[()/+,|\-&])")
+GLUED_GEO_PATTERN = re.compile(r"^([A-Z]{2})([a-z]{2,3})$")
+CPA_CRG_PATTERN = re.compile(
+    rf"(?<![\d.,])\$?\s*({NUMBER})(?!\s*%)\s*\$?\s*\+\s*\$?\s*({NUMBER})\s*%?"
+)
+CPL_PATTERN = re.compile(
+    rf"(?:\$?\s*({NUMBER})\s*\$?\s*cpl\b|\bcpl\b\s*:?\s*\$?\s*({NUMBER})\s*\$?)",
+    re.IGNORECASE
+)
+FLAT_PRICE_PATTERN = re.compile(rf"\$?\s*({NUMBER})\s*\$?")
+MONEY_PATTERN = re.compile(rf"/?\s*\$\s*{NUMBER}|/?\s*{NUMBER}\s*\$")
+CR_PATTERN = re.compile(
+    rf"\b(?:cr|doing)\b\s*[:\-]?\s*({NUMBER})\s*%?\s*(?:-\s*({NUMBER})\s*%?)?\+*",
+    re.IGNORECASE
+)
+CR_VALUE_PATTERN = re.compile(rf"({NUMBER})\s*%?(?:\s*-\s*({NUMBER}))?")
+CR_LINE_PATTERN = re.compile(r"^cr\s*[:\-]\s*\d", re.IGNORECASE)
+DEDUCTION_PATTERN = re.compile(
+    rf"until\s+({NUMBER})\s*%\s*(?:of\s+)?wrong\s+numbers?\.?", re.IGNORECASE
+)
+NO_INVALID_PATTERN = re.compile(r"\bno\s+invalid\s+leads?\b\.?", re.IGNORECASE)
+SPEAKING_PATTERN = re.compile(r"^([^\W\d_]+)\s+speaking\b", re.IGNORECASE)
+IGNORED_LINE_PATTERN = re.compile(r"^(?:daily|cap)\b", re.IGNORECASE)
+PRICE_HINT = re.compile(r"\d")
+SEGMENT_PATTERN = re.compile(r"\s+-\s*|\s*-\s+|\.\s+|\s*\|\s*")
+PARENTHESES_PATTERN = re.compile(r"\(([^)]*)\)")
+FUNNEL_SPLIT_PATTERN = re.compile(r"\s*[,/]\s*")
+FUNNEL_PREFIX_PATTERN = re.compile(r"^(?:mostly|mainly)\b[\s\-:]*", re.IGNORECASE)
+SOURCE_SPLIT_PATTERN = re.compile(r"\s*(?:[+,/&|]|\band\b)\s*", re.IGNORECASE)
+STRIP_CHARS = " -/.,:;!|"
+
+def _decimal(value: float) -> str:
+    """Format a fraction with at least two decimals: 0.1 -> 0.10, 0.025 -> 0.025."""
+    text = f"{value:.4f}".rstrip("0")
+    whole, _, fraction = text.partition(".")
+    return f"{whole}.{fraction.ljust(2, '0')}"
+
+def _unique(values: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(value for value in values if value))
+
+def region_for(geos: Iterable[str]) -> str:
+    """Region of a deal; mixed multi-geo deals count as TIER1 if any GEO is."""
+    regions = {REGION_BY_GEO.get("GB" if geo == "UK" else geo, "TIER3") for geo in geos}
+    if len(regions) == 1:
+        return regions.pop()
+    return "TIER1" if "TIER1" in regions else "TIER3"
+
+class ParsedDeal(NamedTuple):
+    """One normalized deal."""
+    region: str
+    partner: str
+    geos: Tuple[str, ...]
+    languages: Tuple[str, ...]
+    sources: Tuple[str, ...]
+    model: str  # cpa_crg, cpa or cpl
+    cpa: Optional[float]
+    crg: Optional[float]  # fraction, 0.09 for 9%
+    cpl: Optional[float]
+    funnels: Tuple[str, ...]
+    cr: Tuple[float, ...]  # one value or a (low, high) range, in percent
+    deduction_limit: Optional[float]  # fraction
+
+    def format(self) -> str:
+        """The dash-separated record from the formatting rules."""
+        def joined(values: Tuple[str, ...]) -> str:
+            return "|".join(values) or MISSING
+
+        fields = [
+            self.region,
+            self.partner or MISSING,
+            joined(self.geos),
+            joined(self.languages),
+            joined(self.sources),
+            self.model,
+            f"{round(self.cpa):d}" if self.cpa is not None else MISSING,
+            _decimal(self.crg) if self.crg is not None else MISSING,
+            f"{round(self.cpl):d}" if self.cpl is not None else MISSING,
+            joined(self.funnels),
+            "|".join(f"{value:g}" for value in self.cr) or MISSING,
+            _decimal(self.deduction_limit) if self.deduction_limit is not None else MISSING,
+        ]
+        return "-".join(fields)
+
+    def to_deals(self) -> List[Dict]:
+        """Deal dicts shaped like synced Notion deals, one per GEO, ready to index."""
+        crg = round(self.crg * 100, 2) if self.crg is not None else None
+        if self.cpl is not None and crg is not None:
+            price = f"{self.cpa:g}+{crg:g}% OR {self.cpl:g} CPL"
+        elif self.cpl is not None:
+            price = f"{self.cpl:g} CPL"
+        elif crg is not None:
+            price = f"{self.cpa:g}+{crg:g}%"
+        else:
+            price = f"{self.cpa:g} CPA"
+        sources = list(self.sources)
+        languages = list(self.languages)
+        funnels = list(self.funnels)
+        digest = hashlib.blake2b(self.format().encode("utf-8"), digest_size=8).hexdigest()
+
+        deals = []
+        for geo in self.geos or (MISSING,):
+            geo = "GB" if geo == "UK" else geo  # Stored as GB for the flag API
+            formatted_sources = f"[{', '.join(sources)}]" if sources else ""
+            display = f"{self.partner} {formatted_sources} {geo} {', '.join(languages)} {price}"
+            deals.append({
+                "id": f"parsed-{digest}-{geo.lower()}",
+                "partner": self.partner,
+                "sources": sources,
+                "geo": geo,
+                "language": languages,
+                "price": price,
+                "cpa": self.cpa,
+                "crg": crg,
+                "cpl": self.cpl,
+                "pricing_model": pricing_model(self.cpa, crg, self.cpl),
+                "funnels": funnels,
+                "formatted_display": " ".join(display.split()),
+                "formatted_funnels": f"Funnels: {', '.join(funnels)}" if funnels else "",
+                "last_updated": "",
+            })
+        return deals
+
+class _DealDraft:
+    """Fields collected for one deal while its lines are read."""
+
+    def __init__(self):
+        self.geos: List[str] = []
+        self.languages: List[str] = []
+        self.sources: List[str] = []
+        self.funnels: List[str] = []
+        self.cpa: Optional[float] = None
+        self.crg: Optional[float] = None
+        self.cpl: Optional[float] = None
+        self.flat_price: Optional[float] = None
+        self.model_hint: Optional[str] = None
+        self.cr: Tuple[float, ...] = ()
+        self.deduction_limit: Optional[float] = None
+
+    @property
+    def priced(self) -> bool:
+        return self.cpa is not None or self.cpl is not None or self.flat_price is not None
+
+    def add_geos(self, geos: List[str]) -> None:
+        """Add GEOs; a specific country list replaces a regional code like EU."""
+        if geos and self.geos and all(geo in REGION_CODES for geo in self.geos):
+            self.geos = []
+        self.geos.extend(geos)
+
+    def build(self, partner: str, default_language: str,
+              deduction_limit: Optional[float]) -> Optional[ParsedDeal]:
+        cpa, crg, cpl = self.cpa, self.crg, self.cpl
+        if cpa is not None and crg is not None:
+            model = "cpa_crg"
+        elif cpl is not None:
+            model = "cpl"
+        elif self.flat_price is not None and self.model_hint == "cpl":
+            model, cpl = "cpl", self.flat_price
+        elif self.flat_price is not None:
+            model, cpa = "cpa", self.flat_price
+        else:
+            return None
+
+        geos = _unique(self.geos)
+        if self.deduction_limit is not None:
+            deduction_limit = self.deduction_limit
+        languages = _unique(self.languages)
+        if not languages and default_language == DEFAULT_LANGUAGE:
+            partner_languages = PARTNER_LANGUAGES.get(partner.lower(), {})
+            if geos and all(geo in partner_languages for geo in geos):
+                languages = _unique(partner_languages[geo] for geo in geos)
+        return ParsedDeal(
+            region=region_for(geos),
+            partner=partner,
+            geos=geos,
+            languages=languages or (default_language,),
+            sources=_unique(self.sources),
+            model=model,
+            cpa=cpa,
+            crg=crg,
+            cpl=cpl,
+            funnels=_unique(self.funnels),
+            cr=self.cr,
+            deduction_limit=deduction_limit,
+        )
+
+def _clean_line(line: str) -> str:
+    line = EMOJI_PATTERN.sub("", line)
+    line = DASH_PATTERN.sub(" - ", line)
+    return line.strip()
+
+def _geo_token(word: str) -> Optional[str]:
+    code = word.translate(HOMOGLYPHS)
+    if not code.isupper():
+        return None
+    code = GEO_SYNONYMS.get(code, code)
+    if (len(code) == 2 and code in ISO_COUNTRIES) or code in REGION_CODES:
+        return code
+    return None
+
+def _leading_geos(text: str) -> Tuple[List[str], List[str], str, bool]:
+    """Read the GEOs and languages a line starts with.
+
+    Returns (geos, languages, rest of the line, whether a dash separated
+    them from the rest).
+    """
+    geos: List[str] = []
+    languages: List[str] = []
+    position = 0
+    dashed = False
+    for match in GEO_TOKEN_PATTERN.finditer(text):
+        if match.start() != position:
+            break
+        word = match.group(1)
+        geo = _geo_token(word)
+        glued = GLUED_GEO_PATTERN.match(word)
+        if geo:
+            geos.append(geo)
+        elif glued and _geo_token(glued.group(1)) and glued.group(2) in LANGUAGES:
+            geos.append(_geo_token(glued.group(1)))
+            languages.append(LANGUAGES[glued.group(2)])
+        elif word.lower() in LANGUAGES and (len(word) > 2 or not word.isupper()):
+            languages.append(LANGUAGES[word.lower()])
+        elif word in "()/+,|&":
+            pass
+        elif word == "-":
+            dashed = bool(geos)
+        else:
+            break
+        position = match.end()
+
+    if any(geo in REGION_CODES for geo in geos):
+        # "RU EU": a language code written in capitals ahead of a region
+        # "GCC (KW UAE OM)": the countries, not the region
+        first_region = next(i for i, geo in enumerate(geos) if geo in REGION_CODES)
+        for geo in geos[:first_region]:
+            if geo.lower() in LANGUAGES:
+                languages.append(LANGUAGES[geo.lower()])
+        geos = [geo for geo in geos[first_region:]]
+        countries = [geo for geo in geos if geo not in REGION_CODES]
+        if countries:
+            geos = countries
+
+    if not geos:
+        return [], [], text, False
+    return geos, languages, text[position:], dashed
+
+def _parse_sources(text: str) -> List[str]:
+    """Normalize a list of traffic sources; unknown words are dropped."""
+    sources = []
+    for part in SOURCE_SPLIT_PATTERN.split(text.lower()):
+        part = " ".join(part.replace(".", " ").split())
+        if not part:
+            continue
+        if part in SOURCE_COMBINATIONS:
+            sources.append(SOURCE_COMBINATIONS[part])
+            continue
+        sources.extend(SOURCES[word] for word in part.split() if word in SOURCES)
+    return sources
+
+def _only_sources(text: str) -> bool:
+    """Whether text names nothing but traffic sources."""
+    words = " ".join(SOURCE_SPLIT_PATTERN.split(text.lower().replace(".", " "))).split()
+    if not words:
+        return False
+    combined = " ".join(words)
+    if combined in SOURCE_COMBINATIONS:
+        return True
+    return all(word in SOURCES or word in SOURCE_FILLERS for word in words) and any(
+        word in SOURCES for word in words
+    )
+
+def _parse_funnels(text: str) -> List[str]:
+    text = PARENTHESES_PATTERN.sub(" ", text)
+    text = FUNNEL_PREFIX_PATTERN.sub("", text.strip(STRIP_CHARS))
+    return [
+        " ".join(funnel.split()).strip(STRIP_CHARS)
+        for funnel in FUNNEL_SPLIT_PATTERN.split(text)
+        if funnel.strip(STRIP_CHARS)
+    ]
+
+def _parse_cr(text: str) -> Tuple[float, ...]:
+    match = CR_VALUE_PATTERN.search(text)
+    if not match:
+        return ()
+    low, high = match.groups()
+    return (parse_number(low), parse_number(high)) if high else (parse_number(low),)
+
+def _parse_price(deal: _DealDraft, text: str, cpl_hint: bool = False) -> str:
+    """Take a price off the text, returning what is left."""
+    match = CPA_CRG_PATTERN.search(text)
+    if match:
+        deal.cpa, deal.crg = parse_number(match.group(1)), parse_number(match.group(2)) / 100
+        return text[:match.start()] + " " + text[match.end():]
+    match = CPL_PATTERN.search(text)
+    if match:
+        deal.cpl = parse_number(match.group(1) or match.group(2))
+        return text[:match.start()] + " " + text[match.end():]
+    if cpl_hint:
+        match = FLAT_PRICE_PATTERN.search(text)
+        if match:
+            deal.cpl = parse_number(match.group(1))
+            return text[:match.start()] + " " + text[match.end():]
+    return text
+
+def _parse_content(deal: _DealDraft, text: str, funnels_allowed: bool) -> None:
+    """Read prices, CR, deduction limit, sources and funnels from free text."""
+    text = _parse_price(deal, text)
+
+    match = CR_PATTERN.search(text)
+    if match:
+        low, high = match.groups()
+        deal.cr = (parse_number(low), parse_number(high)) if high else (parse_number(low),)
+        text = text[:match.start()] + " " + text[match.end():]
+
+    match = DEDUCTION_PATTERN.search(text)
+    if match:
+        deal.deduction_limit = parse_number(match.group(1)) / 100
+        text = text[:match.start()] + " " + text[match.end():]
+    elif NO_INVALID_PATTERN.search(text):
+        deal.deduction_limit = 0.0
+        text = NO_INVALID_PATTERN.sub(" ", text)
+
+    text = MONEY_PATTERN.sub(" ", text)
+    for inner in PARENTHESES_PATTERN.findall(text):
+        if _only_sources(inner):
+            deal.sources.extend(_parse_sources(inner))
+    text = PARENTHESES_PATTERN.sub(" ", text)
+
+    for segment in SEGMENT_PATTERN.split(text):
+        segment = segment.strip(STRIP_CHARS)
+        if not segment:
+            continue
+        if _only_sources(segment):
+            deal.sources.extend(_parse_sources(segment))
+        elif funnels_allowed and not deal.funnels:
+            deal.funnels.extend(_parse_funnels(segment))
+
+class _Section:
+    """Deals of one partner, emitted once the section ends."""
+
+    def __init__(self, partner: str = ""):
+        self.partner = partner
+        self.default_language = DEFAULT_LANGUAGE
+        self.deduction_limit: Optional[float] = None
+        self.drafts: List[Tuple[_DealDraft, str]] = []
+
+    def deals(self) -> Iterator[ParsedDeal]:
+        for draft, language in self.drafts:
+            deal = draft.build(self.partner, language, self.deduction_limit)
+            if deal:
+                yield deal
+
+class _Parser:
+    """Line-by-line state machine behind ``parse_deals``."""
+
+    def __init__(self):
+        self.section = _Section()
+        self.deal: Optional[_DealDraft] = None
+        self.paragraph: List[str] = []
+
+    def _finish_deal(self) -> None:
+        if self.deal is not None and self.deal.priced:
+            self.section.drafts.append((self.deal, self.section.default_language))
+        self.deal = None
+
+    def _new_deal(self) -> _DealDraft:
+        self._finish_deal()
+        self.deal = _DealDraft()
+        return self.deal
+
+    def end_paragraph(self) -> None:
+        """A blank line closes a priced deal; an unpriced paragraph is a note."""
+        if self.deal is not None and self.deal.priced:
+            self._finish_deal()
+        elif self.paragraph:
+            self._read_note(self.paragraph)
+            self.deal = None
+        self.paragraph = []
+
+    def _read_note(self, lines: List[str]) -> None:
+        """Section-wide settings such as "ENG speaking" or "all campaigns until 5% wrong number"."""
+        for line in lines:
+            match = SPEAKING_PATTERN.match(line)
+            if match and match.group(1).lower() in LANGUAGES:
+                self.section.default_language = LANGUAGES[match.group(1).lower()]
+            match = DEDUCTION_PATTERN.search(line)
+            if match:
+                self.section.deduction_limit = parse_number(match.group(1)) / 100
+
+    def end_section(self) -> Iterator[ParsedDeal]:
+        self.end_paragraph()
+        self._finish_deal()
+        yield from self.section.deals()
+
+    def feed(self, raw_line: str) -> Iterator[ParsedDeal]:
+        line = _clean_line(raw_line)
+        if not line:
+            self.end_paragraph()
+            return
+        self.paragraph.append(line)
+        if line.startswith(":"):
+            line = line.lstrip(": ")  # Label-less "key: value" lists
+
+        match = LABEL_PATTERN.match(line)
+        field = None
+        if match:
+            field = LABELS.get(re.sub(r"[\s+]", "", match.group(1).lower()))
+        if field == "partner":
+            yield from self.end_section()
+            self.section = _Section(match.group(2).strip(STRIP_CHARS))
+            self.paragraph = []
+            return
+        if field == "ignore" or IGNORED_LINE_PATTERN.match(line):
+            return
+        if field == "geo":
+            geos, languages, rest, dashed = _leading_geos(match.group(2))
+            self._read_geo_line(geos, languages, rest, dashed, always_new=True)
+            return
+        if field:
+            self._read_field(field, match.group(2))
+            return
+
+        if SPEAKING_PATTERN.match(line) and not PRICE_HINT.search(line):
+            return  # note, read when the paragraph ends
+        if not CR_LINE_PATTERN.match(line):
+            geos, languages, rest, dashed = _leading_geos(line)
+            if geos:
+                self._read_geo_line(geos, languages, rest, dashed)
+                return
+        deal = self.deal or self._new_deal()
+        _parse_content(deal, line, funnels_allowed=True)
+
+    def _read_geo_line(self, geos: List[str], languages: List[str], rest: str,
+                       dashed: bool, always_new: bool = False) -> None:
+        deal = self.deal
+        if deal is None or deal.priced or deal.funnels or (always_new and deal.geos):
+            deal = self._new_deal()
+        deal.add_geos(geos)
+        deal.languages.extend(languages)
+        had_price = deal.priced
+        rest = _parse_price(deal, rest)
+        if rest.strip(STRIP_CHARS) and (dashed or deal.priced != had_price):
+            _parse_content(deal, rest, funnels_allowed=True)
+        elif rest.strip(STRIP_CHARS):
+            _parse_content(deal, rest, funnels_allowed=False)
+
+    def _read_field(self, field: str, value: str) -> None:
+        deal = self.deal or self._new_deal()
+        if field == "source":
+            deal.sources.extend(_parse_sources(value))
+        elif field == "funnels":
+            deal.funnels.extend(
+                KNOWN_FUNNELS.get(funnel.lower(), funnel) for funnel in _parse_funnels(value)
+            )
+        elif field == "model":
+            value = value.lower()
+            deal.model_hint = "cpl" if "cpl" in value else "cpa_crg" if "crg" in value else "cpa"
+        elif field == "cr":
+            deal.cr = _parse_cr(value)
+        elif field in ("price", "cpl"):
+            cpl_hint = field == "cpl" or deal.model_hint == "cpl"
+            rest = _parse_price(deal, value, cpl_hint=cpl_hint)
+            if not deal.priced:
+                match = FLAT_PRICE_PATTERN.search(rest)
+                if match:
+                    deal.flat_price = parse_number(match.group(1))
+
+
+def parse_deals(text: Union[str, Iterable[str]]) -> Iterator[ParsedDeal]:
+    """Normalize every deal in raw partner text.
+
+    Accepts a string or any iterable of lines (e.g. an open file), which
+    is read lazily; deals are yielded as each partner section ends.
+    """
+    lines = text.splitlines() if isinstance(text, str) else text
+    parser = _Parser()
+    for line in lines:
+        yield from parser.feed(line)
+    yield from parser.end_section()
+
+def iter_deal_batches(text: Union[str, Iterable[str]], batch_size: int = 500) -> Iterator[List[Dict]]:
+    """Stream parsed deals as indexable deal dicts, ``batch_size`` at a time."""
+    batch: List[Dict] = []
+    for parsed in parse_deals(text):
+        batch.extend(parsed.to_deals())
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,20 @@
+"""Content fingerprints for synced deals."""
+from typing import Dict, Iterable
+import hashlib
+import json
+
+def deal_fingerprint(deal: Dict) -> str:
+    """Hash a deal's content.
+
+    ``last_updated`` is Notion's edit time and results are ordered by it,
+    so an edit that changes nothing else still has to be reindexed.
+    """
+    encoded = json.dumps(deal, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+def catalog_fingerprint(deals: Iterable[Dict]) -> str:
+    """Hash a whole deal set; independent of deal order."""
+    digest = hashlib.blake2b(digest_size=16)
+    for deal_id, fingerprint in sorted((deal["id"], deal_fingerprint(deal)) for deal in deals):
+        digest.update(f"{deal_id}:{fingerprint}\n".encode("utf-8"))
+    return digest.hexdigest()
@@ -0,0 +1,345 @@
+"""Streaming aggregation of CRM lead exports.
+
+Exports are CSV files with one lead per row (``Created Date``, ``Country``,
+``Campaign``, ``Affiliate``, ``Call Status``, ``Deposit Date``, the
+broker's ``Original Response`` JSON, ...). They are read in chunks of
+``chunk_size`` rows and each chunk is turned into columns: categorical
+fields become integer codes through per-column dictionaries shared by
+all chunks, dates become ``datetime64`` arrays, and counts are summed
+with ``numpy.bincount``. Memory stays bounded by the chunk size however
+large the export is.
+
+Broker responses are kept as raw text and only decoded when a cheap
+pattern suggests the broker may have rejected the lead.
+"""
+from typing import Dict, IO, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+from itertools import islice, repeat
+from operator import itemgetter
+from pathlib import Path
+import csv
+import logging
+import re
+import numpy as np
+import orjson
+
+from ..models.exceptions import LeadImportError
+
+logger = logging.getLogger(__name__)
+
+# Export header for each column read
+COLUMNS = {
+    "created": "Created Date",
+    "country": "Country",
+    "campaign": "Campaign",
+    "affiliate": "Affiliate",
+    "status": "Call Status",
+    "deposited": "Deposit Date",
+    "response": "Original Response",
+}
+
+# Columns leads can be grouped by
+GROUP_COLUMNS = ("affiliate", "country", "campaign")
+
+# Call statuses, normalized to lowercase letters and digits, by outcome.
+# Anything not listed counts as "other".
+STATUS_GROUPS = ("new", "no answer", "callback", "interested", "not interested", "invalid", "other")
+STATUS_BY_NAME = {
+    "": "new", "new": "new", "renew": "new",
+    "na": "no answer", "noanswer": "no answer", "voicemail": "no answer",
+    "hungup": "no answer", "unreachable": "no answer", "outofavailability": "no answer",
+    "callagain": "callback", "callback": "callback", "callinawhile": "callback",
+    "appointment": "interested", "newclientreg": "interested", "interested": "interested",
+    "nointerest": "not interested", "notinterested": "not interested",
+    "notinterestedni": "not interested", "deniesregistration": "not interested",
+    "deniedregistration": "not interested", "neverregistered": "not interested",
+    "nomoney": "not interested", "interest0noreg": "not interested",
+    "lowpotential": "not interested",
+    "wrongnumber": "invalid", "wronginfo": "invalid", "invalidinfo": "invalid",
+    "invalid": "invalid", "noage": "invalid", "underage": "invalid",
+    "languagebarrier": "invalid",
+}
+# Outcomes where someone actually picked up the phone
+CONTACTED = frozenset({"callback", "interested", "not interested"})
+
+_STATUS_KEY = re.compile(r"[^a-z0-9]")
+
+# Response fragments that may mean the broker refused the lead; only
+# responses matching one of them are decoded
+_REJECTION_HINT = re.compile(
+    r'"status"\s*:\s*"?false|"ret_code"\s*:\s*"?(?!200\b)\d|"errors"\s*:'
+    r'|"error"\s*:\s*(?:"[^"]|\[[^\]])|"errorMessage"\s*:\s*"[^"]'
+)
+
+def broker_rejected(response: str) -> bool:
+    """Whether a broker's raw JSON response refuses the lead."""
+    if not _REJECTION_HINT.search(response):
+        return False
+    try:
+        payload = orjson.loads(response)
+    except orjson.JSONDecodeError:
+        return False
+    if not isinstance(payload, dict):
+        return False
+    if str(payload.get("status", "")).lower() == "false":
+        return True
+    if "ret_code" in payload and str(payload["ret_code"]) != "200":
+        return True
+    return bool(payload.get("errors") is not None or payload.get("error") or payload.get("errorMessage"))
+
+class Dictionary:
+    """Assigns stable integer codes to the distinct values of one column."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, values: Sequence[str], count: int) -> np.ndarray:
+        codes = self.codes
+        encoded = np.fromiter(map(codes.get, values, repeat(-1)), dtype=np.int32, count=count)
+        # Only rows with values not seen before take the slow path
+        for i in np.flatnonzero(encoded < 0):
+            value = values[i]
+            if value not in codes:
+                codes[value] = len(self.values)
+                self.values.append(value)
+            encoded[i] = codes[value]
+        return encoded
+
+class LeadChunk(NamedTuple):
+    """Columns of up to ``chunk_size`` consecutive leads."""
+    codes: Dict[str, np.ndarray]  # dictionary codes per categorical column
+    created: np.ndarray  # datetime64[s]
+    deposited: np.ndarray  # datetime64[s], NaT without a deposit
+    responses: List[str]  # raw broker responses, decoded on demand
+    skipped: int = 0  # rows read with a different width than the header
+
+    def __len__(self) -> int:
+        return len(self.created)
+
+    def rejection_candidates(self) -> np.ndarray:
+        """Rows whose response matches a rejection hint, from one scan of the column."""
+        if not self.responses:
+            return np.zeros(0, dtype=np.intp)
+        joined = "\0".join(self.responses)
+        ends = np.cumsum([len(response) + 1 for response in self.responses])
+        starts = [match.start() for match in _REJECTION_HINT.finditer(joined)]
+        return np.unique(np.searchsorted(ends, starts, side="right"))
+
+    def response(self, index: int) -> Optional[Dict]:
+        """Decoded broker response of one lead, None if it is not JSON."""
+        try:
+            return orjson.loads(self.responses[index])
+        except orjson.JSONDecodeError:
+            return None
+
+class GroupStats(NamedTuple):
+    name: str
+    leads: int
+    contacted: int
+    deposits: int
+    rejected: int
+    hours_to_deposit: Optional[float]  # mean, None without deposits
+
+    @property
+    def conversion(self) -> float:
+        return self.deposits / self.leads if self.leads else 0.0
+
+    @property
+    def contact_rate(self) -> float:
+        return self.contacted / self.leads if self.leads else 0.0
+
+def _to_datetimes(values: Tuple[str, ...]) -> np.ndarray:
+    text = np.array(values)
+    return np.where(text == "", "NaT", text).astype("datetime64[s]")
+
+def _grow(counts: np.ndarray, size: int) -> np.ndarray:
+    if len(counts) >= size:
+        return counts
+    return np.concatenate([counts, np.zeros(size - len(counts), dtype=counts.dtype)])
+
+class LeadStats:
+    """Running per-group totals over every chunk fed to it."""
+
+    def __init__(self):
+        self.dictionaries = {name: Dictionary() for name in (*GROUP_COLUMNS, "status")}
+        self.rows = 0
+        self.skipped = 0  # malformed rows left out of every total
+        self.first_created: Optional[np.datetime64] = None
+        self.last_created: Optional[np.datetime64] = None
+        empty = np.zeros(0, dtype=np.int64)
+        self._totals = {
+            name: {
+                "leads": empty, "contacted": empty, "deposits": empty,
+                "rejected": empty, "deposit_seconds": empty.astype(np.float64),
+            }
+            for name in GROUP_COLUMNS
+        }
+        self._status_counts = np.zeros(len(STATUS_GROUPS), dtype=np.int64)
+
+    def _status_outcomes(self) -> np.ndarray:
+        """Outcome index of every status code seen so far."""
+        keys = (_STATUS_KEY.sub("", status.lower()) for status in self.dictionaries["status"].values)
+        return np.array(
+            [STATUS_GROUPS.index(STATUS_BY_NAME.get(key, "other")) for key in keys],
+            dtype=np.int64
+        )
+
+    def add(self, chunk: LeadChunk) -> None:
+        self.skipped += chunk.skipped
+        if not len(chunk):
+            return
+        self.rows += len(chunk)
+        created = chunk.created[~np.isnat(chunk.created)]
+        if len(created):
+            low, high = created.min(), created.max()
+            self.first_created = low if self.first_created is None else min(self.first_created, low)
+            self.last_created = high if self.last_created is None else max(self.last_created, high)
+
+        outcomes = self._status_outcomes()[chunk.codes["status"]]
+        self._status_counts += np.bincount(outcomes, minlength=len(STATUS_GROUPS))
+        contacted = np.isin(outcomes, [STATUS_GROUPS.index(name) for name in CONTACTED])
+
+        deposited = ~np.isnat(chunk.deposited)
+        delay = np.where(
+            deposited & ~np.isnat(chunk.created),
+            (chunk.deposited - chunk.created).astype(np.float64),
+            0.0
+        )
+        rejected = np.zeros(len(chunk), dtype=bool)
+        rejected[[i for i in chunk.rejection_candidates() if broker_rejected(chunk.responses[i])]] = True
+
+        for name in GROUP_COLUMNS:
+            codes = chunk.codes[name]
+            size = len(self.dictionaries[name])
+            totals = self._totals[name]
+            for key, weights in (
+                ("leads", None), ("contacted", contacted), ("deposits", deposited),
+                ("rejected", rejected), ("deposit_seconds", delay),
+            ):
+                counts = np.bincount(codes, weights=weights, minlength=size)
+                totals[key] = _grow(totals[key], size) + counts.astype(totals[key].dtype)
+
+    def groups(self, column: str) -> List[GroupStats]:
+        """Totals per value of ``column``, most leads first."""
+        if column not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group leads by {column}, use one of {', '.join(GROUP_COLUMNS)}")
+        totals = self._totals[column]
+        names = self.dictionaries[column].values
+        order = np.lexsort((-totals["deposits"], -totals["leads"]))
+        stats = []
+        for i in order:
+            deposits = int(totals["deposits"][i])
+            stats.append(GroupStats(
+                name=names[i] or "(none)",
+                leads=int(totals["leads"][i]),
+                contacted=int(totals["contacted"][i]),
+                deposits=deposits,
+                rejected=int(totals["rejected"][i]),
+                hours_to_deposit=float(totals["deposit_seconds"][i]) / deposits / 3600 if deposits else None,
+            ))
+        return stats
+
+    def totals(self) -> GroupStats:
+        """Totals over every lead."""
+        groups = self.groups(GROUP_COLUMNS[0])
+        deposits = sum(group.deposits for group in groups)
+        seconds = float(self._totals[GROUP_COLUMNS[0]]["deposit_seconds"].sum())
+        return GroupStats(
+            name="all",
+            leads=self.rows,
+            contacted=sum(group.contacted for group in groups),
+            deposits=deposits,
+            rejected=sum(group.rejected for group in groups),
+            hours_to_deposit=seconds / deposits / 3600 if deposits else None,
+        )
+
+    def status_counts(self) -> Dict[str, int]:
+        """Leads per call outcome."""
+        return {name: int(count) for name, count in zip(STATUS_GROUPS, self._status_counts)}
+
+def _well_formed(rows: Iterator[List[str]], width: int, counts: List[int]) -> Iterator[List[str]]:
+    """Yield rows as wide as the header, counting rows read and skipped into ``counts``."""
+    for row in rows:
+        counts[0] += 1
+        if len(row) == width:
+            yield row
+        else:
+            counts[1] += 1
+
+def iter_lead_chunks(
+    source: Union[str, Path, IO[str]],
+    chunk_size: int = 20_000,
+    stats: Optional[LeadStats] = None
+) -> Iterator[LeadChunk]:
+    """Read a lead export ``chunk_size`` rows at a time as columns.
+
+    Categorical columns are encoded with the dictionaries of ``stats``, so
+    codes from every chunk index the same totals. Rows with more or fewer
+    fields than the header are left out, logged and counted in ``skipped``.
+    """
+    dictionaries = stats.dictionaries if stats else LeadStats().dictionaries
+    if isinstance(source, (str, Path)):
+        try:
+            f = open(source, newline="", encoding="utf-8-sig")
+        except OSError as e:
+            raise LeadImportError(f"Failed to open lead export {source}: {str(e)}")
+        with f:
+            yield from iter_lead_chunks(f, chunk_size, stats)
+        return
+
+    reader = csv.reader(source)
+    try:
+        header = next(reader)
+    except StopIteration:
+        return
+    except csv.Error as e:
+        raise LeadImportError(f"Malformed lead export header: {str(e)}")
+    missing = [column for column in COLUMNS.values() if column not in header]
+    if missing:
+        raise LeadImportError(f"Lead export is missing columns: {', '.join(missing)}")
+    # Only the columns read are kept from each row: holding on to whole rows
+    # makes the garbage collector rescan them and dominates the read time
+    names = list(COLUMNS)
+    select = itemgetter(*(header.index(COLUMNS[name]) for name in names))
+    width = len(header)
+
+    while True:
+        counts = [0, 0]  # rows read, rows skipped
+        try:
+            rows = list(map(select, _well_formed(islice(reader, chunk_size), width, counts)))
+        except csv.Error as e:
+            raise LeadImportError(f"Malformed lead export near line {reader.line_num}: {str(e)}")
+        read, skipped = counts
+        if not read:
+            return
+        if skipped:
+            logger.warning(
+                f"Skipped {skipped} lead export rows without {width} fields "
+                f"before line {reader.line_num}"
+            )
+        columns = dict(zip(names, zip(*rows))) or {name: () for name in names}
+        try:
+            created = _to_datetimes(columns["created"])
+            deposited = _to_datetimes(columns["deposited"])
+        except ValueError as e:
+            raise LeadImportError(f"Invalid date near line {reader.line_num}: {str(e)}")
+        yield LeadChunk(
+            codes={
+                name: dictionaries[name].encode(columns[name], len(rows))
+                for name in dictionaries
+            },
+            created=created,
+            deposited=deposited,
+            responses=list(columns["response"]),
+            skipped=skipped,
+        )
+
+def aggregate_leads(source: Union[str, Path, IO[str]], chunk_size: int = 20_000) -> LeadStats:
+    """Stream a whole lead export into per-group totals."""
+    stats = LeadStats()
+    for chunk in iter_lead_chunks(source, chunk_size, stats):
+        stats.add(chunk)
+    return stats
@@ -0,0 +1,144 @@
+"""Latency and throughput metrics for the bot's hot paths."""
+from typing import Dict, Iterator, List, Optional, Tuple
+from collections import deque
+from contextlib import contextmanager
+import logging
+import time
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets in seconds, Prometheus style
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Recent samples kept per histogram for percentile reporting
+RESERVOIR_SIZE = 2048
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    """Cumulative bucket counts plus a window of recent samples for percentiles."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._recent: deque = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self._recent.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Percentile (0-100) over the recent samples."""
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+class MetricsRegistry:
+    """Process-wide counters and histograms, exposed in Prometheus text format."""
+
+    def __init__(self):
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        series = self._histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        if key not in series:
+            series[key] = Histogram()
+        return series[key]
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        self.histogram(name, **labels).observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        series = self._counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + amount
+
+    def counter(self, name: str, **labels: str) -> float:
+        return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0)
+
+    def counter_total(self, name: str) -> float:
+        """Sum of a counter across all its label sets."""
+        return sum(self._counters.get(name, {}).values())
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Time a block into the ``stage_seconds`` histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=stage)
+
+    def stage_percentiles(self) -> List[Tuple[str, int, float, float, float]]:
+        """(stage, count, p50, p95, p99) for every timed stage."""
+        rows = []
+        for key, histogram in sorted(self._histograms.get("stage_seconds", {}).items()):
+            if histogram.count:
+                rows.append((
+                    dict(key)["stage"],
+                    histogram.count,
+                    histogram.percentile(50),
+                    histogram.percentile(95),
+                    histogram.percentile(99)
+                ))
+        return rows
+
+    def hit_ratio(self, tier: str) -> Optional[float]:
+        """Cache hit ratio for a tier, or None before any lookups."""
+        hits = self.counter("cache_hits_total", tier=tier)
+        misses = self.counter("cache_misses_total", tier=tier)
+        return hits / (hits + misses) if hits + misses else None
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, series in sorted(self._counters.items()):
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+
+        for name, series in sorted(self._histograms.items()):
+            lines.append(f"# TYPE {name} histogram")
+            for key, histogram in sorted(series.items()):
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    bucket_key = key + (("le", f"{bound:g}"),)
+                    lines.append(f"{name}_bucket{_format_labels(bucket_key)} {count}")
+                inf_key = key + (("le", "+Inf"),)
+                lines.append(f"{name}_bucket{_format_labels(inf_key)} {histogram.count}")
+                lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{label}="{value}"' for label, value in key) + "}"
+
+async def start_metrics_server(registry: "MetricsRegistry", port: int) -> web.AppRunner:
+    """Serve ``/metrics`` on a local port for Prometheus to scrape."""
+    async def handle_metrics(request: web.Request) -> web.Response:
+        return web.Response(text=registry.render_prometheus(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    logger.info(f"Metrics endpoint listening on 127.0.0.1:{port}/metrics")
+    return runner
+
+# Shared registry for the whole process
+metrics = MetricsRegistry()
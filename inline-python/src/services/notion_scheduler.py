@@ -0,0 +1,182 @@
+"""Shared scheduler for every Notion API call."""
+from typing import Any, Awaitable, Callable, Optional
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import asyncio
+import logging
+import random
+import time
+import httpx
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+from ..config.settings import Settings
+from ..models.exceptions import CircuitOpenError
+from .rate_limiter import TokenBucket
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying; everything else is the caller's problem
+THROTTLED_STATUS = 429
+RETRYABLE_STATUSES = {THROTTLED_STATUS, 500, 502, 503, 504}
+
+class CircuitBreaker:
+    """Stops calling a failing service for a while.
+
+    Opens after ``failure_threshold`` consecutive failures. Once
+    ``reset_timeout`` has passed, one trial call is let through: success
+    closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError unless a call may go through now.
+
+        Returns True if the call is the half-open trial; its caller must
+        then record its outcome or abandon it, however the call ends.
+        """
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        retry_in = self.reset_timeout - (time.monotonic() - self._opened_at)
+        raise CircuitOpenError(
+            f"Notion circuit open after {self.failures} failures, retry in {max(retry_in, 0):.0f}s"
+        )
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    def abandon_trial(self) -> None:
+        """Let another trial through after a call that proved nothing either way."""
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_running or self.failures >= self.failure_threshold:
+            if self._opened_at is None or self._trial_running:
+                logger.error(f"Opening Notion circuit after {self.failures} consecutive failures")
+                metrics.increment("notion_circuit_opened_total")
+            self._opened_at = time.monotonic()
+        self._trial_running = False
+
+def _retry_after(error: HTTPResponseError) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header, if present."""
+    value = (getattr(error, "headers", None) or {}).get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+class NotionRequestScheduler:
+    """Rate limiting, concurrency limiting and retries for Notion calls.
+
+    Every call takes a token from one shared bucket and a slot from one
+    shared semaphore. Throttled (429) and transient (5xx, timeout,
+    connection) failures are retried with exponential backoff and full
+    jitter; a 429's ``Retry-After`` pauses the bucket for all callers.
+    Consecutive transient failures trip a circuit breaker.
+    """
+
+    def __init__(self, settings: Settings):
+        self.bucket = TokenBucket(settings.NOTION_REQUESTS_PER_SECOND)
+        self._slots = asyncio.Semaphore(settings.NOTION_MAX_CONCURRENCY)
+        self.max_retries = settings.NOTION_MAX_RETRIES
+        self.backoff_base = settings.NOTION_BACKOFF_BASE
+        self.backoff_max = settings.NOTION_BACKOFF_MAX
+        self.breaker = CircuitBreaker(
+            settings.NOTION_CIRCUIT_FAILURE_THRESHOLD,
+            settings.NOTION_CIRCUIT_RESET_TIMEOUT
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for a zero-based attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def call(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        retries: Optional[int] = None,
+        **kwargs
+    ) -> Any:
+        """Run a Notion client call under the shared limits, retrying transient failures."""
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            trial = self.breaker.before_call()
+            try:
+                await self.bucket.acquire()
+                async with self._slots:
+                    metrics.increment("notion_requests_total")
+                    result = await func(*args, **kwargs)
+            except HTTPResponseError as e:
+                status = getattr(e, "status", None)
+                if status not in RETRYABLE_STATUSES:
+                    # A definitive answer about this request, saying nothing
+                    # either way about Notion's health
+                    if trial:
+                        self.breaker.abandon_trial()
+                    raise
+                if status == THROTTLED_STATUS:
+                    # Throttling says nothing about Notion's health
+                    if trial:
+                        self.breaker.abandon_trial()
+                    metrics.increment("notion_throttled_total")
+                    delay = _retry_after(e)
+                    if delay is None:
+                        delay = self._backoff(attempt)
+                    self.bucket.pause(delay)
+                else:
+                    self.breaker.record_failure()
+                    delay = self._backoff(attempt)
+                reason = str(status)
+                error = e
+            except (RequestTimeoutError, httpx.TransportError) as e:
+                self.breaker.record_failure()
+                delay = self._backoff(attempt)
+                reason = type(e).__name__
+                error = e
+            except BaseException:
+                # Includes cancellation, while waiting for a token or mid-call;
+                # a trial left running would keep the circuit open for good
+                if trial:
+                    self.breaker.abandon_trial()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+            if attempt >= retries:
+                logger.error(f"Notion call failed after {attempt + 1} attempts: {str(error)}")
+                raise error
+            metrics.increment("notion_retries_total", reason=reason)
+            logger.warning(
+                f"Notion call failed ({reason}, attempt {attempt + 1}/{retries + 1}), "
+                f"retrying in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
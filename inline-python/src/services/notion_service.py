@@ -1,14 +1,16 @@
 """Notion integration service."""
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Iterable, List, Dict, Optional, Tuple
 import asyncio
-from datetime import datetime
 import logging
 import re
 from notion_client import AsyncClient
-from notion_client.errors import APIResponseError, HTTPResponseError
+from notion_client.errors import HTTPResponseError
 
 from ..config.settings import Settings
 from ..models.exceptions import NotionSyncError
+from .notion_scheduler import NotionRequestScheduler
+from .metrics import metrics
+from .deal_filter import pricing_model
 
 logger = logging.getLogger(__name__)
 
@@ -18,83 +20,195 @@ class NotionService:
         self.client = AsyncClient(auth=settings.NOTION_TOKEN)
         self.database_id = settings.OFFERS_DATABASE_ID
         self.advertisers_db_id = settings.ADVERTISERS_DATABASE_ID
-        self.max_retries = 3
-        self.retry_delay = 5  # seconds
         self._advertiser_cache = {}
+        # The advertiser table is loaded on the first partner lookup and
+        # reloaded only after a full sync asked for fresh data
+        self._advertisers_loaded = False
+        self._advertisers_lock = asyncio.Lock()
+        self.high_water_mark: Optional[str] = None
         
-    async def _query_with_retry(self, func, *args, **kwargs):
-        """Execute a Notion API call with retry logic."""
-        for attempt in range(self.max_retries):
+        # Every Notion call goes through one scheduler, so syncs, advertiser
+        # lookups and health checks share the rate limit and back off together
+        self.scheduler = NotionRequestScheduler(settings)
+        self.max_concurrency = settings.NOTION_MAX_CONCURRENCY
+        
+    async def _query_database(
+        self,
+        start_cursor: Optional[str] = None,
+        edited_since: Optional[str] = None
+    ) -> Dict:
+        """Query Notion database with pagination.
+        
+        When ``edited_since`` is set, only pages edited on or after that
+        timestamp are returned, oldest edit first.
+        """
+        query = {
+            "database_id": self.database_id,
+            "start_cursor": start_cursor,
+            "page_size": 100
+        }
+        if edited_since:
+            query["filter"] = {
+                "timestamp": "last_edited_time",
+                "last_edited_time": {"on_or_after": edited_since}
+            }
+            query["sorts"] = [{"timestamp": "last_edited_time", "direction": "ascending"}]
+        
+        with metrics.timer("notion_fetch"):
+            return await self.scheduler.call(self.client.databases.query, **query)
+    
+    async def stream_deals(self, edited_since: Optional[str] = None) -> AsyncIterator[List[Dict]]:
+        """Yield deals one Notion page at a time while prefetching the next page.
+        
+        Without ``edited_since`` the whole database is pulled. With it, only
+        pages edited since that high-water mark are fetched. Once the stream
+        is exhausted ``high_water_mark`` is advanced to the newest edit time seen.
+        """
+        next_page = None
+        if edited_since is None:
+            self._advertisers_loaded = False
+        try:
+            high_water_mark = edited_since
+            next_page = asyncio.create_task(self._query_database(None, edited_since))
+            
+            while next_page:
+                response = await next_page
+                next_page = None
+                if response["has_more"]:
+                    next_page = asyncio.create_task(
+                        self._query_database(response["next_cursor"], edited_since)
+                    )
+                
+                for page in response["results"]:
+                    edited = page.get("last_edited_time")
+                    if edited and (high_water_mark is None or edited > high_water_mark):
+                        high_water_mark = edited
+                yield await self._process_pages(response["results"])
+            
+            self.high_water_mark = high_water_mark
+            
+        except Exception as e:
+            logger.error(f"Unexpected error during Notion sync: {str(e)}")
+            raise NotionSyncError(f"Sync failed: {str(e)}")
+        finally:
+            if next_page:
+                next_page.cancel()
+    
+    async def sync_deals(self, edited_since: Optional[str] = None) -> List[Dict]:
+        """Sync deals from Notion database."""
+        deals = []
+        async for batch in self.stream_deals(edited_since):
+            deals.extend(batch)
+        
+        mode = f"changed since {edited_since}" if edited_since else "full"
+        logger.info(f"Successfully synced {len(deals)} deals from Notion ({mode})")
+        return deals
+    
+    async def fetch_deals(self, page_ids: Iterable[str]) -> Tuple[List[Dict], List[str]]:
+        """Re-fetch specific offer pages, e.g. after a webhook notification.
+        
+        Returns the current deals and the ids of pages that are gone:
+        archived, trashed, deleted, or no longer in the offers database.
+        """
+        async def retrieve(page_id: str) -> Tuple[str, Optional[Dict]]:
             try:
-                return await func(*args, **kwargs)
-            except (APIResponseError, HTTPResponseError) as e:
-                if e.code == 502 or e.code == 429:  # Bad Gateway or Rate Limited
-                    if attempt < self.max_retries - 1:
-                        delay = self.retry_delay * (attempt + 1)  # Exponential backoff
-                        logger.warning(f"Notion API error (attempt {attempt + 1}/{self.max_retries}): {str(e)}. Retrying in {delay}s...")
-                        await asyncio.sleep(delay)
-                        continue
-                logger.error(f"Notion API error after {attempt + 1} attempts: {str(e)}")
-                raise
-            except Exception as e:
-                logger.error(f"Unexpected error in Notion API call: {str(e)}")
+                return page_id, await self.scheduler.call(self.client.pages.retrieve, page_id=page_id)
+            except HTTPResponseError as e:
+                if e.status == 404:
+                    return page_id, None
                 raise
+        
+        try:
+            responses = await asyncio.gather(*(retrieve(page_id) for page_id in set(page_ids)))
+        except Exception as e:
+            logger.error(f"Failed to fetch changed pages: {str(e)}")
+            raise NotionSyncError(f"Page fetch failed: {str(e)}")
+        
+        pages, gone = [], []
+        for page_id, page in responses:
+            if page is None or page.get("archived") or page.get("in_trash") or not self._in_offers_database(page):
+                gone.append(page_id)
+            else:
+                pages.append(page)
+        return await self._process_pages(pages), gone
     
-    async def _query_database(self, start_cursor: Optional[str] = None) -> Dict:
-        """Query Notion database with pagination."""
-        return await self._query_with_retry(
-            self.client.databases.query,
-            database_id=self.database_id,
-            start_cursor=start_cursor,
-            page_size=100
-        )
+    def _in_offers_database(self, page: Dict) -> bool:
+        """Whether a page belongs to the offers database."""
+        parent = page.get("parent") or {}
+        if "database_id" not in parent:
+            # Nothing to check against without parent info
+            return not parent
+        return parent["database_id"].replace("-", "") == self.database_id.replace("-", "")
     
-    async def sync_deals(self) -> List[Dict]:
-        """Sync deals from Notion database."""
+    async def _process_pages(self, pages: List[Dict]) -> List[Dict]:
+        """Process Notion pages into deal format with bounded concurrency."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def process(page: Dict) -> Optional[Dict]:
+            async with semaphore:
+                try:
+                    return await self._extract_deal_data(page)
+                except Exception as e:
+                    logger.error(f"Error processing page {page.get('id')}: {str(e)}", exc_info=True)
+                    return None
+        
+        with metrics.timer("transform"):
+            results = await asyncio.gather(*(process(page) for page in pages))
+        return [deal for deal in results if deal]
+    
+    async def _load_advertisers(self) -> None:
+        """Resolve every advertiser in one paginated query instead of per-page lookups."""
         try:
-            deals = []
+            advertisers = {}
             has_more = True
             start_cursor = None
             
             while has_more:
-                response = await self._query_database(start_cursor)
-                processed_pages = await self._process_pages(response["results"])
-                deals.extend(processed_pages)
+                response = await self.scheduler.call(
+                    self.client.databases.query,
+                    database_id=self.advertisers_db_id,
+                    start_cursor=start_cursor,
+                    page_size=100
+                )
+                for page in response["results"]:
+                    name = self._get_title(page)
+                    if name:
+                        advertisers[page["id"]] = name
                 has_more = response["has_more"]
                 start_cursor = response["next_cursor"]
-                
-            logger.info(f"Successfully synced {len(deals)} deals from Notion")
-            return deals
+            
+            self._advertiser_cache = advertisers
+            logger.info(f"Loaded {len(advertisers)} advertisers from Notion")
             
         except Exception as e:
-            logger.error(f"Unexpected error during Notion sync: {str(e)}")
-            raise NotionSyncError(f"Sync failed: {str(e)}")
+            # Keep the previous lookup table; misses fall back to single retrieves
+            logger.error(f"Error loading advertisers: {str(e)}")
     
-    async def _process_pages(self, pages: List[Dict]) -> List[Dict]:
-        """Process Notion pages into deal format."""
-        deals = []
-        for page in pages:
-            try:
-                deal = await self._extract_deal_data(page)
-                if deal:
-                    deals.append(deal)
-            except Exception as e:
-                logger.error(f"Error processing page {page.get('id')}: {str(e)}", exc_info=True)
-                continue
-        return deals
+    def _get_title(self, page: Dict) -> str:
+        """Get the plain text of a page's title property."""
+        for prop in page.get("properties", {}).values():
+            if prop.get("type") == "title":
+                return self._get_text_property(prop)
+        return ""
     
     async def _fetch_advertiser_name(self, advertiser_id: str) -> str:
         """Get advertiser name from relation ID with caching."""
+        if not self._advertisers_loaded:
+            async with self._advertisers_lock:
+                if not self._advertisers_loaded:
+                    # Marked loaded even on failure; the next full sync retries
+                    await self._load_advertisers()
+                    self._advertisers_loaded = True
+        
         if advertiser_id in self._advertiser_cache:
             return self._advertiser_cache[advertiser_id]
         
         try:
             # Directly retrieve the page using the advertiser_id
-            page = await self.client.pages.retrieve(page_id=advertiser_id)
+            page = await self.scheduler.call(self.client.pages.retrieve, page_id=advertiser_id)
             
             # Get the title from the page properties
-            title_prop = page["properties"].get("title", {})
-            name = self._get_text_property({"type": "title", "title": title_prop.get("title", [])})
+            name = self._get_title(page)
             
             if name:
                 self._advertiser_cache[advertiser_id] = name
@@ -114,6 +228,11 @@ class NotionService:
         
         try:
             partner = self._get_formula_property(props.get("Partner", {}))
+            if not partner:
+                # Fall back to the related advertiser when the formula is empty
+                advertiser_id = self._get_relation_property(props.get("Advertiser", {}))
+                if advertiser_id:
+                    partner = await self._fetch_advertiser_name(advertiser_id)
             sources = self._get_multi_select_property(props.get("Sources", {}))
             
             # Handle UK -> GB conversion for flags
@@ -140,10 +259,11 @@ class NotionService:
                 "geo": geo,  # Will be GB instead of UK
                 "language": language,
                 "price": price,
+                **self._get_price_fields(props),
                 "funnels": funnels,
                 "formatted_display": formatted_display.strip(),
                 "formatted_funnels": formatted_funnels,
-                "last_updated": datetime.now().isoformat()
+                "last_updated": page.get("last_edited_time", "")
             }
         except KeyError as e:
             logger.error(f"Missing required property: {str(e)}", exc_info=True)
@@ -185,6 +305,20 @@ class NotionService:
             logger.error(f"Error formatting price: {str(e)}", exc_info=True)
             return "Price error"
     
+    def _get_price_fields(self, props: Dict) -> Dict:
+        """Extract numeric prices (CRG in percent) and the pricing model."""
+        cpa = props.get("CPA | Network | Selling", {}).get("number")
+        crg = props.get("CRG | Network | Selling", {}).get("number")
+        cpl = props.get("CPL | Network | Selling", {}).get("formula", {}).get("number")
+        if crg is not None:
+            crg = round(crg * 100, 2)
+        return {
+            "cpa": cpa,
+            "crg": crg,
+            "cpl": cpl,
+            "pricing_model": pricing_model(cpa, crg, cpl),
+        }
+    
     def _get_text_property(self, prop: Dict) -> str:
         """Extract text from Notion text property."""
         try:
@@ -211,8 +345,11 @@ class NotionService:
     async def is_healthy(self) -> bool:
         """Check if Notion is healthy."""
         try:
-            # Try to query database with limit 1 to check access
-            await self.client.databases.query(
+            # Try to query database with limit 1 to check access; no retries
+            # so a status check answers promptly
+            await self.scheduler.call(
+                self.client.databases.query,
+                retries=0,
                 database_id=self.database_id,
                 page_size=1
             )
@@ -0,0 +1,118 @@
+"""Receiver for Notion webhooks and signed deal-change notifications.
+
+Two kinds of POST are accepted on ``/notion/webhook``:
+
+* Notion integration webhooks, signed with ``X-Notion-Signature``::
+
+      {"type": "page.properties_updated", "entity": {"id": "...", "type": "page"}, ...}
+
+* Generic notifications from our own tooling, signed with ``X-Signature``::
+
+      {"page_ids": ["..."], "deleted": ["..."]}
+
+Both signatures are ``sha256=<hex HMAC of the raw body>`` keyed with the
+webhook secret. Notion's one-off verification request carries the secret
+itself; it is unauthenticated, so only its arrival is logged, never the
+token.
+"""
+from typing import Callable, Dict, Optional, Set, Tuple
+import hashlib
+import hmac
+import logging
+import orjson
+from aiohttp import web
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_PATH = "/notion/webhook"
+SIGNATURE_HEADERS = ("X-Notion-Signature", "X-Signature")
+
+# Notion page events and whether the page is gone afterwards
+PAGE_EVENTS: Dict[str, bool] = {
+    "page.created": False,
+    "page.properties_updated": False,
+    "page.content_updated": False,
+    "page.moved": False,
+    "page.undeleted": False,
+    "page.unlocked": False,
+    "page.deleted": True,
+}
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Check a ``sha256=<hex>`` HMAC signature of a request body."""
+    if not secret or not signature:
+        return False
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+def parse_notification(payload: Dict) -> Tuple[Set[str], Set[str]]:
+    """Extract (changed, deleted) page ids from a webhook payload."""
+    if "type" in payload:
+        entity = payload.get("entity") or {}
+        deleted = PAGE_EVENTS.get(payload["type"])
+        if entity.get("type") != "page" or deleted is None or not entity.get("id"):
+            return set(), set()
+        return (set(), {entity["id"]}) if deleted else ({entity["id"]}, set())
+
+    changed = set(payload.get("page_ids") or [])
+    if payload.get("page_id"):
+        changed.add(payload["page_id"])
+    deleted = set(payload.get("deleted") or [])
+    return changed - deleted, deleted
+
+class NotionWebhookReceiver:
+    """aiohttp endpoint that hands changed page ids to ``on_change``."""
+
+    def __init__(self, secret: str, on_change: Callable[[Set[str], Set[str]], None]):
+        self.secret = secret
+        self.on_change = on_change
+
+    async def handle(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        try:
+            payload = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            metrics.increment("webhook_events_total", result="malformed")
+            return web.Response(status=400, text="invalid JSON")
+        if not isinstance(payload, dict):
+            metrics.increment("webhook_events_total", result="malformed")
+            return web.Response(status=400, text="expected a JSON object")
+
+        if "verification_token" in payload:
+            # Sent once when the subscription is created. Anyone can post
+            # one, so the token is never echoed into the logs.
+            logger.warning(
+                f"Received a Notion webhook verification request from {request.remote}; "
+                "its token is not logged, capture it from the request body"
+            )
+            metrics.increment("webhook_events_total", result="verification")
+            return web.Response(text="ok")
+
+        signature = next(
+            (request.headers[name] for name in SIGNATURE_HEADERS if name in request.headers),
+            None
+        )
+        if not verify_signature(self.secret, body, signature):
+            logger.warning(f"Rejected webhook with a missing or invalid signature from {request.remote}")
+            metrics.increment("webhook_events_total", result="rejected")
+            return web.Response(status=401, text="invalid signature")
+
+        changed, deleted = parse_notification(payload)
+        if changed or deleted:
+            metrics.increment("webhook_events_total", result="accepted")
+            self.on_change(changed, deleted)
+        else:
+            metrics.increment("webhook_events_total", result="ignored")
+        return web.Response(text="ok")
+
+    async def start(self, port: int) -> web.AppRunner:
+        """Listen for notifications on all interfaces, so Notion can reach us."""
+        app = web.Application()
+        app.router.add_post(WEBHOOK_PATH, self.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "0.0.0.0", port).start()
+        logger.info(f"Notion webhook receiver listening on 0.0.0.0:{port}{WEBHOOK_PATH}")
+        return runner
@@ -0,0 +1,48 @@
+"""Adaptive interval between scheduled Notion polls."""
+from typing import Optional, Tuple
+from datetime import datetime
+import pytz
+
+from ..config.settings import Settings
+
+class AdaptivePollInterval:
+    """Poll often while deals are changing and during business hours, rarely when idle.
+
+    After a sync that changed something the interval drops to its floor;
+    after each idle sync it grows by ``SYNC_BACKOFF_FACTOR`` up to its
+    ceiling. Business hours use ``SYNC_MIN_INTERVAL``..``SYNC_INTERVAL``,
+    off hours ``SYNC_INTERVAL``..``SYNC_MAX_INTERVAL``.
+    """
+
+    def __init__(self, settings: Settings):
+        self.min_interval = settings.SYNC_MIN_INTERVAL
+        self.base_interval = settings.SYNC_INTERVAL
+        self.max_interval = settings.SYNC_MAX_INTERVAL
+        self.backoff_factor = settings.SYNC_BACKOFF_FACTOR
+        self.timezone = pytz.timezone(settings.BUSINESS_TIMEZONE)
+        self.hours = (settings.BUSINESS_HOURS_START, settings.BUSINESS_HOURS_END)
+        self.weekdays_only = settings.BUSINESS_WEEKDAYS_ONLY
+        self.current = float(self.base_interval)
+
+    def in_business_hours(self, now: Optional[datetime] = None) -> bool:
+        local = (now or datetime.now(pytz.utc)).astimezone(self.timezone)
+        if self.weekdays_only and local.weekday() >= 5:
+            return False
+        start, end = self.hours
+        return start <= local.hour < end
+
+    def bounds(self, now: Optional[datetime] = None) -> Tuple[float, float]:
+        """Shortest and longest interval allowed right now."""
+        if self.in_business_hours(now):
+            return self.min_interval, self.base_interval
+        return self.base_interval, self.max_interval
+
+    def next_interval(self, changed: bool, now: Optional[datetime] = None) -> float:
+        """Seconds to wait after a sync that did or did not change anything."""
+        low, high = self.bounds(now)
+        if changed:
+            self.current = low
+        else:
+            self.current = self.current * self.backoff_factor
+        self.current = min(max(self.current, low), high)
+        return self.current
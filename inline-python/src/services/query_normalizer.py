@@ -0,0 +1,39 @@
+"""Inline query normalization."""
+from typing import List
+from functools import lru_cache
+
+from .aliases import ALIASES
+from .deal_index import tokenize
+
+@lru_cache(maxsize=4096)
+def normalize_query(query: str) -> str:
+    """Canonicalize a query so equivalent spellings share one cache entry.
+
+    Case is folded, aliases are replaced by their canonical form and
+    completed tokens are sorted and deduplicated. A trailing token that is
+    not a known alias is kept last, since it may still be typed and is
+    matched as a prefix. Deals are matched on canonical forms too (see
+    ``DealIndex``), so ``fb`` still finds deals whose source is stored as FB.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return ""
+
+    *complete, last = tokens
+    words = [ALIASES.get(token, token) for token in complete]
+    trailing: List[str] = []
+    if last in ALIASES:
+        words.append(ALIASES[last])
+    else:
+        trailing.append(last)
+
+    words = sorted(set(" ".join(words).split()) - set(trailing))
+    return " ".join(words + trailing)
+
+def broader_queries(query: str) -> List[str]:
+    """Canonical forms of the keystrokes that led up to a raw query, longest first."""
+    tokens = query.split()
+    if not tokens:
+        return []
+    prefixes = (query[:-cut] for cut in range(1, len(tokens[-1]) + 1))
+    return [normalize_query(prefix) for prefix in prefixes]
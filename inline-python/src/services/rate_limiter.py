@@ -0,0 +1,39 @@
+"""Async rate limiting primitives."""
+import asyncio
+import time
+
+class TokenBucket:
+    """Token bucket shared by every coroutine calling a rate-limited API.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``;
+    ``acquire`` waits until a token is available. ``pause`` holds every
+    caller back, e.g. while the API asks clients to retry later.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next ``seconds``."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        """Wait for and take one token."""
+        async with self._lock:
+            while (wait := self._paused_until - time.monotonic()) > 0:
+                await asyncio.sleep(wait)
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
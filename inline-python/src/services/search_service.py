@@ -1,41 +1,66 @@
 """Search service implementation."""
 from typing import List, Dict, Optional
-import typesense
 import logging
+import time
 
 from ..config.settings import Settings
 from ..models.exceptions import SearchError
+from .typesense_client import AsyncTypesenseClient
+from .metrics import metrics
+from .fingerprint import deal_fingerprint
+from .deal_filter import DealFilter, PRICE_FIELDS
+from .aliases import ALTERNATIVES
 
 logger = logging.getLogger(__name__)
 
+# Alias every search and incremental upsert goes through; full rebuilds
+# repoint it at a freshly built collection
+DEALS_ALIAS = 'deals'
+
+# Alias for deals loaded by scripts/import_deals.py. Syncs never write to,
+# reconcile or rebuild it, so imports neither touch the live catalog nor
+# vanish at the next full sync.
+IMPORTED_ALIAS = 'deals_imported'
+
 class SearchService:
-    def __init__(self, settings: Settings):
-        self.client = typesense.Client({
-            'api_key': settings.TYPESENSE_API_KEY,
-            'nodes': settings.TYPESENSE_NODES,
-            'connection_timeout_seconds': 2
-        })
+    def __init__(self, settings: Settings, alias: str = DEALS_ALIAS):
+        self.client = AsyncTypesenseClient(settings)
+        self.alias = alias
+        self.import_batch_size = settings.TYPESENSE_IMPORT_BATCH_SIZE
+        self.rebuild_batch_size = settings.TYPESENSE_REBUILD_BATCH_SIZE
+        self._collection_ready = False
+        
+        # Content fingerprint of every indexed document, kept between syncs
+        # so unchanged deals are not rewritten
+        self._fingerprints: Dict[str, str] = {}
         
     async def search_deals(
         self,
         query: str,
         filters: Optional[Dict] = None,
-        limit: int = 10
+        limit: int = 10,
+        deal_filter: Optional[DealFilter] = None,
+        page: int = 1
     ) -> List[Dict]:
-        """Search deals using Typesense."""
+        """Search deals using Typesense, ``limit`` hits per page."""
         try:
+            filter_by = [self._build_filters(filters)]
+            sort_by = None
+            if deal_filter:
+                filter_by.append(deal_filter.to_filter_by())
+                sort_by = deal_filter.to_sort_by()
+            
             search_parameters = {
-                'q': query,
+                'q': query or '*',
                 'query_by': 'partner,sources,geo,language,funnels',
-                'filter_by': self._build_filters(filters),
-                'limit': limit,
-                'sort_by': '_text_match:desc'
+                'filter_by': ' && '.join(part for part in filter_by if part),
+                'per_page': limit,
+                'page': page,
+                'sort_by': sort_by or '_text_match:desc'
             }
             
-            # Synchronous call
-            results = self.client.collections['deals'].documents.search(
-                search_parameters
-            )
+            with metrics.timer("typesense_search"):
+                results = await self.client.search(self.alias, search_parameters)
             
             return self._process_results(results)
             
@@ -64,42 +89,193 @@ class SearchService:
             
         return [hit['document'] for hit in results['hits']] 
     
-    async def update_index(self, deals: List[Dict]) -> None:
-        """Update search index with new deals."""
+    @staticmethod
+    def _to_document(deal: Dict) -> Dict:
+        """Format a deal as a Typesense document."""
+        document = {
+            'id': deal['id'],
+            'partner': deal['partner'],
+            'sources': deal['sources'],  # List of sources
+            'geo': deal['geo'],
+            'language': deal['language'],  # List of languages
+            'price': deal['price'],
+            'pricing_model': deal.get('pricing_model', 'none'),
+            'funnels': deal['funnels'],  # List of funnels
+            'formatted_display': deal['formatted_display'],
+            'formatted_funnels': deal.get('formatted_funnels', ''),
+            'last_updated': deal['last_updated']
+        }
+        # Optional numeric prices are left out rather than sent as null
+        for field in PRICE_FIELDS:
+            if deal.get(field) is not None:
+                document[field] = deal[field]
+        return document
+    
+    async def update_index(self, deals: List[Dict]) -> int:
+        """Upsert deals whose content changed since they were last indexed.
+        
+        Returns the number of documents written.
+        """
         try:
+            # Skip documents whose fingerprint matches what is already indexed
+            changed = []
+            for deal in deals:
+                document = self._to_document(deal)
+                fingerprint = deal_fingerprint(document)
+                if self._fingerprints.get(document['id']) != fingerprint:
+                    changed.append((document, fingerprint))
+            
+            if not changed:
+                return 0
+            
             # Ensure collection exists
             await self._ensure_collection()
             
-            # Format documents for Typesense
-            documents = [{
-                'id': deal['id'],
-                'partner': deal['partner'],
-                'sources': deal['sources'],  # List of sources
-                'geo': deal['geo'],
-                'language': deal['language'],  # List of languages
-                'price': deal['price'],
-                'funnels': deal['funnels'],  # List of funnels
-                'formatted_display': deal['formatted_display'],
-                'formatted_funnels': deal.get('formatted_funnels', ''),
-                'last_updated': deal['last_updated']
-            } for deal in deals]
-            
-            # Update documents
-            self.client.collections['deals'].documents.import_(
-                documents,
-                {'action': 'upsert'}
-            )
+            # Update documents in sized batches
+            for start in range(0, len(changed), self.import_batch_size):
+                batch = changed[start:start + self.import_batch_size]
+                with metrics.timer("index_upsert"):
+                    results = await self.client.import_documents(
+                        self.alias, [document for document, _ in batch], action='upsert'
+                    )
+                for (document, fingerprint), result in zip(batch, results):
+                    if result.get('success'):
+                        self._fingerprints[document['id']] = fingerprint
             
-            logger.info(f"Successfully updated {len(deals)} documents in search index")
+            logger.info(
+                f"Upserted {len(changed)} changed documents "
+                f"({len(deals) - len(changed)} unchanged skipped)"
+            )
+            return len(changed)
             
         except Exception as e:
             logger.error(f"Failed to update search index: {str(e)}")
             raise SearchError(f"Index update failed: {str(e)}")
     
-    async def _ensure_collection(self) -> None:
-        """Ensure deals collection exists with correct schema."""
-        schema = {
-            'name': 'deals',
+    async def remove_from_index(self, deal_ids: List[str]) -> int:
+        """Delete documents for deals removed from Notion, returning how many ids were sent.
+        
+        Every id is deleted, not only those with a fingerprint: before the
+        first sync of a process the fingerprints are empty although the
+        documents are indexed. Ids without a document are ignored.
+        """
+        try:
+            if not deal_ids:
+                return 0
+            await self.client.delete_documents(self.alias, list(deal_ids))
+            for doc_id in deal_ids:
+                self._fingerprints.pop(doc_id, None)
+            logger.info(f"Removed {len(deal_ids)} deleted deals from search index")
+            return len(deal_ids)
+            
+        except Exception as e:
+            logger.error(f"Failed to remove documents from search index: {str(e)}")
+            raise SearchError(f"Index removal failed: {str(e)}")
+    
+    async def reconcile_index(self, deals: Dict[str, Dict]) -> int:
+        """Make the index match a complete catalog after a full sync.
+        
+        Deletes documents whose pages no longer exist in Notion and
+        re-upserts catalog deals missing from the index. Returns the number
+        of documents deleted.
+        """
+        try:
+            exported = await self.client.export_documents(self.alias, {'include_fields': 'id'})
+            indexed_ids = {document['id'] for document in exported}
+            
+            stale_ids = indexed_ids - set(deals)
+            if stale_ids:
+                await self.client.delete_documents(self.alias, list(stale_ids))
+                for doc_id in stale_ids:
+                    self._fingerprints.pop(doc_id, None)
+                logger.info(f"Removed {len(stale_ids)} stale documents from search index")
+            
+            missing_ids = set(deals) - indexed_ids
+            if missing_ids:
+                logger.warning(f"{len(missing_ids)} deals missing from search index, re-upserting")
+                for doc_id in missing_ids:
+                    self._fingerprints.pop(doc_id, None)
+                await self.update_index([deals[doc_id] for doc_id in missing_ids])
+            
+            return len(stale_ids)
+            
+        except SearchError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to reconcile search index: {str(e)}")
+            raise SearchError(f"Index reconciliation failed: {str(e)}")
+    
+    async def rebuild_index(self, deals: Dict[str, Dict]) -> int:
+        """Rebuild the index blue/green from a complete catalog.
+        
+        Imports every deal into a new timestamped collection, checks its
+        document count, then repoints the alias at it and drops the old
+        collection, so searches never see a half-populated index. Returns
+        the number of documents imported, or 0 if the live index already
+        holds exactly this catalog.
+        """
+        documents = [self._to_document(deal) for deal in deals.values()]
+        fingerprints = {document['id']: deal_fingerprint(document) for document in documents}
+        if self._collection_ready and fingerprints == self._fingerprints:
+            logger.info("Search index already matches the catalog, skipping rebuild")
+            return 0
+        
+        collection = f"{self.alias}_{time.time_ns()}"
+        try:
+            await self.client.create_collection(self._collection_schema(collection))
+            await self._upsert_synonyms(collection)
+            
+            for start in range(0, len(documents), self.rebuild_batch_size):
+                batch = documents[start:start + self.rebuild_batch_size]
+                with metrics.timer("index_rebuild_batch"):
+                    await self.client.import_documents(collection, batch, action='create')
+            
+            info = await self.client.retrieve_collection(collection)
+            indexed = info.get('num_documents', 0) if info else 0
+            if indexed != len(documents):
+                raise SearchError(
+                    f"Collection {collection} has {indexed} documents, expected {len(documents)}"
+                )
+            
+            previous = await self._swap_alias(collection)
+            
+        except Exception as e:
+            logger.error(f"Failed to rebuild search index: {str(e)}")
+            try:
+                await self.client.delete_collection(collection)
+            except SearchError:
+                pass
+            if isinstance(e, SearchError):
+                raise
+            raise SearchError(f"Index rebuild failed: {str(e)}")
+        
+        self._fingerprints = fingerprints
+        self._collection_ready = True
+        logger.info(f"Rebuilt search index into {collection} ({len(documents)} documents)")
+        
+        if previous:
+            try:
+                await self.client.delete_collection(previous)
+            except SearchError as e:
+                logger.warning(f"Failed to drop previous collection {previous}: {str(e)}")
+        return len(documents)
+    
+    async def _swap_alias(self, collection: str) -> Optional[str]:
+        """Point the alias at a collection, returning the collection it replaced."""
+        previous = await self.client.retrieve_alias(self.alias)
+        if previous is None and await self.client.retrieve_collection(self.alias):
+            # A plain collection from before aliases were used holds the
+            # name; it has to go before the alias can take it over
+            logger.warning(f"Replacing legacy '{self.alias}' collection with an alias")
+            await self.client.delete_collection(self.alias)
+        await self.client.upsert_alias(self.alias, collection)
+        return previous
+    
+    @staticmethod
+    def _collection_schema(name: str) -> Dict:
+        """Schema for a deals collection."""
+        return {
+            'name': name,
             'fields': [
                 {'name': 'id', 'type': 'string'},
                 {'name': 'partner', 'type': 'string'},
@@ -107,22 +283,76 @@ class SearchService:
                 {'name': 'geo', 'type': 'string', 'facet': True},
                 {'name': 'language', 'type': 'string[]', 'facet': True},
                 {'name': 'price', 'type': 'string'},
+                {'name': 'cpa', 'type': 'float', 'optional': True},
+                {'name': 'crg', 'type': 'float', 'optional': True},
+                {'name': 'cpl', 'type': 'float', 'optional': True},
+                {'name': 'pricing_model', 'type': 'string', 'facet': True},
                 {'name': 'funnels', 'type': 'string[]', 'facet': True},
                 {'name': 'formatted_display', 'type': 'string'},
                 {'name': 'formatted_funnels', 'type': 'string'},
                 {'name': 'last_updated', 'type': 'string'}
             ]
         }
+    
+    async def _ensure_collection(self) -> None:
+        """Ensure the alias (or a legacy collection of that name) exists with every schema field."""
+        if self._collection_ready:
+            return
         
-        try:
-            self.client.collections['deals'].retrieve()
-        except Exception:
-            self.client.collections.create(schema)
+        collection = await self.client.retrieve_alias(self.alias) or self.alias
+        info = await self.client.retrieve_collection(collection)
+        if info is None:
+            collection = f"{self.alias}_{time.time_ns()}"
+            await self.client.create_collection(self._collection_schema(collection))
+            await self.client.upsert_alias(self.alias, collection)
+        else:
+            await self._add_missing_fields(collection, info)
+        await self._upsert_synonyms(collection)
+        self._collection_ready = True
+    
+    async def _upsert_synonyms(self, collection: str) -> None:
+        """Let each canonical word match its abbreviations, as the local index does.
+        
+        Queries arrive canonicalized (``fb`` -> ``facebook``) while documents
+        keep the spelling stored in Notion, so both must match each other.
+        """
+        for canonical, spellings in ALTERNATIVES.items():
+            await self.client.upsert_synonym(
+                collection, canonical.replace(" ", "-"), list(spellings)
+            )
+    
+    async def _add_missing_fields(self, collection: str, info: Dict) -> None:
+        """Patch fields the schema gained since a collection was created into it.
+        
+        Collections from before the price filters lack cpa/crg/cpl and
+        pricing_model, so ``filter_by`` on them is rejected. The fields are
+        added as optional because existing documents have no value yet;
+        forgetting their fingerprints gets them re-upserted with one.
+        """
+        existing = {field['name'] for field in info.get('fields', [])}
+        missing = [
+            {**field, 'optional': True}
+            for field in self._collection_schema(collection)['fields']
+            if field['name'] not in existing
+        ]
+        if not missing:
+            return
+        names = ", ".join(field['name'] for field in missing)
+        logger.warning(f"Adding missing fields to collection {collection}: {names}")
+        await self.client.update_collection(collection, missing)
+        self._fingerprints.clear()
     
     async def is_healthy(self) -> bool:
         """Check if Typesense is healthy."""
         try:
-            return self.client.operations.is_healthy()
+            return await self.client.health()
         except Exception as e:
             logger.error(f"Typesense health check failed: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+    
+    async def close(self) -> None:
+        """Close Typesense connections."""
+        try:
+            await self.client.close()
+        except Exception as e:
+            logger.error(f"Error closing Typesense connection: {str(e)}")
\ No newline at end of file
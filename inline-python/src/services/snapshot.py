@@ -0,0 +1,121 @@
+"""On-disk deal catalog snapshots for warm restarts.
+
+Layout (little endian)::
+
+    header   magic "DEALSNAP", format version u32, deal count u32, meta length u32
+    meta     orjson object (watermark, catalog hash, creation time, ...)
+    offsets  (count + 1) u64 record boundaries, relative to the records start
+    records  one orjson object per deal, back to back
+
+The file is memory-mapped on load, so opening it costs the header only and
+each deal is decoded when it is read. Writes go to a temporary file that
+is atomically renamed over the previous snapshot.
+"""
+from typing import Dict, Iterable, Iterator, List, Tuple
+from array import array
+from pathlib import Path
+import mmap
+import os
+import struct
+import orjson
+
+from ..models.exceptions import SnapshotError
+
+MAGIC = b"DEALSNAP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIII")
+
+class DealSnapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        try:
+            with open(self.path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # empty file
+            raise SnapshotError(f"Snapshot {self.path} is empty: {str(e)}")
+        except OSError as e:
+            raise SnapshotError(f"Failed to open snapshot {self.path}: {str(e)}")
+
+        try:
+            magic, version, count, meta_length = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise SnapshotError(f"{self.path} is not a deal snapshot")
+            if version != FORMAT_VERSION:
+                raise SnapshotError(
+                    f"Snapshot {self.path} has format {version}, expected {FORMAT_VERSION}"
+                )
+
+            meta_start = HEADER.size
+            offsets_start = meta_start + meta_length
+            self._records_start = offsets_start + (count + 1) * 8
+            self.meta: Dict = orjson.loads(self._mm[meta_start:offsets_start])
+            self._offsets = memoryview(self._mm)[offsets_start:self._records_start].cast("Q")
+            self._count = count
+
+            if self._records_start + self._offsets[count] != len(self._mm):
+                raise SnapshotError(f"Snapshot {self.path} is truncated")
+        except (struct.error, ValueError, IndexError) as e:
+            self.close()
+            raise SnapshotError(f"Snapshot {self.path} is corrupt: {str(e)}")
+        except SnapshotError:
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Dict:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        start = self._records_start + self._offsets[index]
+        end = self._records_start + self._offsets[index + 1]
+        return orjson.loads(self._mm[start:end])
+
+    def __iter__(self) -> Iterator[Dict]:
+        return (self[index] for index in range(self._count))
+
+    def close(self) -> None:
+        offsets = getattr(self, "_offsets", None)
+        if offsets is not None:
+            offsets.release()
+        self._mm.close()
+
+    def __enter__(self) -> "DealSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def write_snapshot(path: Path, deals: Iterable[Dict], meta: Dict) -> int:
+    """Write deals and metadata to a snapshot file, returning its size in bytes."""
+    path = Path(path)
+    records: List[bytes] = [orjson.dumps(deal) for deal in deals]
+    offsets = array("Q", [0])
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+    if offsets.itemsize != 8 or array("Q", [1]).tobytes()[0] != 1:
+        raise SnapshotError("Snapshots need 8-byte little-endian offsets")
+
+    encoded_meta = orjson.dumps(meta)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(records), len(encoded_meta)))
+            f.write(encoded_meta)
+            f.write(offsets.tobytes())
+            for record in records:
+                f.write(record)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except OSError as e:
+        raise SnapshotError(f"Failed to write snapshot {path}: {str(e)}")
+    return path.stat().st_size
+
+def read_snapshot(path: Path) -> Tuple[Dict, List[Dict]]:
+    """Load every deal from a snapshot file, with its metadata."""
+    with DealSnapshot(path) as snapshot:
+        return snapshot.meta, list(snapshot)
@@ -0,0 +1,179 @@
+"""Single-flight coordination of Notion syncs."""
+from typing import Awaitable, Callable, Iterable, Optional, Set
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class SyncProgress:
+    """Live counters for one sync, readable while it runs."""
+
+    def __init__(self, full: bool, targeted: bool = False):
+        self.full = full
+        self.targeted = targeted  # only re-fetches pages reported as changed
+        self.stage = "starting"
+        self.pages = 0  # Notion pages fetched
+        self.updated = 0  # deals new or changed in the catalog
+        self.deleted = 0  # deals dropped from the catalog
+        self.upserted = 0  # documents written to Typesense
+        self.removed = 0  # documents deleted from Typesense
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def changed(self) -> bool:
+        """Whether the catalog changed; Typesense writes alone (retries, repairs) do not count."""
+        return bool(self.updated or self.deleted)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def summary(self) -> str:
+        kind = "Page" if self.targeted else "Full" if self.full else "Incremental"
+        text = (
+            f"{kind} sync {self.stage}: {self.pages} pages fetched, "
+            f"{self.updated} deals updated"
+        )
+        if self.deleted:
+            text += f", {self.deleted} deleted"
+        text += f"; {self.upserted} documents upserted"
+        if self.removed:
+            text += f", {self.removed} removed"
+        return f"{text} ({self.elapsed:.0f}s)"
+
+class SyncCoordinator:
+    """Runs at most one sync at a time, in the background.
+
+    Callers asking for a sync while one is running attach to it instead of
+    starting another, so scheduled syncs and any number of /refresh
+    commands never crawl Notion or write to Typesense concurrently.
+    Forced syncs are also limited to one per ``min_force_interval`` seconds.
+
+    Pages reported changed (e.g. by webhooks) are queued, collected for
+    ``page_debounce`` seconds and re-fetched together by ``sync_pages``,
+    once no other sync is running.
+    """
+
+    def __init__(
+        self,
+        sync: Callable[[bool, SyncProgress], Awaitable[None]],
+        min_force_interval: float = 0,
+        sync_pages: Optional[Callable[[Set[str], Set[str], SyncProgress], Awaitable[None]]] = None,
+        page_debounce: float = 0
+    ):
+        self._sync = sync
+        self._sync_pages = sync_pages
+        self.min_force_interval = min_force_interval
+        self.page_debounce = page_debounce
+        self._task: Optional[asyncio.Task] = None
+        self.progress: Optional[SyncProgress] = None
+        self._last_forced: Optional[float] = None
+
+        # Page changes waiting for the next page sync
+        self._changed: Set[str] = set()
+        self._deleted: Set[str] = set()
+        self._drain_task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending_pages(self) -> int:
+        return len(self._changed) + len(self._deleted)
+
+    def force_cooldown(self) -> float:
+        """Seconds until another forced sync may start, 0 if one may start now."""
+        if self.running or self._last_forced is None:
+            return 0.0
+        return max(self.min_force_interval - (time.monotonic() - self._last_forced), 0.0)
+
+    def start(self, full: bool = False, forced: bool = False) -> asyncio.Task:
+        """Start a sync, or return the one already running.
+
+        A running page sync is not joined: the new sync starts right after it.
+        """
+        previous = None
+        if self.running:
+            if not self.progress.targeted:
+                logger.info("Sync already running, attaching to it")
+                return self._task
+            previous = self._task
+        if forced:
+            self._last_forced = time.monotonic()
+        progress = self.progress = SyncProgress(full)
+        self._task = asyncio.create_task(
+            self._run(progress, lambda: self._sync(progress.full, progress), previous)
+        )
+        return self._task
+
+    async def run(self, full: bool = False, forced: bool = False) -> None:
+        """Start or attach to a sync and wait for it to finish.
+
+        The sync is shielded, so a cancelled caller leaves it running for
+        anyone else attached.
+        """
+        await asyncio.shield(self.start(full, forced))
+
+    def queue_pages(self, changed: Iterable[str], deleted: Iterable[str] = ()) -> None:
+        """Queue pages for a targeted re-fetch; deletions win over changes."""
+        deleted = set(deleted)
+        self._deleted |= deleted
+        self._changed = (self._changed | set(changed)) - self._deleted
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain_pages())
+
+    async def _drain_pages(self) -> None:
+        while self._changed or self._deleted:
+            await asyncio.sleep(self.page_debounce)
+            while self.running:
+                await asyncio.wait({self._task})
+
+            changed, deleted = self._changed, self._deleted
+            self._changed, self._deleted = set(), set()
+            progress = self.progress = SyncProgress(False, targeted=True)
+            self._task = asyncio.create_task(
+                self._run(progress, lambda: self._sync_pages(changed, deleted, progress))
+            )
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass  # logged by the sync; later changes still get their turn
+
+    async def _run(
+        self,
+        progress: SyncProgress,
+        sync: Callable[[], Awaitable[None]],
+        after: Optional[asyncio.Task] = None
+    ) -> None:
+        try:
+            if after is not None:
+                progress.stage = "queued"
+                await asyncio.wait({after})
+            await sync()
+            progress.stage = "complete"
+        except asyncio.CancelledError:
+            progress.stage = "cancelled"
+            raise
+        except Exception as e:
+            progress.stage = "failed"
+            progress.error = str(e)
+            raise
+        finally:
+            progress.finished_at = time.monotonic()
+
+    async def cancel(self) -> None:
+        """Cancel the running sync and queued page changes, and wait for them to stop."""
+        for task in (self._drain_task, self._task):
+            if task is None or task.done():
+                continue
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
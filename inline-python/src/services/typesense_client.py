@@ -0,0 +1,156 @@
+"""Async Typesense HTTP client."""
+from typing import List, Dict, Optional
+import json
+import logging
+import httpx
+
+from ..config.settings import Settings
+from ..models.exceptions import SearchError
+
+logger = logging.getLogger(__name__)
+
+class AsyncTypesenseClient:
+    """Minimal non-blocking Typesense client over a pooled keep-alive connection.
+
+    The official ``typesense`` package is synchronous, so every call made
+    from a handler stalls the whole event loop. This client covers only the
+    endpoints the bot uses.
+    """
+
+    def __init__(self, settings: Settings):
+        node = settings.TYPESENSE_NODES[0]
+        self.http = httpx.AsyncClient(
+            base_url=f"{node['protocol']}://{node['host']}:{node['port']}",
+            headers={"X-TYPESENSE-API-KEY": settings.TYPESENSE_API_KEY},
+            timeout=httpx.Timeout(
+                settings.TYPESENSE_TIMEOUT,
+                connect=settings.TYPESENSE_CONNECTION_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.TYPESENSE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.TYPESENSE_MAX_CONNECTIONS
+            )
+        )
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request and raise SearchError on non-2xx responses."""
+        try:
+            response = await self.http.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            raise SearchError(f"Typesense request failed: {method} {path}: {str(e)}")
+
+        if response.is_error:
+            raise SearchError(
+                f"Typesense returned {response.status_code} for {method} {path}: "
+                f"{response.text}"
+            )
+        return response
+
+    async def health(self) -> bool:
+        """Check the node's /health endpoint."""
+        response = await self._request("GET", "/health")
+        return response.json().get("ok", False)
+
+    async def _get_optional(self, path: str) -> Optional[Dict]:
+        """GET a resource, returning None if it does not exist."""
+        try:
+            response = await self.http.get(path)
+        except httpx.HTTPError as e:
+            raise SearchError(f"Typesense request failed: GET {path}: {str(e)}")
+
+        if response.status_code == 404:
+            return None
+        if response.is_error:
+            raise SearchError(
+                f"Typesense returned {response.status_code} for GET {path}: "
+                f"{response.text}"
+            )
+        return response.json()
+
+    async def retrieve_collection(self, name: str) -> Optional[Dict]:
+        """Get collection metadata, or None if it does not exist."""
+        return await self._get_optional(f"/collections/{name}")
+
+    async def create_collection(self, schema: Dict) -> Dict:
+        """Create a collection from a schema."""
+        response = await self._request("POST", "/collections", json=schema)
+        return response.json()
+
+    async def update_collection(self, name: str, fields: List[Dict]) -> Dict:
+        """Add fields to an existing collection's schema."""
+        response = await self._request("PATCH", f"/collections/{name}", json={"fields": fields})
+        return response.json()
+
+    async def upsert_synonym(self, collection: str, synonym_id: str, synonyms: List[str]) -> None:
+        """Create or replace a multi-way synonym: any of ``synonyms`` matches the others."""
+        await self._request(
+            "PUT", f"/collections/{collection}/synonyms/{synonym_id}", json={"synonyms": synonyms}
+        )
+
+    async def delete_collection(self, name: str) -> None:
+        """Drop a collection and all its documents."""
+        await self._request("DELETE", f"/collections/{name}")
+
+    async def retrieve_alias(self, name: str) -> Optional[str]:
+        """Name of the collection an alias points to, or None if unset."""
+        alias = await self._get_optional(f"/aliases/{name}")
+        return alias["collection_name"] if alias else None
+
+    async def upsert_alias(self, name: str, collection: str) -> None:
+        """Create an alias or atomically repoint it at another collection."""
+        await self._request("PUT", f"/aliases/{name}", json={"collection_name": collection})
+
+    async def search(self, collection: str, params: Dict) -> Dict:
+        """Run a search against a collection."""
+        params = {key: value for key, value in params.items() if value not in (None, "")}
+        response = await self._request(
+            "GET", f"/collections/{collection}/documents/search", params=params
+        )
+        return response.json()
+
+    async def import_documents(
+        self,
+        collection: str,
+        documents: List[Dict],
+        action: str = "upsert"
+    ) -> List[Dict]:
+        """Bulk import documents, returning the per-document results."""
+        body = "\n".join(json.dumps(document) for document in documents)
+        response = await self._request(
+            "POST",
+            f"/collections/{collection}/documents/import",
+            params={"action": action},
+            content=body.encode("utf-8"),
+            headers={"Content-Type": "text/plain"}
+        )
+        results = [json.loads(line) for line in response.text.splitlines() if line]
+
+        failed = [result for result in results if not result.get("success")]
+        if failed:
+            logger.warning(f"{len(failed)} documents failed to import: {failed[:3]}")
+        return results
+
+    async def export_documents(self, collection: str, params: Optional[Dict] = None) -> List[Dict]:
+        """Export all documents of a collection."""
+        response = await self._request(
+            "GET", f"/collections/{collection}/documents/export", params=params or {}
+        )
+        return [json.loads(line) for line in response.text.splitlines() if line]
+
+    async def delete_document(self, collection: str, doc_id: str) -> None:
+        """Delete a single document by id."""
+        await self._request("DELETE", f"/collections/{collection}/documents/{doc_id}")
+
+    async def delete_documents(self, collection: str, doc_ids: List[str], batch_size: int = 100) -> None:
+        """Delete documents by id, one filtered request per batch."""
+        for start in range(0, len(doc_ids), batch_size):
+            batch = doc_ids[start:start + batch_size]
+            await self._request(
+                "DELETE",
+                f"/collections/{collection}/documents",
+                params={"filter_by": f"id:[{','.join(batch)}]", "batch_size": batch_size}
+            )
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        await self.http.aclose()
@@ -0,0 +1,21 @@
+"""Shared fixtures; the suite runs offline, without Notion, Redis or Typesense."""
+import os
+
+import pytest
+
+# Required settings, so Settings() can be built without a .env file
+for name, value in {
+    "TELEGRAM_BOT_TOKEN": "0:test",
+    "NOTION_TOKEN": "test",
+    "OFFERS_DATABASE_ID": "offers",
+    "ADVERTISERS_DATABASE_ID": "advertisers",
+    "TYPESENSE_API_KEY": "test",
+    "WEBHOOK_SECRET": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+from src.config.settings import Settings
+
+@pytest.fixture
+def settings() -> Settings:
+    return Settings(METRICS_PORT=0, SNAPSHOT_PATH="")
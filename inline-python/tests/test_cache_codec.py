@@ -0,0 +1,24 @@
+import json
+
+from src.services.cache_codec import COMPRESSED, RAW, CacheCodec
+
+VALUE = {"ids": [f"deal-{i}" for i in range(200)], "exhausted": True}
+
+def test_small_values_are_stored_plain():
+    codec = CacheCodec(compression_threshold=1 << 20)
+    data = codec.encode(VALUE)
+    assert data[:1] == RAW
+    assert codec.decode(data) == VALUE
+
+def test_large_values_are_compressed():
+    codec = CacheCodec(compression_threshold=64)
+    data = codec.encode(VALUE)
+    assert data[:1] == COMPRESSED
+    assert len(data) < len(json.dumps(VALUE))
+    assert codec.decode(data) == VALUE
+
+def test_zero_threshold_never_compresses():
+    assert CacheCodec(compression_threshold=0).encode(VALUE)[:1] == RAW
+
+def test_headerless_json_from_older_versions_decodes():
+    assert CacheCodec().decode(json.dumps(["a", "b"]).encode()) == ["a", "b"]
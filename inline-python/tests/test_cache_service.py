@@ -0,0 +1,84 @@
+import fakeredis
+import pytest
+
+from src.models.exceptions import CacheError
+from src.services.cache_service import CacheService, SearchCursor
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+def make_cache(settings, server) -> CacheService:
+    cache = CacheService(settings)
+    cache.redis = fakeredis.FakeAsyncRedis(server=server)
+    return cache
+
+async def test_version_bumps_only_when_content_changes(settings, server):
+    cache = make_cache(settings, server)
+    assert await cache.update_catalog_version("hash-1") == 1
+    assert await cache.update_catalog_version("hash-1") == 1
+    assert await cache.update_catalog_version("hash-2") == 2
+
+async def test_results_are_cached_per_version(settings, server):
+    cache = make_cache(settings, server)
+    await cache.update_catalog_version("hash-1")
+    await cache.cache_search_results("de", SearchCursor(["a", "b"], True))
+    assert await cache.get_search_results("de") == SearchCursor(["a", "b"], True)
+
+    await cache.update_catalog_version("hash-2")
+    assert await cache.get_search_results("de") is None
+
+async def test_replica_follows_a_version_bumped_by_its_peer(settings, server):
+    replica_a = make_cache(settings, server)
+    replica_b = make_cache(settings, server)
+    await replica_a.update_catalog_version("hash-1")
+    await replica_b.update_catalog_version("hash-1")
+    await replica_b.cache_search_results("de", SearchCursor(["old"], True))
+    assert await replica_b.get_search_results("de") == SearchCursor(["old"], True)
+
+    # A syncs first and bumps; B then syncs the same catalog
+    assert await replica_a.update_catalog_version("hash-2") == 2
+    assert await replica_b.update_catalog_version("hash-2") == 2
+
+    assert await replica_b.get_search_results("de") is None
+    assert len(replica_b.local) == 0
+
+async def test_same_catalog_from_every_replica_bumps_once(settings, server):
+    replicas = [make_cache(settings, server) for _ in range(3)]
+    versions = [await replica.update_catalog_version("hash-1") for replica in replicas]
+    assert versions == [1, 1, 1]
+
+async def test_batch_lookup_uses_the_current_version(settings, server):
+    cache = make_cache(settings, server)
+    await cache.update_catalog_version("hash-1")
+    await cache.cache_search_results("de", SearchCursor(["a"], True))
+    await cache.cache_search_results("fr", SearchCursor(["b"], True))
+    cache.local.clear()
+
+    assert await cache.get_many_search_results(["de", "fr", "it"]) == {
+        "de": SearchCursor(["a"], True),
+        "fr": SearchCursor(["b"], True),
+    }
+
+async def test_failed_version_update_drops_local_entries(settings, server):
+    cache = make_cache(settings, server)
+    await cache.update_catalog_version("hash-1")
+    await cache.cache_search_results("de", SearchCursor(["a"], True))
+    assert len(cache.local) == 1
+
+    server.connected = False
+    with pytest.raises(CacheError):
+        await cache.update_catalog_version("hash-2")
+    assert len(cache.local) == 0
+
+async def test_cursors_keep_their_completeness(settings, server):
+    cache = make_cache(settings, server)
+    await cache.cache_search_results("de", SearchCursor(["a", "b"], False))
+    cache.local.clear()
+    assert await cache.get_search_results("de") == SearchCursor(["a", "b"], False)
+
+async def test_id_lists_from_older_versions_read_as_misses(settings, server):
+    cache = make_cache(settings, server)
+    await cache.redis.set(await cache._search_key("de"), cache.codec.encode(["a"]))
+    assert await cache.get_search_results("de") is None
+    assert await cache.get_many_search_results(["de"]) == {}
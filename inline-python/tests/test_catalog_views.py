@@ -0,0 +1,40 @@
+from src.services.catalog_views import CatalogViews
+from src.services.deal_index import DealIndex
+
+def deal(deal_id, geo="DE", partner="Sutra", sources=("Facebook",), edited="2024-01-01"):
+    return {"id": deal_id, "geo": geo, "partner": partner, "sources": list(sources), "last_updated": edited}
+
+DEALS = {
+    "a": deal("a", edited="2024-01-03"),
+    "b": deal("b", geo="AT", partner="Deum", sources=("FB",), edited="2024-01-02"),
+    "c": deal("c", geo="FR", sources=("Google",), edited="2024-01-01"),
+}
+
+def test_views_are_sorted_most_recent_first():
+    views = CatalogViews(DEALS)
+    assert views.lookup("") == ("a", "b", "c")
+    assert views.lookup("sutra") == ("a", "c")
+    assert views.lookup("at") == ("b",)
+    assert views.lookup("nothing") is None
+
+def test_aliased_sources_share_a_view():
+    assert CatalogViews(DEALS).lookup("facebook") == ("a", "b")
+
+def test_updates_match_a_rebuild():
+    views = CatalogViews(DEALS)
+    deals = {**DEALS, "c": deal("c", geo="AT", edited="2024-01-04")}
+    del deals["a"]
+    updated = views.updated(deals, ["c"], ["a"])
+    rebuilt = CatalogViews(deals)
+    for query in ("", "at", "de", "sutra", "facebook", "google"):
+        assert updated.lookup(query) == rebuilt.lookup(query)
+    assert views.lookup("de") == ("a",)  # the old instance is untouched
+
+def test_exact_count_confirms_complete_views():
+    index = DealIndex(DEALS.values())
+    views = CatalogViews(DEALS)
+    assert index.exact_count("at") == len(views.lookup("at"))
+    assert index.exact_count("facebook") == len(views.lookup("facebook"))
+    # "de" is also the prefix of Deum, and typos make "sutr" loose
+    assert index.exact_count("de") is None
+    assert index.exact_count("sutr") is None
@@ -0,0 +1,278 @@
+import fakeredis
+import pytest
+
+from src.bot.deal_bot import DealBot
+from src.models.exceptions import NotionSyncError, SearchError
+from src.services.cache_service import CacheService, SearchCursor
+from src.services.deal_filter import DealFilter
+from src.services.sync_coordinator import SyncProgress
+
+def make_deal(deal_id: str, geo: str = "DE", edited: str = "2024-01-01T00:00:00Z") -> dict:
+    return {
+        "id": deal_id,
+        "partner": "Sutra",
+        "sources": ["Facebook"],
+        "geo": geo,
+        "language": ["German"],
+        "price": "1000+9%",
+        "cpa": 1000.0,
+        "crg": 9.0,
+        "cpl": None,
+        "pricing_model": "cpa_crg",
+        "funnels": ["Quantum AI"],
+        "formatted_display": f"Sutra {geo}",
+        "formatted_funnels": "Quantum AI",
+        "last_updated": edited,
+    }
+
+class FakeNotion:
+    def __init__(self):
+        self.batches = []
+        self.error = None
+        self.high_water_mark = None
+
+    async def stream_deals(self, edited_since=None):
+        if self.error:
+            raise self.error
+        for batch in self.batches:
+            yield batch
+
+    async def fetch_deals(self, page_ids):
+        deals = [deal for batch in self.batches for deal in batch if deal["id"] in page_ids]
+        found = {deal["id"] for deal in deals}
+        return deals, [page_id for page_id in page_ids if page_id not in found]
+
+class FakeSearch:
+    """Typesense stand-in that records writes and fails while ``down``."""
+
+    def __init__(self, deals=()):
+        self.down = False
+        self.calls = []
+        self.deals = list(deals)
+        self.searches = 0
+
+    async def _write(self, name, value, result):
+        if self.down:
+            raise SearchError(f"{name} failed: connection refused")
+        self.calls.append((name, value))
+        return result
+
+    async def search_deals(self, query, limit=10, deal_filter=None, page=1):
+        self.searches += 1
+        return self.deals[(page - 1) * limit:page * limit]
+
+    async def update_index(self, deals):
+        return await self._write("update", sorted(deal["id"] for deal in deals), len(deals))
+
+    async def remove_from_index(self, deal_ids):
+        return await self._write("remove", sorted(deal_ids), len(deal_ids))
+
+    async def reconcile_index(self, deals):
+        return await self._write("reconcile", sorted(deals), 0)
+
+    async def rebuild_index(self, deals):
+        return await self._write("rebuild", sorted(deals), len(deals))
+
+@pytest.fixture
+def bot(settings):
+    bot = DealBot(settings.model_copy(update={"TYPESENSE_BLUE_GREEN": False}))
+    bot.notion_service = FakeNotion()
+    bot.search_service = FakeSearch()
+    bot.cache_service = CacheService(bot.settings)
+    bot.cache_service.redis = fakeredis.FakeAsyncRedis()
+    return bot
+
+async def test_typesense_outage_does_not_freeze_the_catalog(bot):
+    bot.notion_service.batches = [[make_deal("a"), make_deal("b", "AT")]]
+    bot.search_service.down = True
+
+    await bot.sync_notion_data(full=True)
+
+    assert set(bot._deals) == {"a", "b"}
+    assert set(bot._rendered) == {"a", "b"}
+    assert len(bot.deal_index) == 2
+    assert bot.catalog_views.lookup("at") == ("b",)
+    assert bot._index_stale
+
+async def test_next_sync_retries_the_whole_catalog(bot):
+    bot.notion_service.batches = [[make_deal("a"), make_deal("b")]]
+    bot.search_service.down = True
+    await bot.sync_notion_data(full=True)
+
+    bot.search_service.down = False
+    bot._last_full_sync = bot._last_sync_time  # the next sync is incremental
+    await bot.cache_service.set_sync_watermark("2024-01-01T00:00:00Z")
+    bot.notion_service.batches = [[make_deal("c", edited="2024-01-02T00:00:00Z")]]
+    await bot.sync_notion_data()
+
+    assert bot.search_service.calls == [
+        ("update", ["c"]),
+        ("update", ["a", "b", "c"]),
+        ("reconcile", ["a", "b", "c"]),
+    ]
+    assert not bot._index_stale
+
+async def test_incremental_sync_applies_notion_changes_while_typesense_is_down(bot):
+    bot.notion_service.batches = [[make_deal("a"), make_deal("b")]]
+    await bot.sync_notion_data(full=True)
+    version = await bot.cache_service._get_version()
+
+    bot.search_service.down = True
+    bot._last_full_sync = bot._last_sync_time
+    await bot.cache_service.set_sync_watermark("2024-01-01T00:00:00Z")
+    bot.notion_service.batches = [[make_deal("a", "FR", "2024-01-02T00:00:00Z")]]
+    await bot.sync_notion_data()
+
+    assert bot._deals["a"]["geo"] == "FR"
+    assert bot.catalog_views.lookup("fr") == ("a",)
+    assert await bot.cache_service._get_version() > version
+
+async def test_failed_blue_green_rebuild_still_updates_the_catalog(bot):
+    bot.settings = bot.settings.model_copy(update={"TYPESENSE_BLUE_GREEN": True})
+    bot.notion_service.batches = [[make_deal("a")]]
+    bot.search_service.down = True
+
+    await bot.sync_notion_data(full=True)
+
+    assert set(bot._deals) == {"a"}
+    assert bot.catalog_views.lookup("") == ("a",)
+    assert bot._index_stale
+
+async def test_notion_failure_keeps_the_pending_retry(bot):
+    bot._index_stale = True
+    bot.notion_service.error = NotionSyncError("Notion is down")
+
+    with pytest.raises(NotionSyncError):
+        await bot.sync_notion_data(full=True)
+    assert bot._index_stale
+
+async def restore_snapshot(bot, deals):
+    """Catalog as _load_snapshot leaves it: no sync has written to Typesense yet."""
+    bot._deals = {deal["id"]: deal for deal in deals}
+    bot._rendered = {deal["id"]: bot._render_inline_result(deal) for deal in deals}
+    await bot._rebuild_deal_index()
+    await bot._update_catalog_views()
+
+async def test_webhook_deletion_before_the_first_full_sync(bot):
+    await restore_snapshot(bot, [make_deal("a"), make_deal("b", "AT")])
+    version = await bot.cache_service._get_version()
+
+    await bot.sync_notion_pages(set(), {"a"})
+
+    assert set(bot._deals) == {"b"}
+    assert set(bot._rendered) == {"b"}
+    assert len(bot.deal_index) == 1
+    assert bot.catalog_views.lookup("de") is None
+    assert bot.catalog_views.lookup("") == ("b",)
+    assert bot.search_service.calls == [("update", []), ("remove", ["a"])]
+    assert await bot.cache_service._get_version() > version
+
+async def test_webhook_changes_apply_while_typesense_is_down(bot):
+    await restore_snapshot(bot, [make_deal("a"), make_deal("b")])
+    bot.notion_service.batches = [[make_deal("a", "FR", "2024-01-02T00:00:00Z")]]
+    bot.search_service.down = True
+
+    await bot.sync_notion_pages({"a", "gone"}, {"b"})
+
+    assert set(bot._deals) == {"a"}
+    assert bot._deals["a"]["geo"] == "FR"
+    assert bot.catalog_views.lookup("fr") == ("a",)
+    assert bot._index_stale
+
+async def test_unchanged_webhook_pages_leave_the_catalog_alone(bot):
+    await restore_snapshot(bot, [make_deal("a")])
+    bot.notion_service.batches = [[make_deal("a")]]
+    views = bot.catalog_views
+
+    await bot.sync_notion_pages({"a"}, set())
+    assert bot.catalog_views is views
+
+async def test_redis_outage_does_not_fail_the_sync(bot, tmp_path):
+    bot.settings = bot.settings.model_copy(update={"SNAPSHOT_PATH": str(tmp_path / "deals.snapshot")})
+    server = fakeredis.FakeServer()
+    bot.cache_service.redis = fakeredis.FakeAsyncRedis(server=server)
+    server.connected = False
+    bot.notion_service.batches = [[make_deal("a")]]
+
+    await bot.sync_notion_data(full=True)
+
+    assert set(bot._deals) == {"a"}
+    assert (tmp_path / "deals.snapshot").exists()
+    assert bot._version_stale
+
+    # Once Redis is back the version moves even though nothing changed
+    server.connected = True
+    await bot.sync_notion_data(full=True)
+    assert not bot._version_stale
+    assert await bot.cache_service._get_version() == 1
+
+async def test_views_do_not_shadow_prefix_matches(bot):
+    deum = {**make_deal("b", "AT"), "partner": "Deum"}
+    french = {**make_deal("d", "BE"), "language": ["French"]}
+    await restore_snapshot(bot, [make_deal("a"), deum, make_deal("c", "FR"), french])
+
+    assert set(await bot._find_deal_ids("de", "de", DealFilter(), 10, 1, "q")) == {"a", "b"}
+    assert set(await bot._find_deal_ids("fr", "fr", DealFilter(), 10, 1, "q")) == {"c", "d"}
+    assert await bot._find_deal_ids("at", "at", DealFilter(), 10, 1, "q") == ["b"]
+
+async def test_cursors_cached_by_another_process_are_searched_again(settings):
+    server = fakeredis.FakeServer()
+    deals = [make_deal("a"), make_deal("b", "AT")]
+
+    def replica():
+        # Restarted without a snapshot: nothing loaded, no local index
+        bot = DealBot(settings.model_copy(update={"INLINE_DEBOUNCE_MS": 0}))
+        bot.search_service = FakeSearch(deals)
+        bot.cache_service = CacheService(bot.settings)
+        bot.cache_service.redis = fakeredis.FakeAsyncRedis(server=server)
+        bot._latest_inline[1] = "q"
+        return bot
+
+    first, second = replica(), replica()
+    assert await first._find_deal_ids("sutra", "sutra", DealFilter(), 10, 1, "q") == ["a", "b"]
+    assert await second._find_deal_ids("sutra", "sutra", DealFilter(), 10, 1, "q") == ["a", "b"]
+    assert second.search_service.searches == 1
+    assert [second._inline_result(deal_id).id for deal_id in ("a", "b")] == ["a", "b"]
+
+    # Refining the cached "sutra" cursor needs the deals themselves
+    assert await second._find_deal_ids("sutra a", "sutra a", DealFilter(), 10, 1, "q") == ["a", "b"]
+    assert second.search_service.searches == 2
+
+async def test_refined_cursors_are_never_extended(bot):
+    bot.settings = bot.settings.model_copy(update={"INLINE_DEBOUNCE_MS": 0})
+    bot.cursor_window = bot.results_limit = 2
+    deals = [make_deal("a"), make_deal("b"), make_deal("c", "AT"), make_deal("d", "AT")]
+    bot._deals = {deal["id"]: deal for deal in deals}
+    bot.search_service.deals = deals
+    bot._latest_inline[1] = "q"
+    await bot.cache_service.cache_search_results("sutra", SearchCursor(["a", "b", "c", "d"], True))
+
+    # Two refined matches fill a whole window, yet they are all of them
+    assert await bot._find_deal_ids("sutra at", "sutra at", DealFilter(), 4, 1, "q") == ["c", "d"]
+    assert await bot._find_deal_ids("sutra at", "sutra at", DealFilter(), 4, 1, "q") == ["c", "d"]
+    assert bot.search_service.searches == 0
+
+async def test_progress_reports_catalog_changes_not_index_writes(bot):
+    bot.notion_service.batches = [[make_deal("a"), make_deal("b")]]
+    await bot.sync_notion_data(full=True)
+
+    # The fake reports every batch as upserted, as after a restart
+    progress = SyncProgress(True)
+    await bot.sync_notion_data(full=True, progress=progress)
+    assert not progress.changed
+
+    bot.notion_service.batches = [[make_deal("a", "FR", "2024-01-02T00:00:00Z")]]
+    progress = SyncProgress(True)
+    await bot.sync_notion_data(full=True, progress=progress)
+    assert (progress.updated, progress.deleted) == (1, 1)
+    assert progress.changed
+
+async def test_page_sync_skips_removals_the_catalog_never_held(bot):
+    await restore_snapshot(bot, [make_deal("a")])
+    progress = SyncProgress(False, targeted=True)
+
+    await bot.sync_notion_pages({"gone"}, {"unknown"}, progress)
+
+    assert bot.search_service.calls == [("update", []), ("remove", [])]
+    assert not progress.changed
+    assert progress.removed == 0
@@ -0,0 +1,77 @@
+import pytest
+
+from src.services.deal_filter import Condition, DealFilter, parse_number, parse_query
+
+@pytest.mark.parametrize("text, expected", [
+    ("1300", 1300.0),
+    ("1,300", 1300.0),
+    ("1,300,000", 1300000.0),
+    ("2.5", 2.5),
+    ("1,300.5", 1300.5),
+])
+def test_parse_number(text, expected):
+    assert parse_number(text) == expected
+
+@pytest.mark.parametrize("text", ["2,5", "1,0000", "13,00", "1.2.3", ""])
+def test_parse_number_rejects_comma_decimals(text):
+    with pytest.raises(ValueError):
+        parse_number(text)
+
+@pytest.mark.parametrize("query, field, op, value", [
+    ("cpa>1000", "cpa", ">", 1000.0),
+    ("cpa>1,000", "cpa", ">", 1000.0),
+    ("cpa >= 1,300.5", "cpa", ">=", 1300.5),
+    ("crg<=10%", "crg", "<=", 10.0),
+    ("cpl=25", "cpl", "=", 25.0),
+])
+def test_price_conditions(query, field, op, value):
+    text, deal_filter = parse_query(query)
+    assert text == ""
+    assert deal_filter.conditions == (Condition(field, op, value),)
+
+def test_thousands_compile_to_filter_by():
+    assert parse_query("cpa>1,000")[1].to_filter_by() == "cpa:>1000"
+    assert parse_query("cpl:1,000-2,000")[1].to_filter_by() == "cpl:>=1000 && cpl:<=2000"
+
+@pytest.mark.parametrize("query", ["cpa>2,5", "cpa>1,0000", "cpl:1,00"])
+def test_malformed_numbers_stay_free_text(query):
+    text, deal_filter = parse_query(query)
+    assert text == query
+    assert not deal_filter
+
+def test_range_is_ordered():
+    _, deal_filter = parse_query("cpl:25-15")
+    assert deal_filter.to_filter_by() == "cpl:>=15 && cpl:<=25"
+    assert deal_filter.sort == ("cpl", True)
+
+def test_facets_and_explicit_sort():
+    text, deal_filter = parse_query("geo:de,at src:fb model:cpl sort:-cpa bitcoin")
+    assert text == "bitcoin"
+    assert deal_filter.to_filter_by() == (
+        "geo:=[AT,DE] && pricing_model:=[cpa_crg_or_cpl,cpl] && sources:[facebook,fb]"
+    )
+    assert deal_filter.to_sort_by() == "cpa:desc,_text_match:desc"
+
+def test_quoted_values_are_backtick_quoted():
+    text, deal_filter = parse_query('funnel:"Quantum AI" partner:sutra')
+    assert text == ""
+    assert deal_filter.to_filter_by() == "funnels:[`quantum ai`] && partner:[sutra]"
+
+def test_dangling_key_is_dropped():
+    assert parse_query("crypto geo:") == ("crypto", DealFilter())
+
+def test_cache_key_ignores_spelling():
+    assert parse_query("geo:DE cpa>1,000")[1].cache_key() == parse_query("cpa>1000 geo:de")[1].cache_key()
+
+def test_local_matching():
+    _, deal_filter = parse_query("geo:de src:facebook cpa>=1,000")
+    assert deal_filter.matches({"geo": "DE", "sources": ["Facebook", "Google"], "cpa": 1000.0})
+    assert not deal_filter.matches({"geo": "DE", "sources": ["Facebook"], "cpa": 900.0})
+    assert not deal_filter.matches({"geo": "DE", "sources": ["Facebook"], "cpa": None})
+    assert not deal_filter.matches({"geo": "AT", "sources": ["Facebook"], "cpa": 1200.0})
+
+def test_aliased_facets_match_every_spelling():
+    _, deal_filter = parse_query("src:fb lang:english geo:uk")
+    assert deal_filter.to_filter_by() == "geo:=[GB,UK] && language:[en,eng,english] && sources:[facebook,fb]"
+    assert deal_filter.matches({"geo": "GB", "sources": ["FB"], "language": ["EN"]})
+    assert deal_filter.matches({"geo": "UK", "sources": ["Facebook"], "language": ["English"]})
@@ -0,0 +1,51 @@
+from src.services.deal_filter import parse_query
+from src.services.deal_index import DealIndex, matches_query, tokenize
+
+def deal(deal_id, partner="Sutra", geo="DE", sources=("Facebook",), funnels=("Quantum AI",), cpa=1000.0):
+    return {
+        "id": deal_id,
+        "partner": partner,
+        "geo": geo,
+        "sources": list(sources),
+        "language": ["German"],
+        "funnels": list(funnels),
+        "cpa": cpa,
+    }
+
+DEALS = [
+    deal("a"),
+    deal("b", partner="Deum", geo="AT", funnels=("Oil Profit",), cpa=1200.0),
+    deal("c", partner="Acolyte", geo="FR", sources=("Google",), funnels=("Bitcoin Buyer",), cpa=900.0),
+]
+
+def ids(deals):
+    return [deal["id"] for deal in deals]
+
+def test_tokenize():
+    assert tokenize("Quantum-AI, FB!") == ["quantum", "ai", "fb"]
+
+def test_last_token_matches_as_a_prefix():
+    index = DealIndex(DEALS)
+    assert ids(index.search("oil prof")) == ["b"]
+    assert ids(index.search("prof oil")) == []
+    assert set(ids(index.search("de"))) == {"a", "b"}
+
+def test_typos_are_tolerated():
+    assert ids(DealIndex(DEALS).search("acolyet")) == ["c"]
+
+def test_trailing_tokens_are_dropped_when_nothing_matches_all():
+    assert ids(DealIndex(DEALS).search("acolyte zzz")) == ["c"]
+
+def test_empty_query_lists_every_deal():
+    index = DealIndex(DEALS)
+    assert ids(index.search("")) == ["a", "b", "c"]
+    assert ids(index.search("", limit=1)) == ["a"]
+
+def test_filters_and_price_order():
+    _, deal_filter = parse_query("cpa>=950")
+    assert ids(DealIndex(DEALS).search("", deal_filter=deal_filter)) == ["b", "a"]
+
+def test_matches_query_agrees_with_the_index():
+    for query in ("oil prof", "sutra de", "google"):
+        found = set(ids(DealIndex(DEALS).search(query, limit=None)))
+        assert found == {d["id"] for d in DEALS if matches_query(d, query)}
@@ -0,0 +1,41 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from src.services.deal_parser import parse_deals
+
+RULES_PATH = Path(__file__).resolve().parents[2] / "Deal Formatting.md"
+EXAMPLE_PATTERN = re.compile(r"Input:\n```\n(.*?)```\s*\nOutput:\n```\n(.*?)```", re.S)
+
+def formatted(text: str):
+    return [deal.format() for deal in parse_deals(text)]
+
+@pytest.mark.parametrize("text, expected", [
+    (
+        "Partner: Sutra\nFR 1000+9% doing 10% ByteToken360 - FB GG. until 5% wrong number.",
+        "TIER1-Sutra-FR-French-Facebook|Google-cpa_crg-1000-0.09-&-ByteToken360-10-0.05",
+    ),
+    (
+        "Partner: Acolyte\nFR 1000+9% doing 10%\nByteToken360 - FB GG.\nuntil 5% wrong number.",
+        "TIER1-Acolyte-FR-Native-Facebook|Google-cpa_crg-1000-0.09-&-ByteToken360-10-0.05",
+    ),
+    (
+        "Partner: Deum\nMX es\nCpl 15$\nSource: FB\nFunnel: Oil profit, Riquezal\ncr: 2-3%",
+        "LATAM-Deum-MX-Spanish-Facebook-cpl-&-&-15-Oil Profit|Riquezal-2|3-&",
+    ),
+    (
+        "Partner: Sutra\nDE 1,300+10% FB",
+        "TIER1-Sutra-DE-Native-Facebook-cpa_crg-1300-0.10-&-&-&-&",
+    ),
+])
+def test_parse_deal(text, expected):
+    assert formatted(text) == [expected]
+
+def test_formatting_examples():
+    if not RULES_PATH.exists():
+        pytest.skip(f"{RULES_PATH.name} not found")
+    examples = EXAMPLE_PATTERN.findall(RULES_PATH.read_text())
+    assert examples
+    for raw, expected in examples:
+        assert formatted(raw) == [line.strip() for line in expected.strip().splitlines()], raw
@@ -0,0 +1,15 @@
+from src.services.fingerprint import catalog_fingerprint, deal_fingerprint
+
+DEAL = {"id": "a", "partner": "Sutra", "geo": "DE", "last_updated": "2024-01-01T00:00:00Z"}
+
+def test_fingerprint_ignores_key_order():
+    assert deal_fingerprint(DEAL) == deal_fingerprint(dict(reversed(list(DEAL.items()))))
+
+def test_edit_time_alone_changes_the_fingerprint():
+    edited = {**DEAL, "last_updated": "2024-01-02T00:00:00Z"}
+    assert deal_fingerprint(edited) != deal_fingerprint(DEAL)
+    assert catalog_fingerprint([edited]) != catalog_fingerprint([DEAL])
+
+def test_catalog_fingerprint_ignores_deal_order():
+    other = {**DEAL, "id": "b", "geo": "AT"}
+    assert catalog_fingerprint([DEAL, other]) == catalog_fingerprint([other, DEAL])
@@ -0,0 +1,76 @@
+import csv
+import io
+
+import pytest
+
+from src.models.exceptions import LeadImportError
+from src.services.lead_import import COLUMNS, aggregate_leads, broker_rejected
+
+HEADER = ["Lead ID", *COLUMNS.values()]
+REJECTED = '{"status": false, "error": "Duplicate lead"}'
+ACCEPTED = '{"status": true, "id": 1}'
+
+def export(*rows) -> io.StringIO:
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(HEADER)
+    writer.writerows(rows)
+    text.seek(0)
+    return text
+
+def lead(lead_id, affiliate="A", country="DE", status="New", deposited="", response=ACCEPTED):
+    return [lead_id, "2024-01-01 10:00:00", country, "Camp", affiliate, status, deposited, response]
+
+def test_groups_and_totals():
+    stats = aggregate_leads(export(
+        lead("1", status="Interested", deposited="2024-01-01 12:00:00"),
+        lead("2", status="No Answer"),
+        lead("3", affiliate="B", country="AT", response=REJECTED),
+    ))
+
+    assert stats.rows == 3
+    a, b = stats.groups("affiliate")
+    assert (a.name, a.leads, a.deposits, a.contacted, a.hours_to_deposit) == ("A", 2, 1, 1, 2.0)
+    assert (b.name, b.leads, b.rejected) == ("B", 1, 1)
+    assert stats.totals().deposits == 1
+    assert stats.status_counts()["no answer"] == 1
+
+def test_rows_of_the_wrong_width_are_counted():
+    stats = aggregate_leads(export(
+        lead("1"),
+        lead("2")[:-2],
+        [*lead("3"), "extra"],
+        lead("4"),
+    ))
+    assert stats.rows == 2
+    assert stats.skipped == 2
+
+def test_a_chunk_of_malformed_rows_does_not_end_the_read():
+    stats = aggregate_leads(export(lead("1"), lead("2")[:3], lead("3")), chunk_size=1)
+    assert stats.rows == 2
+    assert stats.skipped == 1
+
+def test_chunking_does_not_change_the_totals():
+    rows = [lead(str(i), affiliate="AB"[i % 2]) for i in range(10)]
+    whole = aggregate_leads(export(*rows))
+    chunked = aggregate_leads(export(*rows), chunk_size=3)
+    assert whole.groups("affiliate") == chunked.groups("affiliate")
+
+def test_missing_columns_are_rejected():
+    with pytest.raises(LeadImportError, match="Country"):
+        aggregate_leads(io.StringIO("Created Date,Campaign\n2024-01-01,Camp\n"))
+
+def test_invalid_group_column():
+    with pytest.raises(ValueError):
+        aggregate_leads(export(lead("1"))).groups("status")
+
+@pytest.mark.parametrize("response, rejected", [
+    (REJECTED, True),
+    ('{"ret_code": 500}', True),
+    ('{"ret_code": 200}', False),
+    ('{"errors": []}', True),
+    (ACCEPTED, False),
+    ('not json "status": false', False),
+])
+def test_broker_rejected(response, rejected):
+    assert broker_rejected(response) is rejected
@@ -0,0 +1,34 @@
+import time
+
+from src.services.lru_cache import LRUCache
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert len(cache) == 2
+
+def test_entries_expire(monkeypatch):
+    cache = LRUCache(ttl=10)
+    cache.set("a", 1)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_hit_ratio_and_clear():
+    cache = LRUCache()
+    assert cache.hit_ratio == 0.0
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    assert cache.hit_ratio == 0.5
+
+    cache.clear()
+    assert cache.get("a") is None
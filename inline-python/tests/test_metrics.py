@@ -0,0 +1,44 @@
+from src.services.metrics import Histogram, MetricsRegistry
+
+def test_histogram_buckets_and_percentiles():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [1, 3]
+    assert histogram.count == 4
+    assert histogram.sum == 3.05
+    assert histogram.percentile(50) == 0.5
+    assert histogram.percentile(99) == 2.0
+    assert Histogram().percentile(50) is None
+
+def test_counters_are_kept_per_label_set():
+    registry = MetricsRegistry()
+    registry.increment("cache_hits_total", tier="local")
+    registry.increment("cache_hits_total", 2, tier="redis")
+    registry.increment("cache_misses_total", tier="redis")
+
+    assert registry.counter("cache_hits_total", tier="redis") == 2
+    assert registry.counter_total("cache_hits_total") == 3
+    assert registry.hit_ratio("redis") == 2 / 3
+    assert registry.hit_ratio("other") is None
+
+def test_timer_feeds_stage_percentiles():
+    registry = MetricsRegistry()
+    with registry.timer("local_search"):
+        pass
+    [(stage, count, p50, p95, p99)] = registry.stage_percentiles()
+    assert (stage, count) == ("local_search", 1)
+    assert 0 <= p50 == p95 == p99
+
+def test_prometheus_rendering():
+    registry = MetricsRegistry()
+    registry.increment("webhook_events_total", result="accepted")
+    registry.observe("stage_seconds", 0.002, stage="format")
+    text = registry.render_prometheus()
+
+    assert "# TYPE webhook_events_total counter" in text
+    assert 'webhook_events_total{result="accepted"} 1' in text
+    assert 'stage_seconds_bucket{stage="format",le="0.0025"} 1' in text
+    assert 'stage_seconds_bucket{stage="format",le="0.001"} 0' in text
+    assert 'stage_seconds_count{stage="format"} 1' in text
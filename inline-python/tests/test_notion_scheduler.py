@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from notion_client.errors import APIResponseError
+
+from src.models.exceptions import CircuitOpenError
+from src.services.notion_scheduler import CircuitBreaker, NotionRequestScheduler, _retry_after
+
+def api_error(status: int, headers=None) -> APIResponseError:
+    return APIResponseError(
+        code="rate_limited" if status == 429 else "internal_server_error",
+        status=status,
+        message="error",
+        headers=httpx.Headers(headers or {}),
+        raw_body_text="",
+    )
+
+def make_scheduler(settings, **overrides) -> NotionRequestScheduler:
+    values = {
+        "NOTION_REQUESTS_PER_SECOND": 1_000_000,
+        "NOTION_BACKOFF_BASE": 0.0,
+        "NOTION_CIRCUIT_FAILURE_THRESHOLD": 2,
+        "NOTION_CIRCUIT_RESET_TIMEOUT": 60,
+        **overrides,
+    }
+    return NotionRequestScheduler(settings.model_copy(update=values))
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    """Trip the breaker and move it past its reset timeout."""
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker._opened_at = time.monotonic() - breaker.reset_timeout
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    open_breaker(breaker)
+    assert breaker.state == "half_open"
+
+    assert breaker.before_call() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.before_call() is False
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    open_breaker(breaker)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+async def test_cancelled_trial_call_is_released(settings):
+    scheduler = make_scheduler(settings)
+    open_breaker(scheduler.breaker)
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.sleep(3600)
+
+    task = asyncio.create_task(scheduler.call(hang))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert scheduler.breaker.state == "half_open"
+
+    async def ok():
+        return "ok"
+
+    assert await scheduler.call(ok) == "ok"
+    assert scheduler.breaker.state == "closed"
+
+async def test_trial_cancelled_while_waiting_for_a_token_is_released(settings):
+    scheduler = make_scheduler(settings)
+    open_breaker(scheduler.breaker)
+    scheduler.bucket.pause(3600)
+
+    async def ok():
+        return "ok"
+
+    task = asyncio.create_task(scheduler.call(ok))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    scheduler.bucket._paused_until = 0.0
+    assert await scheduler.call(ok) == "ok"
+
+async def test_transient_errors_are_retried(settings):
+    scheduler = make_scheduler(settings, NOTION_CIRCUIT_FAILURE_THRESHOLD=5)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise api_error(503)
+        return "ok"
+
+    assert await scheduler.call(flaky) == "ok"
+    assert len(attempts) == 3
+    assert scheduler.breaker.failures == 0
+
+async def test_client_errors_are_not_retried(settings):
+    scheduler = make_scheduler(settings)
+    attempts = []
+
+    async def not_found():
+        attempts.append(1)
+        raise api_error(404)
+
+    with pytest.raises(APIResponseError):
+        await scheduler.call(not_found)
+    assert len(attempts) == 1
+    assert scheduler.breaker.state == "closed"
+
+async def test_client_error_during_half_open_trial_keeps_the_circuit_open(settings):
+    scheduler = make_scheduler(settings)
+    open_breaker(scheduler.breaker)
+
+    async def not_found():
+        raise api_error(404)
+
+    with pytest.raises(APIResponseError):
+        await scheduler.call(not_found)
+    # Neither closed nor reopened: the next call is another trial
+    assert scheduler.breaker.state == "half_open"
+    assert scheduler.breaker.failures == scheduler.breaker.failure_threshold
+
+    async def ok():
+        return "ok"
+
+    assert await scheduler.call(ok) == "ok"
+    assert scheduler.breaker.state == "closed"
+
+async def test_client_errors_do_not_reset_the_failure_count(settings):
+    scheduler = make_scheduler(settings, NOTION_MAX_RETRIES=0)
+
+    async def unavailable():
+        raise api_error(503)
+
+    async def not_found():
+        raise api_error(404)
+
+    with pytest.raises(APIResponseError):
+        await scheduler.call(unavailable)
+    with pytest.raises(APIResponseError):
+        await scheduler.call(not_found)
+    with pytest.raises(APIResponseError):
+        await scheduler.call(unavailable)
+    assert scheduler.breaker.state == "open"
+
+async def test_throttling_pauses_the_bucket_for_retry_after(settings):
+    scheduler = make_scheduler(settings)
+    attempts = []
+
+    async def throttled():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise api_error(429, {"Retry-After": "0.2"})
+        return "ok"
+
+    started = time.monotonic()
+    assert await scheduler.call(throttled) == "ok"
+    assert time.monotonic() - started >= 0.2
+    # Throttling is not a health failure
+    assert scheduler.breaker.failures == 0
+
+def test_retry_after_parsing():
+    assert _retry_after(api_error(429, {"Retry-After": "3"})) == 3.0
+    assert _retry_after(api_error(429, {"Retry-After": "-1"})) == 0.0
+    assert _retry_after(api_error(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert _retry_after(api_error(429, {"Retry-After": "soon"})) is None
+    assert _retry_after(api_error(429)) is None
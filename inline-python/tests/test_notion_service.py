@@ -0,0 +1,72 @@
+import pytest
+
+from src.services.notion_service import NotionService
+
+def offer_page(page_id: str, partner: str = "", advertiser: str = "adv-1") -> dict:
+    return {
+        "id": page_id,
+        "last_edited_time": "2024-01-01T00:00:00.000Z",
+        "properties": {
+            "Partner": {"type": "formula", "formula": {"string": partner}},
+            "Advertiser": {"type": "relation", "relation": [{"id": advertiser}]},
+            "GEO": {"type": "formula", "formula": {"string": "DE"}},
+        },
+    }
+
+def advertiser_page(page_id: str, name: str) -> dict:
+    return {
+        "id": page_id,
+        "properties": {"Name": {"type": "title", "title": [{"plain_text": name}]}},
+    }
+
+class FakeDatabases:
+    def __init__(self, offers):
+        self.offers = offers
+        self.advertisers = [advertiser_page("adv-1", "Sutra")]
+        self.queries = []
+
+    async def query(self, database_id, start_cursor=None, page_size=100, **kwargs):
+        self.queries.append(database_id)
+        results = self.advertisers if database_id == "advertisers" else self.offers
+        return {"results": results, "has_more": False, "next_cursor": None}
+
+class FakeClient:
+    def __init__(self, offers):
+        self.databases = FakeDatabases(offers)
+
+@pytest.fixture
+def service(settings):
+    service = NotionService(settings.model_copy(update={
+        "OFFERS_DATABASE_ID": "offers",
+        "ADVERTISERS_DATABASE_ID": "advertisers",
+    }))
+    service.client = FakeClient([offer_page("a", partner="Deum")])
+    return service
+
+async def sync(service: NotionService, edited_since=None):
+    return [deal async for batch in service.stream_deals(edited_since) for deal in batch]
+
+async def test_advertisers_are_not_loaded_when_every_deal_has_a_partner(service):
+    deals = await sync(service)
+    assert [deal["partner"] for deal in deals] == ["Deum"]
+    assert service.client.databases.queries == ["offers"]
+
+async def test_advertisers_are_loaded_once_and_cached_across_polls(service):
+    service.client.databases.offers = [offer_page("a"), offer_page("b")]
+    deals = await sync(service)
+    assert [deal["partner"] for deal in deals] == ["Sutra", "Sutra"]
+
+    await sync(service, edited_since="2024-01-01T00:00:00.000Z")
+    assert service.client.databases.queries.count("advertisers") == 1
+
+async def test_full_sync_refreshes_the_advertisers(service):
+    service.client.databases.offers = [offer_page("a")]
+    await sync(service, edited_since="2024-01-01T00:00:00.000Z")
+    service.client.databases.advertisers = [advertiser_page("adv-1", "Sutra Media")]
+
+    deals = await sync(service, edited_since="2024-01-01T00:00:00.000Z")
+    assert deals[0]["partner"] == "Sutra"
+
+    deals = await sync(service)
+    assert deals[0]["partner"] == "Sutra Media"
+    assert service.client.databases.queries.count("advertisers") == 2
@@ -0,0 +1,74 @@
+import hashlib
+import hmac
+import logging
+
+import orjson
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.services.notion_webhook import (
+    WEBHOOK_PATH, NotionWebhookReceiver, parse_notification, verify_signature
+)
+
+SECRET = "secret"
+
+def sign(body: bytes, secret: str = SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+@pytest.fixture
+async def client():
+    received = []
+    receiver = NotionWebhookReceiver(SECRET, lambda changed, deleted: received.append((changed, deleted)))
+    app = web.Application()
+    app.router.add_post(WEBHOOK_PATH, receiver.handle)
+    async with TestClient(TestServer(app)) as client:
+        client.received = received
+        yield client
+
+async def post(client, payload, header="X-Notion-Signature", secret=SECRET):
+    body = orjson.dumps(payload)
+    return await client.post(WEBHOOK_PATH, data=body, headers={header: sign(body, secret)})
+
+def test_verify_signature():
+    assert verify_signature(SECRET, b"body", sign(b"body"))
+    assert not verify_signature(SECRET, b"body", sign(b"other"))
+    assert not verify_signature(SECRET, b"body", None)
+    assert not verify_signature("", b"body", sign(b"body", ""))
+
+@pytest.mark.parametrize("payload, expected", [
+    ({"type": "page.properties_updated", "entity": {"id": "a", "type": "page"}}, ({"a"}, set())),
+    ({"type": "page.deleted", "entity": {"id": "a", "type": "page"}}, (set(), {"a"})),
+    ({"type": "database.schema_updated", "entity": {"id": "d", "type": "database"}}, (set(), set())),
+    ({"type": "page.created", "entity": {"type": "page"}}, (set(), set())),
+    ({"page_ids": ["a", "b"], "page_id": "c", "deleted": ["b"]}, ({"a", "c"}, {"b"})),
+])
+def test_parse_notification(payload, expected):
+    assert parse_notification(payload) == expected
+
+async def test_signed_events_are_handed_over(client):
+    response = await post(client, {"type": "page.deleted", "entity": {"id": "a", "type": "page"}})
+    assert response.status == 200
+    response = await post(client, {"page_ids": ["b"]}, header="X-Signature")
+    assert response.status == 200
+    assert client.received == [(set(), {"a"}), ({"b"}, set())]
+
+async def test_bad_signatures_are_rejected(client):
+    response = await post(client, {"page_ids": ["a"]}, secret="wrong")
+    assert response.status == 401
+    response = await client.post(WEBHOOK_PATH, data=orjson.dumps({"page_ids": ["a"]}))
+    assert response.status == 401
+    assert client.received == []
+
+@pytest.mark.parametrize("body", [b"not json", b"[1, 2]"])
+async def test_malformed_bodies_are_rejected(client, body):
+    response = await client.post(WEBHOOK_PATH, data=body)
+    assert response.status == 400
+
+async def test_verification_token_is_not_logged(client, caplog):
+    with caplog.at_level(logging.INFO):
+        response = await client.post(WEBHOOK_PATH, data=orjson.dumps({"verification_token": "token-123"}))
+    assert response.status == 200
+    assert "verification request" in caplog.text
+    assert "token-123" not in caplog.text
+    assert client.received == []
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+import pytest
+import pytz
+
+from src.services.poll_interval import AdaptivePollInterval
+
+# Europe/Berlin is UTC+2 in summer; 2024-06-05 is a Wednesday
+BUSINESS = datetime(2024, 6, 5, 10, tzinfo=pytz.utc)
+NIGHT = datetime(2024, 6, 5, 22, tzinfo=pytz.utc)
+WEEKEND = datetime(2024, 6, 8, 10, tzinfo=pytz.utc)
+
+@pytest.fixture
+def interval(settings):
+    return AdaptivePollInterval(settings)
+
+def test_business_hours(interval):
+    assert interval.in_business_hours(BUSINESS)
+    assert not interval.in_business_hours(NIGHT)
+    assert not interval.in_business_hours(WEEKEND)
+
+def test_changes_drop_to_the_floor(interval):
+    assert interval.next_interval(True, BUSINESS) == 60
+    assert interval.next_interval(True, NIGHT) == 300
+
+def test_idle_syncs_back_off_to_the_ceiling(interval):
+    interval.next_interval(True, BUSINESS)
+    assert [interval.next_interval(False, BUSINESS) for _ in range(4)] == [120, 240, 300, 300]
+    assert [interval.next_interval(False, NIGHT) for _ in range(4)] == [600, 1200, 1800, 1800]
+
+def test_business_hours_cap_an_off_hours_interval(interval):
+    interval.next_interval(False, NIGHT)
+    interval.next_interval(False, NIGHT)
+    assert interval.next_interval(False, BUSINESS) == 300
@@ -0,0 +1,34 @@
+import pytest
+
+from src.services.aliases import alternatives
+from src.services.deal_index import DealIndex, matches_query
+from src.services.query_normalizer import normalize_query
+
+@pytest.mark.parametrize("query, expected", [
+    ("", ""),
+    ("  DE  ", "de"),
+    ("fb de", "facebook de"),
+    ("de fb", "de facebook"),
+    ("facebook de", "facebook de"),
+    ("de de sutra", "de sutra"),
+    ("sutra de", "sutra de"),
+    ("na uk", "ads gb native"),
+])
+def test_normalize_query(query, expected):
+    assert normalize_query(query) == expected
+
+def test_alternatives():
+    assert alternatives("facebook") == ("facebook", "fb")
+    assert alternatives("english") == ("english", "en", "eng")
+    assert alternatives("sutra") == ("sutra",)
+
+@pytest.mark.parametrize("query", ["fb en", "facebook english", "FB", "en", "english", "uk", "gb fb"])
+def test_aliased_queries_match_abbreviated_deals(query):
+    deal = {"id": "a", "partner": "Sutra", "sources": ["FB"], "geo": "UK", "language": ["EN"]}
+    normalized = normalize_query(query)
+    assert matches_query(deal, normalized)
+    assert DealIndex([deal]).search(normalized) == [deal]
+
+def test_aliased_queries_match_canonical_deals():
+    deal = {"id": "a", "partner": "Sutra", "sources": ["Facebook"], "geo": "DE", "language": ["English"]}
+    assert DealIndex([deal]).search(normalize_query("fb en de")) == [deal]
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from src.services.request_coalescer import SingleFlight
+
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    release = asyncio.Event()
+
+    async def search():
+        calls.append(1)
+        await release.wait()
+        return ["a"]
+
+    waiters = [asyncio.create_task(flight.do("de", search)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert len(flight) == 1
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [["a"]] * 3
+    assert calls == [1]
+    assert len(flight) == 0
+
+async def test_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def echo(value):
+        return value
+
+    results = await asyncio.gather(flight.do("de", lambda: echo(1)), flight.do("fr", lambda: echo(2)))
+    assert results == [1, 2]
+
+async def test_a_cancelled_caller_leaves_the_call_running():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def search():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do("de", search))
+    second = asyncio.create_task(flight.do("de", search))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+async def test_failures_reach_every_caller_and_are_not_kept():
+    flight = SingleFlight()
+
+    async def fail():
+        raise RuntimeError("Typesense is down")
+
+    results = await asyncio.gather(flight.do("de", fail), flight.do("de", fail), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(flight) == 0
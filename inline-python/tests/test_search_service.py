@@ -0,0 +1,129 @@
+import pytest
+
+from src.services.search_service import DEALS_ALIAS, IMPORTED_ALIAS, SearchService
+
+LEGACY_FIELDS = [
+    {"name": name, "type": "string"}
+    for name in ("id", "partner", "geo", "price", "formatted_display", "formatted_funnels", "last_updated")
+] + [
+    {"name": name, "type": "string[]"} for name in ("sources", "language", "funnels")
+]
+
+DEAL = {
+    "id": "a",
+    "partner": "Sutra",
+    "sources": ["Facebook"],
+    "geo": "DE",
+    "language": ["German"],
+    "price": "1000+9%",
+    "cpa": 1000.0,
+    "crg": 9.0,
+    "cpl": None,
+    "pricing_model": "cpa_crg",
+    "funnels": [],
+    "formatted_display": "Sutra DE",
+    "formatted_funnels": "",
+    "last_updated": "2024-01-01T00:00:00Z",
+}
+
+class FakeTypesense:
+    def __init__(self, aliases=None, collections=None):
+        self.aliases = aliases or {}
+        self.collections = collections or {}
+        self.patches = []
+        self.imported = []
+        self.deleted = []
+        self.synonyms = {}
+
+    async def retrieve_alias(self, name):
+        return self.aliases.get(name)
+
+    async def retrieve_collection(self, name):
+        return self.collections.get(name)
+
+    async def create_collection(self, schema):
+        self.collections[schema["name"]] = schema
+        return schema
+
+    async def upsert_alias(self, name, collection):
+        self.aliases[name] = collection
+
+    async def upsert_synonym(self, collection, synonym_id, synonyms):
+        self.synonyms[(collection, synonym_id)] = synonyms
+
+    async def update_collection(self, name, fields):
+        self.patches.append((name, fields))
+        self.collections[name]["fields"].extend(fields)
+        return {"fields": fields}
+
+    async def delete_documents(self, collection, doc_ids):
+        self.deleted.extend(doc_ids)
+
+    async def import_documents(self, collection, documents, action="upsert"):
+        self.imported.extend(documents)
+        return [{"success": True} for _ in documents]
+
+@pytest.fixture
+def service(settings):
+    return SearchService(settings)
+
+async def test_legacy_collection_gets_price_fields(service):
+    service.client = FakeTypesense(collections={DEALS_ALIAS: {"name": DEALS_ALIAS, "fields": list(LEGACY_FIELDS)}})
+
+    assert await service.update_index([DEAL]) == 1
+
+    [(collection, fields)] = service.client.patches
+    assert collection == DEALS_ALIAS
+    assert sorted(field["name"] for field in fields) == ["cpa", "cpl", "crg", "pricing_model"]
+    assert all(field["optional"] for field in fields)
+    assert service.client.imported[0]["pricing_model"] == "cpa_crg"
+
+async def test_aliased_collection_is_patched_through_its_target(service):
+    service.client = FakeTypesense(
+        aliases={DEALS_ALIAS: "deals_1"},
+        collections={"deals_1": {"name": "deals_1", "fields": list(LEGACY_FIELDS)}},
+    )
+    await service.update_index([DEAL])
+    assert [collection for collection, _ in service.client.patches] == ["deals_1"]
+
+async def test_patching_forces_reupserting_indexed_documents(service):
+    service.client = FakeTypesense(collections={DEALS_ALIAS: {"name": DEALS_ALIAS, "fields": list(LEGACY_FIELDS)}})
+    service._fingerprints = {"b": "indexed-before-the-patch"}
+
+    await service.update_index([DEAL])
+    assert "b" not in service._fingerprints
+
+async def test_current_collection_is_left_alone(service):
+    schema = SearchService._collection_schema("deals_1")
+    service.client = FakeTypesense(aliases={DEALS_ALIAS: "deals_1"}, collections={"deals_1": schema})
+    await service.update_index([DEAL])
+    assert service.client.patches == []
+
+async def test_missing_collection_is_created_behind_the_alias(service):
+    service.client = FakeTypesense()
+    await service.update_index([DEAL])
+    collection = service.client.aliases[DEALS_ALIAS]
+    assert collection.startswith(f"{DEALS_ALIAS}_")
+    assert collection in service.client.collections
+
+async def test_removal_before_any_fingerprint_is_known(service):
+    service.client = FakeTypesense()
+    assert await service.remove_from_index(["a", "b"]) == 2
+    assert service.client.deleted == ["a", "b"]
+    assert await service.remove_from_index([]) == 0
+
+async def test_collections_get_alias_synonyms(service):
+    schema = SearchService._collection_schema("deals_1")
+    service.client = FakeTypesense(aliases={DEALS_ALIAS: "deals_1"}, collections={"deals_1": schema})
+    await service.update_index([DEAL])
+    assert service.client.synonyms[("deals_1", "facebook")] == ["facebook", "fb"]
+    assert service.client.synonyms[("deals_1", "native-ads")] == ["native ads", "na", "nativeads"]
+
+async def test_imports_use_their_own_alias(settings):
+    service = SearchService(settings, alias=IMPORTED_ALIAS)
+    schema = SearchService._collection_schema("deals_1")
+    service.client = FakeTypesense(aliases={DEALS_ALIAS: "deals_1"}, collections={"deals_1": schema})
+    await service.update_index([DEAL])
+    collection = service.client.aliases[IMPORTED_ALIAS]
+    assert collection.startswith(f"{IMPORTED_ALIAS}_")
+    assert service.client.aliases[DEALS_ALIAS] == "deals_1"
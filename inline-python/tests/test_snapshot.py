@@ -0,0 +1,54 @@
+import pytest
+
+from src.models.exceptions import SnapshotError
+from src.services.snapshot import DealSnapshot, read_snapshot, write_snapshot
+
+DEALS = [
+    {"id": "a", "partner": "Sutra", "geo": "DE", "sources": ["Facebook"], "cpa": 1000.0},
+    {"id": "b", "partner": "Deum", "geo": "MX", "sources": [], "funnels": ["Oil Profit"]},
+    {"id": "c", "partner": "Ünïcode", "geo": "FR", "sources": ["Google", "Native"]},
+]
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "deals.snapshot"
+    size = write_snapshot(path, DEALS, {"watermark": "2024-01-01T00:00:00Z"})
+
+    assert size == path.stat().st_size
+    meta, deals = read_snapshot(path)
+    assert meta == {"watermark": "2024-01-01T00:00:00Z"}
+    assert deals == DEALS
+
+def test_random_access(tmp_path):
+    path = tmp_path / "deals.snapshot"
+    write_snapshot(path, DEALS, {})
+
+    with DealSnapshot(path) as snapshot:
+        assert len(snapshot) == 3
+        assert snapshot[2] == DEALS[2]
+        with pytest.raises(IndexError):
+            snapshot[3]
+
+def test_empty_catalog(tmp_path):
+    path = tmp_path / "deals.snapshot"
+    write_snapshot(path, [], {"deals": 0})
+    assert read_snapshot(path) == ({"deals": 0}, [])
+
+def test_rewrite_replaces_previous(tmp_path):
+    path = tmp_path / "deals.snapshot"
+    write_snapshot(path, DEALS, {})
+    write_snapshot(path, DEALS[:1], {})
+    assert read_snapshot(path)[1] == DEALS[:1]
+    assert not (tmp_path / "deals.snapshot.tmp").exists()
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: data[:-5],  # truncated
+    lambda data: b"NOTASNAP" + data[8:],  # wrong magic
+    lambda data: b"",  # empty file
+])
+def test_corrupt_files_raise(tmp_path, corrupt):
+    path = tmp_path / "deals.snapshot"
+    write_snapshot(path, DEALS, {})
+    path.write_bytes(corrupt(path.read_bytes()))
+
+    with pytest.raises(SnapshotError):
+        read_snapshot(path)
@@ -0,0 +1,96 @@
+import asyncio
+
+from src.services.sync_coordinator import SyncCoordinator, SyncProgress
+
+class Recorder:
+    """Sync callables that record their calls and wait until released."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def sync(self, full, progress):
+        self.calls.append(("sync", full))
+        await self.release.wait()
+
+    async def sync_pages(self, changed, deleted, progress):
+        self.calls.append(("pages", changed, deleted))
+        await self.release.wait()
+
+def test_progress_changes_follow_the_catalog():
+    progress = SyncProgress(False)
+    progress.upserted = progress.removed = 3
+    assert not progress.changed
+    progress.deleted = 1
+    assert progress.changed
+    assert "1 deleted" in progress.summary()
+
+async def test_concurrent_syncs_attach_to_the_running_one():
+    recorder = Recorder()
+    recorder.release.clear()
+    coordinator = SyncCoordinator(recorder.sync)
+
+    first = coordinator.start(full=True)
+    assert coordinator.start() is first
+    await asyncio.sleep(0)
+    recorder.release.set()
+    await coordinator.run()
+
+    assert recorder.calls == [("sync", True)]
+    assert coordinator.progress.stage == "complete"
+
+async def test_forced_syncs_are_rate_limited():
+    coordinator = SyncCoordinator(Recorder().sync, min_force_interval=60)
+    assert coordinator.force_cooldown() == 0
+    await coordinator.run(forced=True)
+    assert 0 < coordinator.force_cooldown() <= 60
+
+async def test_failures_are_recorded():
+    async def fail(full, progress):
+        raise RuntimeError("Notion is down")
+
+    coordinator = SyncCoordinator(fail)
+    try:
+        await coordinator.run()
+    except RuntimeError:
+        pass
+    assert coordinator.progress.stage == "failed"
+    assert coordinator.progress.error == "Notion is down"
+
+async def test_queued_pages_are_batched_and_deletions_win():
+    recorder = Recorder()
+    coordinator = SyncCoordinator(recorder.sync, sync_pages=recorder.sync_pages)
+
+    coordinator.queue_pages({"a", "b"})
+    coordinator.queue_pages({"c"}, deleted={"b"})
+    assert coordinator.pending_pages == 3
+    await coordinator._drain_task
+
+    assert recorder.calls == [("pages", {"a", "c"}, {"b"})]
+    assert coordinator.progress.targeted
+
+async def test_page_syncs_wait_for_a_running_sync():
+    recorder = Recorder()
+    recorder.release.clear()
+    coordinator = SyncCoordinator(recorder.sync, sync_pages=recorder.sync_pages)
+
+    coordinator.start()
+    coordinator.queue_pages({"a"})
+    await asyncio.sleep(0.01)
+    assert recorder.calls == [("sync", False)]
+
+    recorder.release.set()
+    await coordinator._drain_task
+    assert recorder.calls == [("sync", False), ("pages", {"a"}, set())]
+
+async def test_cancel_stops_the_running_sync():
+    recorder = Recorder()
+    recorder.release.clear()
+    coordinator = SyncCoordinator(recorder.sync)
+    coordinator.start()
+    await asyncio.sleep(0)
+
+    await coordinator.cancel()
+    assert not coordinator.running
+    assert coordinator.progress.stage == "cancelled"
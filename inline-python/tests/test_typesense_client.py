@@ -0,0 +1,67 @@
+import json
+
+import httpx
+import pytest
+
+from src.models.exceptions import SearchError
+from src.services.typesense_client import AsyncTypesenseClient
+
+@pytest.fixture
+def client(settings):
+    client = AsyncTypesenseClient(settings)
+    client.requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        client.requests.append(request)
+        path = request.url.path
+        if path == "/aliases/deals":
+            return httpx.Response(200, json={"name": "deals", "collection_name": "deals_1"})
+        if path.startswith("/aliases/") or path == "/collections/missing":
+            return httpx.Response(404, json={"message": "Not Found"})
+        if path.endswith("/documents/import"):
+            lines = request.content.decode().splitlines()
+            return httpx.Response(200, text="\n".join('{"success": true}' for _ in lines))
+        if path.endswith("/documents/export"):
+            return httpx.Response(200, text='{"id": "a"}\n{"id": "b"}\n')
+        if path.endswith("/documents/search"):
+            return httpx.Response(200, json={"found": 0, "hits": []})
+        if path == "/collections/broken":
+            return httpx.Response(500, text="boom")
+        return httpx.Response(200, json={})
+
+    client.http = httpx.AsyncClient(base_url="http://typesense", transport=httpx.MockTransport(handle))
+    return client
+
+async def test_missing_resources_are_none(client):
+    assert await client.retrieve_alias("deals") == "deals_1"
+    assert await client.retrieve_alias("other") is None
+    assert await client.retrieve_collection("missing") is None
+
+async def test_errors_raise_search_error(client):
+    with pytest.raises(SearchError, match="500"):
+        await client.retrieve_collection("broken")
+
+async def test_import_sends_jsonl(client):
+    results = await client.import_documents("deals", [{"id": "a"}, {"id": "b"}])
+    assert results == [{"success": True}, {"success": True}]
+
+    request = client.requests[-1]
+    assert request.url.params["action"] == "upsert"
+    assert [json.loads(line) for line in request.content.decode().splitlines()] == [{"id": "a"}, {"id": "b"}]
+
+async def test_export_reads_jsonl(client):
+    assert await client.export_documents("deals") == [{"id": "a"}, {"id": "b"}]
+
+async def test_search_drops_empty_parameters(client):
+    await client.search("deals", {"q": "de", "filter_by": "", "sort_by": None})
+    assert dict(client.requests[-1].url.params) == {"q": "de"}
+
+async def test_deletes_are_batched(client):
+    await client.delete_documents("deals", ["a", "b", "c"], batch_size=2)
+    assert [request.url.params["filter_by"] for request in client.requests] == ["id:[a,b]", "id:[c]"]
+
+async def test_synonyms_are_put_by_id(client):
+    await client.upsert_synonym("deals_1", "facebook", ["facebook", "fb"])
+    request = client.requests[-1]
+    assert (request.method, request.url.path) == ("PUT", "/collections/deals_1/synonyms/facebook")
+    assert json.loads(request.content) == {"synonyms": ["facebook", "fb"]}